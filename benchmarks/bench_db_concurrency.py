@@ -0,0 +1,108 @@
+"""
+Бенчмарк конкурентного доступа к SQLite: читатели (/get_*) на фоне писателей
+(загрузка событий/ДЗ старостой).
+
+Профили:
+    default - прежний движок: настройки SQLite по умолчанию (rollback journal), один пул;
+    tuned   - профиль из engine.py: WAL, synchronous=NORMAL, cache/mmap, busy_timeout,
+              отдельные пулы чтения и записи.
+
+Для каждого профиля создаётся своя база во временном файле.
+
+Запуск:
+    python -m benchmarks.bench_db_concurrency --readers 16 --writers 2 --seconds 5
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from sqlalchemy import select, update
+
+from bot_api.Database.models import Base, Group
+from bot_api.Database.engine import make_engine, make_session_factory, sqlite_pragmas
+
+
+def big_schedule(lessons: int) -> dict:
+    days = ["понедельник", "вторник", "среда", "четверг", "пятница", "суббота"]
+    return {day: "\n".join(f"{8 + i % 6}:00 Предмет {random.randint(1, 99)}" for i in range(lessons // 6))
+            for day in days}
+
+
+def build_profile(name: str, url: str, read_pool: int):
+    if name == "default":
+        engine = make_engine(url, echo=False)
+        return [engine], make_session_factory(engine)
+    writer = make_engine(url, echo=False, pragmas=sqlite_pragmas(), pool_size=1, max_overflow=0)
+    reader = make_engine(url, echo=False, pragmas=sqlite_pragmas(read_only=True),
+                         pool_size=read_pool, max_overflow=0)
+    return [writer, reader], make_session_factory(writer, reader)
+
+
+async def run_profile(name: str, args) -> None:
+    url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')}"
+    engines, session_factory = build_profile(name, url, args.readers)
+
+    async with engines[0].begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add_all(Group(group_tg_id=tg_id, tg_link="link", group_name="ПМИ", group_course=1,
+                              group_number=tg_id, schedule=big_schedule(args.lessons))
+                        for tg_id in range(args.groups))
+        await session.commit()
+
+    deadline = time.perf_counter() + args.seconds
+    read_latencies: list[float] = []
+    writes = 0
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with session_factory() as session:
+                await session.execute(
+                    select(Group.schedule).where(Group.group_tg_id == random.randrange(args.groups))
+                )
+            read_latencies.append(time.perf_counter() - started)
+
+    async def writer():
+        nonlocal writes
+        while time.perf_counter() < deadline:
+            async with session_factory() as session:
+                await session.execute(
+                    update(Group).where(Group.group_tg_id == random.randrange(args.groups))
+                    .values(events=big_schedule(args.lessons))
+                )
+                await session.commit()
+            writes += 1
+
+    await asyncio.gather(*(reader() for _ in range(args.readers)), *(writer() for _ in range(args.writers)))
+    for engine in engines:
+        await engine.dispose()
+
+    read_latencies.sort()
+    p95 = read_latencies[int(len(read_latencies) * 0.95)] if read_latencies else 0.0
+    print(f"{name:<8} чтений/с {len(read_latencies) / args.seconds:9.0f}  "
+          f"p50 {statistics.median(read_latencies) * 1000:7.2f} мс  p95 {p95 * 1000:7.2f} мс  "
+          f"записей/с {writes / args.seconds:7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--lessons", type=int, default=400, help="Занятий в расписании группы")
+    parser.add_argument("--profiles", nargs="+", default=["default", "tuned"])
+    args = parser.parse_args()
+
+    print(f"Читателей: {args.readers}, писателей: {args.writers}, {args.seconds:.0f} с на профиль")
+    for name in args.profiles:
+        asyncio.run(run_profile(name, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Бенчмарк эмбеддингов запросов: текущий путь (HuggingFaceEmbeddings, по одному запросу)
+против CPUEmbeddings с микробатчингом для каждой среды выполнения.
+
+Запуск:
+    python -m benchmarks.bench_embeddings --queries 512 --concurrency 32 --runtimes torch int8
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+from bot_api.AI.embeddings import CPUEmbeddings
+from bot_api.AI.embedding_manager import MODEL_NAME, CACHE_DIR
+
+
+QUERIES = [
+    "когда экзамен по матанализу",
+    "расскажи про магистратуру на мехмате",
+    "какие пары завтра",
+    "что задали по алгебре",
+    "где находится деканат",
+    "какие мероприятия на этой неделе",
+    "как поступить в аспирантуру",
+    "что такое неделя академической мобильности",
+]
+
+
+async def run_load(embed, queries: int, concurrency: int) -> dict:
+    """
+    Прогоняет queries запросов в concurrency параллельных потоков.
+
+    :param embed: Корутина-функция text -> вектор
+    :return: Пропускная способность и перцентили задержки
+    """
+    latencies = []
+
+    async def worker(offset: int):
+        for i in range(offset, queries, concurrency):
+            started = time.perf_counter()
+            await embed(QUERIES[i % len(QUERIES)] + f" {i}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "qps": queries / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--runtimes", nargs="+", default=["torch", "int8"], choices=CPUEmbeddings.RUNTIMES)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+
+    if not args.skip_baseline:
+        # Прежний путь: HuggingFaceEmbeddings и отдельный вызов модели на каждый запрос
+        from langchain_huggingface import HuggingFaceEmbeddings
+        baseline = HuggingFaceEmbeddings(
+            model_name=args.model,
+            model_kwargs={"device": "cpu"},
+            encode_kwargs={"normalize_embeddings": True},
+            cache_folder=CACHE_DIR
+        )
+
+        async def embed_baseline(text):
+            return await asyncio.to_thread(baseline.embed_query, text)
+
+        await embed_baseline("прогрев")
+        results["baseline"] = await run_load(embed_baseline, args.queries, args.concurrency)
+
+    for runtime in args.runtimes:
+        embeddings = CPUEmbeddings(args.model, runtime=runtime, threads=args.threads, cache_folder=CACHE_DIR)
+        await embeddings.aembed_query("прогрев")
+        results[runtime] = await run_load(embeddings.aembed_query, args.queries, args.concurrency)
+        results[runtime]["avg_batch"] = embeddings.stats()["avg_batch"]
+
+    print(f"{args.queries} запросов, {args.concurrency} одновременно")
+    for name, r in results.items():
+        line = f"{name:>10}: {r['qps']:8.1f} запр/с   p50 {r['p50_ms']:7.1f} мс   p99 {r['p99_ms']:7.1f} мс"
+        if "avg_batch" in r:
+            line += f"   средний батч {r['avg_batch']:.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
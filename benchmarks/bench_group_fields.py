@@ -0,0 +1,113 @@
+"""
+Бенчмарк чтения/записи одного JSON-поля группы с большим расписанием:
+прежний путь (вся строка Group со всеми JSON-колонками, загрузка-изменение-flush)
+против выборки одной колонки и одного UPDATE ... WHERE group_tg_id=.
+
+Считаются запросы к БД (round trips) и байты JSON, декодированные за вызов.
+База создаётся во временном файле.
+
+Запуск:
+    python -m benchmarks.bench_group_fields --groups 50 --lessons 400 --repeat 200
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import undefer_group
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot_api.Database.models import Base, Group
+from bot_api.Database.requests import get_group_field, update_group_field
+from bot_api.Database.group_cache import GROUP_CACHE
+
+
+COUNTERS = {"queries": 0, "decoded": 0}
+
+
+def counting_loads(text: str):
+    COUNTERS["decoded"] += len(text.encode())
+    return json.loads(text)
+
+
+def big_schedule(lessons: int) -> dict:
+    days = ["понедельник", "вторник", "среда", "четверг", "пятница", "суббота"]
+    return {day: "\n".join(
+        f"{8 + i % 6}:00-{9 + i % 6}:35 Предмет {random.randint(1, 99)} ауд. {random.randint(100, 500)}"
+        for i in range(lessons // len(days))
+    ) for day in days}
+
+
+async def legacy_get(session, group_tg_id: int, field: str):
+    result = await session.execute(
+        select(Group).filter_by(group_tg_id=group_tg_id).options(undefer_group("json"))
+    )
+    group = result.scalar_one_or_none()
+    return getattr(group, field) if group else None
+
+
+async def legacy_update(session, group_tg_id: int, field: str, value) -> None:
+    async with session.begin():
+        result = await session.execute(
+            select(Group).filter_by(group_tg_id=group_tg_id).options(undefer_group("json"))
+        )
+        setattr(result.scalar_one(), field, value)
+
+
+async def run(args) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", json_deserializer=counting_loads)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*_):
+        COUNTERS["queries"] += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add_all(Group(group_tg_id=tg_id, tg_link="link", group_name="ПМИ", group_course=1,
+                              group_number=tg_id, schedule=big_schedule(args.lessons),
+                              events=big_schedule(args.lessons // 4), homework=big_schedule(args.lessons // 4))
+                        for tg_id in range(args.groups))
+        await session.commit()
+
+    async def measure(name: str, call) -> None:
+        COUNTERS.update(queries=0, decoded=0)
+        started = time.perf_counter()
+        for i in range(args.repeat):
+            async with session_factory() as session:
+                await call(session, i % args.groups)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<28} {elapsed / args.repeat * 1000:8.2f} мс/вызов "
+              f"{COUNTERS['queries'] / args.repeat:6.1f} запросов "
+              f"{COUNTERS['decoded'] / args.repeat / 1024:9.1f} КБ JSON")
+
+    async def column_get(session, tg_id):
+        GROUP_CACHE.invalidate(tg_id)  # Промах кэша: читается одна колонка
+        await get_group_field(session, tg_id, "schedule")
+
+    print(f"Групп: {args.groups}, занятий в расписании: {args.lessons}, вызовов: {args.repeat}")
+    await measure("чтение: вся строка", lambda s, g: legacy_get(s, g, "schedule"))
+    await measure("чтение: одна колонка", column_get)
+    await measure("чтение: из GROUP_CACHE", lambda s, g: get_group_field(s, g, "schedule"))
+    await measure("запись: загрузка + flush", lambda s, g: legacy_update(s, g, "events", {"день": time.perf_counter()}))
+    await measure("запись: один UPDATE", lambda s, g: update_group_field(s, g, "events", {"день": time.perf_counter()}))
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--lessons", type=int, default=400, help="Занятий в расписании группы")
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Бенчмарк вывода расписания: прежний путь (JSON-блоб Group.schedule целиком)
+против индексированного чтения таблицы lessons (одного дня или всей недели).
+
+Данные - синтетический ответ API курса (см. bench_schedule), база во временном файле.
+
+Запуск:
+    python -m benchmarks.bench_lessons --groups 60 --lessons-per-group 40 --repeat 500
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot_api.Database.models import Base, Group
+from bot_api.Database.requests import add_group, get_group_lessons
+from bot_api.parsing.parsers import format_schedule
+from bot_api.parsing.schedule_builder import DAYS, build_course_lessons, render_schedule
+from benchmarks.bench_schedule import synthetic_payload
+
+
+async def blob_schedule(session, group_tg_id: int, day: str | None) -> str:
+    result = await session.execute(select(Group.schedule).where(Group.group_tg_id == group_tg_id))
+    return await format_schedule(result.scalar_one(), day)
+
+
+async def rows_schedule(session, group_tg_id: int, day: str | None) -> str:
+    weekday = DAYS.index(day) if day else None
+    lessons = await get_group_lessons(session, group_tg_id, weekday)
+    return await format_schedule(render_schedule(lessons, None if weekday is None else [weekday]), day)
+
+
+async def run(args) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    lessons = build_course_lessons(synthetic_payload(args.groups, args.lessons_per_group))
+    async with session_factory() as session:
+        for tg_id, (name, number) in enumerate(lessons):
+            group_lessons = lessons[(name, number)]
+            await add_group(session, tg_id, name, 1, number, "link",
+                            schedule=render_schedule(group_lessons), lessons=group_lessons)
+        await session.commit()
+    groups = len(lessons)
+
+    # Оба пути должны давать одинаковый текст
+    async with session_factory() as session:
+        for day in (None, *DAYS):
+            assert await blob_schedule(session, 0, day) == await rows_schedule(session, 0, day), day
+
+    async def measure(name: str, call, day_of) -> None:
+        latencies = []
+        async with session_factory() as session:
+            for i in range(args.repeat):
+                started = time.perf_counter()
+                await call(session, i % groups, day_of(i))
+                latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        print(f"{name:<24} p50 {statistics.median(latencies) * 1000:7.3f} мс  "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.3f} мс")
+
+    print(f"Групп: {groups}, занятий в группе: ~{args.lessons_per_group}, вызовов: {args.repeat}")
+    one_day = lambda i: random.choice(DAYS)
+    week = lambda i: None
+    await measure("блоб, один день", blob_schedule, one_day)
+    await measure("lessons, один день", rows_schedule, one_day)
+    await measure("блоб, неделя", blob_schedule, week)
+    await measure("lessons, неделя", rows_schedule, week)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=60)
+    parser.add_argument("--lessons-per-group", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Бенчмарк поиска по истории ДЗ и событий: полнотекстовый индекс notes_fts (BM25)
+против прежнего способа - LIKE-сканирования текста.
+
+Данные - синтетические записи по группам, база во временном файле.
+
+Запуск:
+    python -m benchmarks.bench_notes --groups 200 --notes-per-group 500 --repeat 300
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot_api.Database.models import Base, Group, Note
+from bot_api.Database.requests import search_notes
+
+
+SUBJECTS = ["матанализ", "алгебра", "геометрия", "программирование", "дискретная математика",
+            "физика", "английский", "философия", "базы данных", "операционные системы"]
+STEMS = ["задач", "упражнени", "конспект", "параграф", "лабораторн", "контрольн", "доклад", "презентаци",
+         "реферат", "тест", "семинар", "коллоквиум", "матриц", "интеграл", "производн", "ряд", "предел",
+         "граф", "дерев", "алгоритм", "функци", "вектор", "определител", "уравнени", "систем"]
+ENDINGS = ["", "а", "ы", "и", "ов", "ам", "ами", "ах", "ой", "ая", "ую", "ые", "ых"]
+
+
+def vocabulary(size: int, rnd: random.Random) -> list[str]:
+    """
+    Словоформы: основы предметной лексики с окончаниями и случайные слова - хвост распределения.
+    """
+    words = [stem + ending for stem in STEMS for ending in ENDINGS]
+    letters = "абвгдежзиклмнопрстуфхцчшэюя"
+    while len(words) < size:
+        words.append("".join(rnd.choice(letters) for _ in range(rnd.randint(4, 10))))
+    rnd.shuffle(words)
+    return words
+
+
+def synthetic_note(rnd: random.Random, words: list[str], weights: list[float]) -> str:
+    body = " ".join(rnd.choices(words, weights, k=rnd.randint(6, 16)))
+    return f"{rnd.choice(SUBJECTS)}: {body} {rnd.randint(1, 300)}-{rnd.randint(1, 300)}"
+
+
+async def like_search(session, group_tg_id: int, terms: str, limit: int = 10) -> list:
+    query = select(Note.kind, Note.text, Note.created_at).join(Group).where(Group.group_tg_id == group_tg_id)
+    for word in terms.split():
+        query = query.where(Note.text.like(f"%{word}%"))
+    return (await session.execute(query.order_by(Note.created_at.desc()).limit(limit))).all()
+
+
+async def run(args) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rnd = random.Random(0)
+    # Частоты слов - по закону Ципфа, как в обычном тексте
+    words = vocabulary(args.vocabulary, rnd)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    started_at = datetime.now() - timedelta(days=365)
+    async with session_factory() as session:
+        session.add_all(Group(group_tg_id=tg_id, tg_link="link", group_name="ПМИ", group_course=1,
+                              group_number=tg_id) for tg_id in range(args.groups))
+        await session.flush()
+        for tg_id in range(args.groups):
+            await session.execute(insert(Note), [
+                {"group_id": tg_id + 1, "kind": rnd.choice(("homework", "events")),
+                 "text": synthetic_note(rnd, words, weights), "created_at": started_at + timedelta(hours=i)}
+                for i in range(args.notes_per_group)
+            ])
+        await session.commit()
+
+    queries = ["матанализ задачи", "интегралы", "базы данных лабораторная", "коллоквиум", "матрицы тест",
+               "уравнения", "алгоритм графы", "реферат"]
+
+    async def measure(name: str, call) -> None:
+        latencies = []
+        async with session_factory() as session:
+            for i in range(args.repeat):
+                started = time.perf_counter()
+                await call(session, i % args.groups, queries[i % len(queries)])
+                latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        print(f"{name:<16} p50 {statistics.median(latencies) * 1000:7.3f} мс  "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.3f} мс")
+
+    print(f"Групп: {args.groups}, записей: {args.groups * args.notes_per_group}, вызовов: {args.repeat}")
+    await measure("LIKE", like_search)
+    await measure("FTS5 + BM25", search_notes)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--notes-per-group", type=int, default=500)
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Число различных слов")
+    parser.add_argument("--repeat", type=int, default=300)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
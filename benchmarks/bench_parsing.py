@@ -0,0 +1,125 @@
+"""
+Бенчмарк разбора страниц новостей: прежний путь (полное дерево html.parser,
+разбор словарей селекторов для каждой новости) против скомпилированных планов
+с разными парсерами, с ограничением разбора контейнером и без.
+
+Фикстуры - сохранённые страницы новостей: <сайт>.html в каталоге --fixtures
+(имя сайта как в config.yaml). Без --fixtures страницы генерируются по разметке сайтов.
+
+Запуск:
+    python -m benchmarks.bench_parsing --fixtures saved_pages/ --repeat 20
+"""
+import time
+import asyncio
+import argparse
+import urllib.parse
+from os import path, listdir
+
+from bs4 import BeautifulSoup
+
+from bot_api.parsing.parsers import CONFIG_PATH
+from bot_api.parsing.parsers_utils import clear_text, load_config
+from bot_api.parsing.extraction import ParsingPlan, resolve_backend
+
+
+async def legacy_extract(html: str, base_url: str, page: dict) -> list[dict]:
+    """
+    Прежняя логика parse_news_data/parse_item для одной страницы.
+    """
+    async def aclear(text):
+        return clear_text(text)
+
+    soup = BeautifulSoup(html, 'html.parser')
+    container = soup.select_one(page.get('container'))
+    if container is None:
+        return []
+    news_list = []
+    for item in container.select(page.get('item_selector')):
+        news = {}
+        for key, selector_conf in page['selectors'].items():
+            if isinstance(selector_conf, dict):
+                element = item.select_one(selector_conf.get("selector"))
+                news[key] = element.get(selector_conf.get("attribute"), element.text.strip()) if element else None
+            else:
+                element = item.select_one(selector_conf)
+                news[key] = element.text.strip() if element else None
+                if news[key] is not None:
+                    news[key] = await aclear(news[key])
+        news['link'] = urllib.parse.urljoin(base_url, news.get('link') or '')
+        news_list.append(news)
+    return news_list
+
+
+def synthetic_page(items: int) -> str:
+    """
+    Страница в разметке mmcs.sfedu.ru: шапка, меню и контейнер новостей.
+    """
+    menu = "".join(f'<li><a href="/m{i}">Раздел {i}</a></li>' for i in range(200))
+    news = "".join(
+        f'<div class="news_item_f"><h2 class="article_title">Новость {i}</h2>'
+        f'<div class="newsitem_info"><span class="createdate">0{i % 9 + 1}.05.2025</span>'
+        f'<span class="createby">Автор</span></div>'
+        f'<div class="newsitem_text">{"Текст новости. " * 40}</div>'
+        f'<a class="btn" href="/news/{i}">Подробнее</a></div>'
+        for i in range(items)
+    )
+    return (f'<html><head><title>МехМат</title>{"<script>var x = 1;</script>" * 20}</head><body>'
+            f'<ul class="menu">{menu}</ul><div class="yjsg-newsitems">{news}</div>'
+            f'<footer>{"<p>подвал</p>" * 100}</footer></body></html>')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", help="Каталог с сохранёнными страницами <сайт>.html")
+    parser.add_argument("--items", type=int, default=10, help="Новостей на синтетической странице")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=["html.parser", "lxml", "html5lib"])
+    args = parser.parse_args()
+
+    config = asyncio.run(load_config(CONFIG_PATH))
+    plan = ParsingPlan(config)
+
+    cases = []  # (html, план страницы, исходная конфигурация страницы)
+    for site, pages in plan.news_pages.items():
+        if not pages:
+            continue
+        if args.fixtures:
+            fixture = path.join(args.fixtures, f"{site}.html")
+            if not path.exists(fixture):
+                continue
+            with open(fixture, encoding="utf-8") as f:
+                html = f.read()
+        elif site == "MMCS":
+            html = synthetic_page(args.items)
+        else:
+            continue
+        cases.append((html, pages[0], config["websites"][site]["pages"]["news"][0]))
+    if not cases:
+        raise SystemExit(f"Нет фикстур в {args.fixtures}: ожидаются {sorted(plan.news_pages)}.html")
+
+    def report(name: str, run) -> None:
+        items = 0
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            items += run()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<32} {items / elapsed:10.0f} новостей/с {elapsed / args.repeat * 1000:8.1f} мс/проход")
+
+    print(f"Страниц: {len(cases)}, файлов: {', '.join(sorted(listdir(args.fixtures))) if args.fixtures else 'синтетика'}")
+    report("прежний (html.parser)", lambda: sum(
+        len(asyncio.run(legacy_extract(html, page.base_url, conf))) for html, page, conf in cases
+    ))
+    for backend in args.backends:
+        if resolve_backend(backend) != backend:
+            continue
+        report(f"план, {backend}", lambda: sum(len(page.extract(html, backend)) for html, page, _ in cases))
+        strainers = [page.strainer for _, page, _ in cases]
+        for _, page, _ in cases:
+            page.strainer = None
+        report(f"план, {backend}, всё дерево", lambda: sum(len(page.extract(html, backend)) for html, page, _ in cases))
+        for (_, page, _), strainer in zip(cases, strainers):
+            page.strainer = strainer
+
+
+if __name__ == "__main__":
+    main()
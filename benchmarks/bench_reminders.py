@@ -0,0 +1,104 @@
+"""
+Бенчмарк напоминаний о дедлайнах на тысячах групп и заданий:
+опрос каждой группы по таймеру (один запрос на группу за тик) против планировщика
+с кучей (ReminderScheduler): загрузка очереди, постановка задания и отправка пачки наступивших.
+
+База - временный файл (DB_URL задаётся до импорта модулей бота), отправка сообщений - заглушка.
+
+Запуск:
+    python -m benchmarks.bench_reminders --groups 3000 --homeworks-per-group 8 --due 5000
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DB_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')}")
+
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert
+
+from bot_api.Database import async_session
+from bot_api.Database.models import Base, Group, Homework
+from bot_api.Database.engine import engine, ENGINES
+from bot_api.reminders import ReminderScheduler
+
+
+async def poll_every_group(remind_before: timedelta) -> int:
+    # Прежний подход: по таймеру обойти все группы и в каждой поискать наступившие напоминания
+    now, due = datetime.now(), 0
+    async with async_session() as session:
+        group_ids = (await session.execute(select(Group.id))).scalars().all()
+        for group_id in group_ids:
+            result = await session.execute(
+                select(Homework.id).where(Homework.group_id == group_id, Homework.reminded.is_(False),
+                                          Homework.due_at <= now + remind_before)
+            )
+            due += len(result.all())
+    return due
+
+
+async def run(args) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rnd = random.Random(0)
+    now = datetime.now()
+    scheduler = ReminderScheduler(remind_before=3600, send_rate=10 ** 6)
+    async with async_session() as session:
+        await session.execute(insert(Group), [
+            {"group_tg_id": tg_id, "tg_link": "link", "group_name": "ПМИ", "group_course": 1, "group_number": tg_id}
+            for tg_id in range(args.groups)
+        ])
+        # Первые args.due заданий - с наступившим временем напоминания, остальные - в ближайшие недели
+        rows = []
+        for i in range(args.groups * args.homeworks_per_group):
+            due_at = now + (timedelta(minutes=30) if i < args.due else timedelta(hours=rnd.randint(2, 24 * 21)))
+            rows.append({"group_id": rnd.randrange(args.groups) + 1, "subject": "Предмет", "homework_data": "Задание",
+                         "due_at": due_at, "created_at": now, "reminded": False})
+        await session.execute(insert(Homework), rows)
+        await session.commit()
+    print(f"Групп: {args.groups}, заданий: {len(rows)}, наступивших напоминаний: {args.due}")
+
+    started = time.perf_counter()
+    await poll_every_group(scheduler.remind_before)
+    print(f"{'опрос всех групп, один тик':<36} {(time.perf_counter() - started) * 1000:9.1f} мс")
+
+    started = time.perf_counter()
+    queued = await scheduler.load()
+    print(f"{'куча: загрузка очереди':<36} {(time.perf_counter() - started) * 1000:9.1f} мс  ({queued} заданий)")
+
+    started = time.perf_counter()
+    for i in range(10_000):
+        scheduler.schedule(10 ** 9 + i, now + timedelta(days=30, seconds=i))
+    print(f"{'куча: schedule() одного задания':<36} {(time.perf_counter() - started) / 10_000 * 1e6:9.2f} мкс")
+
+    messages = 0
+
+    async def send(chat_id: int, text: str) -> None:
+        nonlocal messages
+        messages += 1
+
+    started = time.perf_counter()
+    reminded = await scheduler.run_due(send)
+    print(f"{'куча: отправка наступивших':<36} {(time.perf_counter() - started) * 1000:9.1f} мс  "
+          f"({reminded} заданий, {messages} сообщений)")
+    print(f"{'куча: запросов к БД между напоминаниями':<36} {0:9d}")
+
+    for db_engine in ENGINES:
+        await db_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=3000)
+    parser.add_argument("--homeworks-per-group", type=int, default=8)
+    parser.add_argument("--due", type=int, default=5000, help="Заданий с наступившим напоминанием")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
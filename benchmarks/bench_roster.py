@@ -0,0 +1,70 @@
+"""
+Бенчмарк загрузки списка группы: по одному /add_student на студента (SELECT группы
+и своя транзакция на каждого) против add_students_bulk (один INSERT на весь список).
+
+База - временный файл, у каждого способа свой набор групп.
+
+Запуск:
+    python -m benchmarks.bench_roster --groups 20 --students 30
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot_api.Database.models import Base
+from bot_api.Database.requests import add_group, add_student, add_students_bulk
+
+
+async def run(args) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        for tg_id in range(2 * args.groups):
+            await add_group(session, tg_id, "ПМИ", 1, tg_id, "link")
+        await session.commit()
+
+    queries = [0]
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *_: queries.__setitem__(0, queries[0] + 1))
+
+    def roster(tg_id: int) -> list[tuple[str, str]]:
+        return [(f"@student_{tg_id}_{i}", f"Фамилия{i} Имя{i}") for i in range(args.students)]
+
+    async def one_by_one(tg_id: int) -> None:
+        # Как отдельные команды: каждая в своей сессии и транзакции
+        for username, full_name in roster(tg_id):
+            async with session_factory() as session:
+                await add_student(session, username, full_name, False, tg_id)
+                await session.commit()
+
+    async def bulk(tg_id: int) -> None:
+        async with session_factory() as session:
+            await add_students_bulk(session, tg_id, roster(tg_id))
+            await session.commit()
+
+    print(f"Групп: {args.groups}, студентов в списке: {args.students}")
+    for name, load, offset in (("по одному", one_by_one, 0), ("одним списком", bulk, args.groups)):
+        queries[0] = 0
+        started = time.perf_counter()
+        for tg_id in range(offset, offset + args.groups):
+            await load(tg_id)
+        elapsed = (time.perf_counter() - started) / args.groups
+        print(f"{name:<16} {elapsed * 1000:8.1f} мс на список  {queries[0] / args.groups:6.1f} запросов")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--students", type=int, default=30)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Бенчмарк сборки расписания: прежний алгоритм (по группе, с перебором curricula
+для каждого занятия) против build_course_schedules (все группы курса за один проход).
+
+Запуск:
+    python -m benchmarks.bench_schedule --payload course4.json
+    python -m benchmarks.bench_schedule --groups 12 --lessons-per-group 40
+"""
+import json
+import time
+import random
+import argparse
+
+from bot_api.parsing.schedule_builder import build_course_schedules, parse_timeslot, format_day, DAYS
+
+
+def legacy_group_schedule(data: dict, group: str, number: int) -> dict[str, str] | None:
+    """
+    Прежняя логика parse_schedule для одной группы.
+    """
+    group_ids = [g['id'] for g in data['groups'] if g['name'] == group and g.get('grorder') == number]
+    if not group_ids:
+        return None
+
+    lessons = [lesson for lesson in data['lessons'] if lesson['groupid'] in group_ids]
+    schedule = {i: [] for i in range(6)}
+    for lesson in lessons:
+        slot = parse_timeslot(lesson['timeslot'])
+        if slot is None or slot[0] not in schedule:
+            continue
+        day_of_week, start_time, end_time = slot
+        for subnum in range(1, lesson['subcount'] + 1):
+            curriculum = next(
+                (c for c in data['curricula'] if c['lessonid'] == lesson['id'] and c['subnum'] == subnum),
+                None
+            )
+            if curriculum:
+                schedule[day_of_week].append({
+                    'start': start_time,
+                    'end': end_time,
+                    'subject': curriculum['subjectabbr'],
+                    'teacher': curriculum['teachername'],
+                    'room': curriculum['roomname'],
+                    'info': lesson['info']
+                })
+
+    for day_num in schedule:
+        schedule[day_num].sort(key=lambda x: x['start'])
+    return {DAYS[i]: format_day(schedule[i]) for i in schedule}
+
+
+def synthetic_payload(groups: int, lessons_per_group: int, seed: int = 0) -> dict:
+    """
+    Ответ API курса нужного размера: группы, занятия и по 1-2 учебных плана на занятие.
+    """
+    rnd = random.Random(seed)
+    times = ["08:00:00", "09:50:00", "11:55:00", "13:45:00", "15:50:00", "17:40:00"]
+    data = {'groups': [], 'lessons': [], 'curricula': []}
+    lesson_id = 0
+    for g in range(groups):
+        data['groups'].append({'id': g, 'name': ["ПМИ", "ФИИТ", "МОАИС"][g % 3], 'grorder': g // 3 + 1})
+        for _ in range(lessons_per_group):
+            lesson_id += 1
+            subcount = rnd.choice((1, 1, 2))
+            start = rnd.choice(times)
+            data['lessons'].append({
+                'id': lesson_id, 'groupid': g, 'subcount': subcount, 'info': '',
+                'timeslot': f"({rnd.randrange(6)},{start},{start},full)",
+            })
+            for subnum in range(1, subcount + 1):
+                data['curricula'].append({
+                    'lessonid': lesson_id, 'subnum': subnum, 'subjectabbr': f"предмет {lesson_id}",
+                    'teachername': f"преподаватель {rnd.randrange(50)}", 'roomname': str(rnd.randrange(100, 400)),
+                })
+    rnd.shuffle(data['curricula'])
+    return data
+
+
+def measure(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payload", help="Сохранённый JSON курса (ответ schedule.sfedu.ru)")
+    parser.add_argument("--groups", type=int, default=12)
+    parser.add_argument("--lessons-per-group", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = synthetic_payload(args.groups, args.lessons_per_group)
+
+    keys = list(dict.fromkeys((g['name'], g.get('grorder')) for g in data['groups']))
+    print(f"Групп: {len(keys)}, занятий: {len(data['lessons'])}, учебных планов: {len(data['curricula'])}")
+
+    built = build_course_schedules(data)
+    for name, number in keys:
+        assert built[(name, number)] == legacy_group_schedule(data, name, number), (name, number)
+
+    legacy = measure(lambda: [legacy_group_schedule(data, name, number) for name, number in keys], args.repeat)
+    indexed = measure(lambda: build_course_schedules(data), args.repeat)
+
+    print(f"{'прежний (все группы)':<24} {legacy * 1000:10.1f} мс")
+    print(f"{'индексный проход':<24} {indexed * 1000:10.1f} мс")
+    print(f"{'ускорение':<24} {legacy / indexed:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Бенчмарк индексов преподавателей и аудиторий (TimetableIndex) на тысячах групп:
+построение, интервальные запросы, поиск окон и инкрементальное обновление одной группы.
+
+Данные - синтетические ответы API по курсам (см. bench_schedule).
+
+Запуск:
+    python -m benchmarks.bench_timetable --courses 4 --groups 750 --lessons-per-group 40
+"""
+import time
+import random
+import argparse
+import statistics
+
+from bot_api.timetable_index import TimetableIndex, describe_teacher, describe_room
+from bot_api.parsing.schedule_builder import build_course_lessons
+from benchmarks.bench_schedule import synthetic_payload
+
+
+def measure(name: str, call, repeat: int) -> None:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(f"{name:<32} p50 {statistics.median(latencies) * 1e6:8.1f} мкс  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:8.1f} мкс")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--groups", type=int, default=750, help="Групп на курс")
+    parser.add_argument("--lessons-per-group", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    courses = {course: build_course_lessons(synthetic_payload(args.groups, args.lessons_per_group, seed=course))
+               for course in range(1, args.courses + 1)}
+
+    index = TimetableIndex()
+    started = time.perf_counter()
+    for course, lessons in courses.items():
+        index.replace_course(course, lessons)
+    print(f"Построение: {time.perf_counter() - started:.2f} с, {index.stats()}")
+
+    teachers = [index.teachers.display(key) for key in index.teachers.find("преподаватель")]
+    rooms = [index.rooms.display(key) for key in list(index.rooms._buckets)]
+    groups = [(course, name, number) for course, lessons in courses.items() for name, number in lessons]
+    moment = lambda: (random.randrange(6), random.randrange(8 * 60, 20 * 60))
+
+    measure("преподаватель: at()", lambda: index.teachers.at(
+        random.choice(teachers).lower(), *moment()), args.repeat)
+    measure("преподаватель: поиск + ответ", lambda: describe_teacher(
+        random.choice(teachers), *moment(), index=index), args.repeat)
+    measure("аудитория: поиск + ответ", lambda: describe_room(
+        random.choice(rooms), *moment(), index=index), args.repeat)
+    measure("окна двух групп", lambda: index.free_slots(
+        random.sample(groups, 2), random.randrange(6)), args.repeat)
+
+    def refresh_group():
+        course, name, number = random.choice(groups)
+        lessons = [dict(lesson, room=str(random.randrange(100, 400))) for lesson in courses[course][(name, number)]]
+        index.replace_group((course, name, number), lessons)
+    measure("обновление одной группы", refresh_group, min(args.repeat, 200))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,87 @@
+import time
+_STARTED = time.perf_counter()
+
 import asyncio
+import logging
+from contextlib import contextmanager
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from config import API_TG
+from config import (API_TG, deepseek_api, warm_up_on_start, schedule_sync_interval, news_poll_interval,
+                    db_reset_on_start)
 
 from bot_ui.handlers.menu       import menu_router
 from bot_ui.commands.base       import base_router
 from bot_ui.commands.management import management_router
 from bot_ui.commands.requests   import requests_router
+from bot_ui.middlewares         import DbSessionMiddleware, CommitBeforeRequestMiddleware
+
+from bot_api.Database.models import engine, Base, upgrade_schema
+from bot_api.Database.engine import ENGINES
+from bot_api.AI.embedding_manager import KNOWLEDGE_BASE, EMBEDDINGS
+from bot_api.AI.agent import INTENT_ROUTER
+from bot_api.parsing.http_client import HTTP
+from bot_api.schedule_sync import SCHEDULE_SYNC
+from bot_api.news_poller import NEWS_POLLER
+from bot_api.reminders import REMINDERS
+
+
+class StartupReport:
+    """
+    Отчёт о времени запуска по фазам.
+
+    :param started: Момент старта процесса (time.perf_counter)
+    """
+    def __init__(self, started: float):
+        self.started = started
+        self._last = started
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, name: str) -> None:
+        """
+        Закрывает фазу, длившуюся с предыдущей отметки.
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Замеряет отдельный блок (например, фоновый прогрев).
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
 
-from bot_api.Database.models import engine, Base
+    def report(self, title: str) -> None:
+        lines = [f"{title}:"]
+        lines += [f"  {name:<30} {seconds * 1000:8.0f} мс" for name, seconds in self.phases]
+        lines.append(f"  {'всего с запуска':<30} {(time.perf_counter() - self.started) * 1000:8.0f} мс")
+        try:
+            import resource
+            lines.append(f"  {'пиковая память':<30} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024:8d} МБ")
+        except ImportError:
+            pass
+        print("\n".join(lines))
+
+
+STARTUP = StartupReport(_STARTED)
+STARTUP.mark("импорт модулей")
 
 
 async def init_db():
     """
     Создаёт все таблицы из описанных в Base.metadata,
-    если они ещё не существуют.
+    если они ещё не существуют. Таблицы прежней схемы сначала обновляются (upgrade_schema).
     """
     async with engine.begin() as conn:
+        recreated = await conn.run_sync(upgrade_schema)
         await conn.run_sync(Base.metadata.create_all)
+    if recreated:
+        print(f"Пересозданы таблицы прежней схемы: {', '.join(recreated)}")
     print("База данных инициализирована")
 
 
@@ -32,21 +95,71 @@ async def drop_db():
     print("База данных очищена")
 
 
+async def warm_up():
+    """
+    Фоновый прогрев после старта polling: FAISS-индекс, модель эмбеддингов
+    и эмбеддинги примеров роутера. Без прогрева всё это загрузится при первом /bot.
+    """
+    with STARTUP.phase("прогрев: FAISS-индекс"):
+        try:
+            await KNOWLEDGE_BASE.load()
+        except FileNotFoundError as e:
+            print(f"{e}. Индекс будет загружен, когда появится на диске")
+    with STARTUP.phase("прогрев: модель эмбеддингов"):
+        await asyncio.to_thread(EMBEDDINGS.warm_up)
+    with STARTUP.phase("прогрев: роутер интентов"):
+        await INTENT_ROUTER.warm_up()
+    STARTUP.report("Прогрев завершён")
+
+
 async def main():
-    await drop_db()
+    logging.basicConfig(level=logging.INFO)
+    background: list[asyncio.Task] = []
+
+    if db_reset_on_start:
+        await drop_db()
     await init_db()
+    STARTUP.mark("инициализация БД")
 
     bot = Bot(token=API_TG)
+    # Запись апдейта фиксируется до ответа в Telegram: соединение писателя не ждёт сеть
+    bot.session.middleware(CommitBeforeRequestMiddleware())
     storage = MemoryStorage()
     dp = Dispatcher(storage=storage)
+    # Одна сессия БД на апдейт: группа и студент находятся один раз для всех фильтров
+    dp.update.outer_middleware(DbSessionMiddleware())
 
     dp.include_router(menu_router)
     dp.include_router(base_router)
     dp.include_router(management_router)
     dp.include_router(requests_router)
+    STARTUP.mark("бот и роутеры")
+
+    @dp.startup()
+    async def on_startup():
+        # Проверка каталога индекса на новые сборки
+        background.append(asyncio.create_task(KNOWLEDGE_BASE.watch()))
+        if schedule_sync_interval > 0:
+            background.append(asyncio.create_task(SCHEDULE_SYNC.watch(schedule_sync_interval)))
+        if news_poll_interval > 0:
+            background.append(asyncio.create_task(NEWS_POLLER.watch(news_poll_interval)))
+        # Напоминания о дедлайнах: цикл спит до ближайшего напоминания
+        background.append(asyncio.create_task(REMINDERS.watch(bot.send_message)))
+        if warm_up_on_start:
+            background.append(asyncio.create_task(warm_up()))
+        STARTUP.mark("запуск polling")
+        STARTUP.report("Бот запущен")
 
     # 3) Запускаем polling
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        for task in background:
+            task.cancel()
+        await deepseek_api.close()
+        await HTTP.close()
+        for db_engine in ENGINES:
+            await db_engine.dispose()
 
 if __name__ == "__main__":
     asyncio.run(main())
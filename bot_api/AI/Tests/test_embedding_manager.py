@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+
+from bot_api.AI.embedding_manager import EmbeddingIndex, INDEX_FILES, current_index_dir, publish_embedding_db
+
+
+class FakeDb:
+    """
+    Сборка индекса: save_local пишет файлы с меткой сборки.
+    """
+    index = type("Index", (), {"ntotal": 1})
+
+    def __init__(self, tag: str):
+        self.tag = tag
+
+    def save_local(self, path: str) -> None:
+        os.makedirs(path)
+        for name in INDEX_FILES:
+            with open(os.path.join(path, name), "w") as f:
+                f.write(self.tag)
+
+
+@pytest.fixture
+def fake_faiss(monkeypatch):
+    # Загрузка читает метку из обоих файлов: сборки не должны смешиваться
+    def load_local(path, embeddings, allow_dangerous_deserialization=False):
+        tags = {open(os.path.join(path, name)).read() for name in INDEX_FILES}
+        assert len(tags) == 1
+        return FakeDb(tags.pop())
+
+    monkeypatch.setattr(FAISS, "load_local", staticmethod(load_local))
+
+
+def test_publish_switches_pointer(tmp_path):
+    faiss_path = str(tmp_path / "faiss_index")
+    FakeDb("legacy").save_local(faiss_path)
+    assert current_index_dir(faiss_path) == faiss_path
+
+    first = publish_embedding_db(FakeDb("a"), faiss_path)
+    assert current_index_dir(faiss_path) == first
+    second = publish_embedding_db(FakeDb("b"), faiss_path)
+    third = publish_embedding_db(FakeDb("c"), faiss_path)
+
+    # Остаются текущая и предыдущая сборки
+    assert current_index_dir(faiss_path) == third
+    assert sorted(os.listdir(tmp_path)) == sorted(["faiss_index.current", os.path.basename(second),
+                                                   os.path.basename(third)])
+
+
+@pytest.mark.asyncio
+async def test_reload_new_build(tmp_path, fake_faiss):
+    faiss_path = str(tmp_path / "faiss_index")
+    index = EmbeddingIndex(faiss_path, embeddings=None)
+    with pytest.raises(FileNotFoundError):
+        await index.load()
+
+    reloads = []
+    index.on_reload(lambda: reloads.append(1))
+    publish_embedding_db(FakeDb("a"), faiss_path)
+    assert (await index.get()).tag == "a"
+    assert not await index.reload_if_changed()
+
+    publish_embedding_db(FakeDb("b"), faiss_path)
+    assert await index.reload_if_changed()
+    assert (await index.get()).tag == "b"
+    assert len(reloads) == 2
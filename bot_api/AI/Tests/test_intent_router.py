@@ -0,0 +1,80 @@
+import pytest
+
+from bot_api.AI.models.models import IntentBlock
+from bot_api.AI.intent_router import IntentRouter, extract_days
+
+
+class FakeEmbeddings:
+    """
+    Эмбеддинги примеров задаются словарём текст -> вектор.
+    """
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors[text] for text in texts]
+
+
+@pytest.fixture
+def router():
+    block = IntentBlock(threshold=0.8, margin=0.1, intents={
+        "get_schedule": ["расписание", "какие пары"],
+        "get_homework": ["что задали"],
+        "other": ["привет"],
+    })
+    return IntentRouter(block, FakeEmbeddings({
+        "расписание": [1, 0, 0, 0], "какие пары": [0.96, 0.28, 0, 0],
+        "что задали": [0.6, 0.8, 0, 0], "привет": [0, 0, 0, 1],
+    }))
+
+
+@pytest.mark.parametrize("text, days", [
+    ("расписание на понедельник", ["понедельник"]),
+    ("пары во вторник и в среду", ["вторник", "среда"]),
+    ("что в среду, а что в четверг", ["среда", "четверг"]),
+    ("Пятницу и субботу покажи", ["пятница", "суббота"]),
+    ("есть ли пары в воскресенье", ["воскресенье"]),
+    ("расписание на сегодня и завтра", ["сегодня", "завтра"]),
+    ("а послезавтра?", ["послезавтра"]),
+    ("пары 15.05 и 1.6.2025", ["15.05", "1.6.2025"]),
+    ("в среду, потом снова в среду", ["среда"]),
+    ("расписание на неделю", []),
+    ("средний балл", []),
+])
+def test_extract_days(text, days):
+    assert extract_days(text) == days
+
+
+@pytest.mark.asyncio
+async def test_route_confident(router):
+    assert await router.route("пары в пятницу", [1, 0, 0, 0]) == ("get_schedule", {"ds": ["пятница"]})
+    assert await router.route("что задали", [0, 1, 0, 0]) == ("get_homework", {})
+    assert router.stats()["routed"] == {"get_schedule": 1, "get_homework": 1}
+
+
+@pytest.mark.asyncio
+async def test_route_fallbacks(router):
+    # Ниже порога: ближайший пример - «расписание», сходство 0.7
+    assert await router.route("???", [0.7, 0, 0.714, 0]) is None
+    # Выше порога (0.96), но второй интент слишком близко (0.936)
+    assert await router.route("???", [0.8, 0.6, 0, 0]) is None
+    # Уверенно, но интент «прочее»
+    assert await router.route("привет", [0, 0, 0, 1]) is None
+    assert router.stats()["fallbacks"] == 3 and router.stats()["routed"] == {}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_when_block_changes():
+    embeddings = FakeEmbeddings({"расписание": [1, 0], "что задали": [0, 1]})
+    current = [IntentBlock(threshold=0.8, margin=0.1, intents={"get_schedule": ["расписание"], "other": ["что задали"]})]
+    router = IntentRouter(lambda: current[0], embeddings)
+
+    assert await router.route("что задали", [0, 1]) is None
+    assert await router.route("что задали", [0, 1]) is None
+    assert router.stats()["rebuilds"] == 0
+
+    # Реестр вернул новый блок (файл изменился) - примеры пересчитываются
+    current[0] = IntentBlock(threshold=0.8, margin=0.1, intents={"get_schedule": ["расписание"],
+                                                                  "get_homework": ["что задали"]})
+    assert await router.route("что задали", [0, 1]) == ("get_homework", {})
+    assert router.stats()["rebuilds"] == 1
@@ -0,0 +1,74 @@
+import numpy as np
+
+from bot_api.AI import semantic_cache
+from bot_api.AI.semantic_cache import SemanticCache
+
+
+def unit(*values) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_threshold():
+    cache = SemanticCache(threshold=0.9)
+    cache.store(1, unit(1, 0), "экзамен в 10:00")
+
+    assert cache.lookup(1, unit(1, 0.1)) == "экзамен в 10:00"    # cos ~ 0.995
+    assert cache.lookup(1, unit(1, 1)) is None                   # cos ~ 0.707
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_best_match_and_group_isolation():
+    cache = SemanticCache(threshold=0.5)
+    cache.store(1, unit(1, 0), "первый")
+    cache.store(1, unit(0, 1), "второй")
+
+    assert cache.lookup(1, unit(0.2, 1)) == "второй"
+    assert cache.lookup(2, unit(0, 1)) is None
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    cache = SemanticCache(ttl=60)
+    cache.store(1, unit(1, 0), "ответ")
+
+    now[0] += 59
+    assert cache.lookup(1, unit(1, 0)) == "ответ"
+    now[0] += 2
+    assert cache.lookup(1, unit(1, 0)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    cache = SemanticCache(max_size=2)
+    cache.store(1, unit(1, 0, 0), "a")
+    cache.store(1, unit(0, 1, 0), "b")
+    assert cache.lookup(1, unit(1, 0, 0)) == "a"    # "a" использован позже "b"
+
+    cache.store(2, unit(0, 0, 1), "c")
+    assert cache.stats()["size"] == 2
+    assert cache.lookup(1, unit(0, 1, 0)) is None
+    assert cache.lookup(1, unit(1, 0, 0)) == "a"
+    assert cache.lookup(2, unit(0, 0, 1)) == "c"
+
+
+def test_invalidate_group():
+    cache = SemanticCache()
+    cache.store(1, unit(1, 0), "ДЗ группы 1")
+    cache.store(2, unit(1, 0), "ДЗ группы 2")
+
+    cache.invalidate_group(1)
+    assert cache.lookup(1, unit(1, 0)) is None
+    assert cache.lookup(2, unit(1, 0)) == "ДЗ группы 2"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_clear():
+    cache = SemanticCache()
+    cache.store(1, unit(1, 0), "a")
+    cache.store(2, unit(0, 1), "b")
+
+    cache.clear()
+    assert cache.lookup(1, unit(1, 0)) is None and cache.lookup(2, unit(0, 1)) is None
+    assert cache.stats()["size"] == 0
@@ -1,4 +1,11 @@
-from .models import AIModelAPI, AIModelLocal
+from .models import AIModelAPI
+
+
+def __getattr__(name):
+    if name == "AIModelLocal":
+        from .models import AIModelLocal
+        return AIModelLocal
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ['AIModelAPI', 'AIModelLocal']
@@ -1,23 +1,30 @@
 import inspect
 import re
 import json
+import time
 import asyncio
-from pydantic import BaseModel
 from os import path
+from typing import AsyncIterator, TYPE_CHECKING
+from pydantic import BaseModel
 
-from bot_api.AI.embedding_manager import get_best_match, load_embedding_db
+from bot_api.AI.embedding_manager import KNOWLEDGE_BASE, embed_query
+from bot_api.AI.semantic_cache import SemanticCache
+from bot_api.AI.intent_router import IntentRouter
 
 from bot_api.AI.models.class_ai_api import AIModelAPI
-from bot_api.AI.models.class_ai_local import AIModelLocal
-from bot_api.AI.models.models import InstructionBlock, LLMRequest
-from bot_api.AI.models.instructions_loader import load_instruction
+from bot_api.AI.models.models import InstructionBlock, IntentBlock, LLMRequest, PrePrompt
+from bot_api.AI.models.instructions_loader import load_instruction, INSTRUCTIONS
+
+from bot_api.AI.functions import (get_schedule, get_homework, get_news, get_events, search_homework,
+                                  get_deadlines, find_teacher, find_room, get_free_slots)
+from bot_api.Database import on_group_update
 
-from bot_api.AI.functions import get_schedule, get_homework, get_news, get_events
+if TYPE_CHECKING:
+    from bot_api.AI.models.class_ai_local import AIModelLocal
 
 
-BASE_DIR = path.dirname(path.abspath(__file__))
-CACHE_DIR = path.join(BASE_DIR, "embeddings_data")
-FAISS_PATH = path.join(CACHE_DIR, "faiss_index")
+INSTRUCTIONS_PATH = path.join(path.dirname(path.abspath(__file__)), "models", "instructions", "instructions.json")
+INTENTS_PATH = path.join(path.dirname(path.abspath(__file__)), "models", "instructions", "intents.json")
 _FUNCTION_REGISTRY = {}
 
 def register(func=None, *, defaults=None):
@@ -94,14 +101,39 @@ class FunctionCall(BaseModel):
         return result
 
 
-from config import deepseek_api
+from config import deepseek_api, answer_cache_threshold, answer_cache_ttl, answer_cache_size
 MODEL = deepseek_api
-PATH = 'C:\\Users\\Admin\\PycharmProjects\\TG_bot\\bot_api\\AI\\models\\instructions\\instructions_news.json'
+PATH = path.join(path.dirname(path.abspath(__file__)), "models", "instructions", "instructions_news.json")
 
 register(get_schedule, defaults={'ds': []})
 register(get_homework, defaults={'group_id': 0})
 register(get_events,   defaults={'group_id': 0})
+register(search_homework, defaults={'group_id': 0})
+register(get_deadlines, defaults={'group_id': 0})
 register(get_news,     defaults={'model': MODEL, 'path_to_instructions': PATH})
+register(find_teacher)
+register(find_room)
+register(get_free_slots, defaults={'group_id': 0})
+
+# Результаты этих функций зависят только от данных группы - их можно кэшировать.
+# Расписание (сегодня/завтра) и новости зависят от времени и не кэшируются.
+_CACHEABLE_FUNCTIONS = {'get_homework', 'get_events'}
+
+ANSWER_CACHE = SemanticCache(threshold=answer_cache_threshold, ttl=answer_cache_ttl, max_size=answer_cache_size)
+
+# Примеры интентов - из реестра: правка intents.json подхватывается без перезапуска
+INTENT_ROUTER = IntentRouter(lambda: INSTRUCTIONS.get(INTENTS_PATH, IntentBlock))
+
+
+@on_group_update
+def _invalidate_answers(group_tg_id: int, field: str) -> None:
+    ANSWER_CACHE.invalidate_group(group_tg_id)
+
+
+# Свободные ответы LLM построены на чанках базы знаний - после её пересборки они устарели
+@KNOWLEDGE_BASE.on_reload
+def _clear_answers() -> None:
+    ANSWER_CACHE.clear()
 
 
 def for_silly_answer(s: str) -> str:
@@ -111,41 +143,143 @@ def for_silly_answer(s: str) -> str:
 
 
 class Agent:
-    def __init__(self, model: AIModelAPI | AIModelLocal, instructions: InstructionBlock):
+    def __init__(self, model: "AIModelAPI | AIModelLocal", instructions: InstructionBlock,
+                 pre_prompt: PrePrompt | None = None):
         self.model = model
         self.instructions = instructions
+        # Готовый PrePrompt из реестра INSTRUCTIONS, иначе строится из instructions
+        self.pre_prompt = pre_prompt
 
-    async def run(self, user_input: str, group_id: int) -> str:
-        pre = self.instructions.to_pre_prompt()
+    @classmethod
+    def from_registry(cls, model: "AIModelAPI | AIModelLocal", path_to_instructions: str = INSTRUCTIONS_PATH) -> "Agent":
+        """
+        Агент с инструкциями из реестра: без чтения файла и валидации на каждый запрос.
+        """
+        return cls(model,
+                   INSTRUCTIONS.get(path_to_instructions, InstructionBlock),
+                   INSTRUCTIONS.pre_prompt(path_to_instructions, InstructionBlock))
+
+    async def _build_request(self, user_input: str, embedding: list[float]) -> LLMRequest:
+        pre = self.pre_prompt or self.instructions.to_pre_prompt()
         task = f"Запрос от пользователя:\n{user_input}"
 
-        db = await load_embedding_db(FAISS_PATH)
-        best_match = await get_best_match(db, user_input)
+        best_match = await KNOWLEDGE_BASE.best_match(user_input, embedding=embedding)
         matches = (f"Инструкция для дополнительная информация:\n"
                    f"Если запрос не подходит по инструкциям но хоть как то связан со следующей "
                    f"информацией - вот дополнительные данные по нему для генерации ответа:\n{best_match}"
                    f"\n**ВАЖНО** вывод для ДАННОГО варианта твоего ответа НЕ НУЖНО форматировать.\n\n"
                    f"Основная задача:\n")
 
-        request = LLMRequest(role_instructions=pre, task=matches + task)
+        return LLMRequest(role_instructions=pre, task=matches + task)
+
+    def _prepare_call(self, call: FunctionCall, group_id: int) -> FunctionCall:
+        func, defaults = _FUNCTION_REGISTRY[call.name]
+        for k, v in defaults.items():
+            call.arguments.setdefault(k, v)
+
+        if "group_id" in inspect.signature(func).parameters:
+            call.arguments["group_id"] = group_id
+
+        return call
 
-        raw = await self.model.get_response(request)
+    async def _execute(self, call: FunctionCall, group_id: int) -> tuple[str, bool]:
+        """
+        Выполняет вызов функции.
 
-        if "function_call" in raw:
-            cleaned = for_silly_answer(raw)
-            print(cleaned)
-            call = FunctionCall.parse_response(cleaned)
+        :return: Результат функции и признак того, что его можно положить в кэш
+        """
+        call = self._prepare_call(call, group_id)
+        return await call.run(), call.name in _CACHEABLE_FUNCTIONS
 
-            func, defaults = _FUNCTION_REGISTRY[call.name]
-            for k, v in defaults.items():
-                call.arguments.setdefault(k, v)
+    async def _answer(self, raw: str, group_id: int) -> tuple[str, bool]:
+        """
+        Превращает сырой ответ модели в ответ пользователю.
 
-            if "group_id" in inspect.signature(func).parameters:
-                call.arguments["group_id"] = group_id
+        :return: Ответ и признак того, что его можно положить в кэш
+        """
+        if "function_call" not in raw:
+            return raw, True
 
-            return await call.run()
+        cleaned = for_silly_answer(raw)
+        print(cleaned)
+        return await self._execute(FunctionCall.parse_response(cleaned), group_id)
 
-        return raw
+    async def _route(self, user_input: str, embedding: list[float], group_id: int) -> tuple[str, bool] | None:
+        """
+        Пытается ответить без LLM: локальный роутер сразу вызывает функцию.
+
+        :return: Ответ и признак кэшируемости или None, если нужен LLM
+        """
+        routed = await INTENT_ROUTER.route(user_input, embedding)
+        if routed is None:
+            return None
+
+        name, arguments = routed
+        return await self._execute(FunctionCall(name=name, arguments=arguments), group_id)
+
+    async def run(self, user_input: str, group_id: int) -> str:
+        embedding = await embed_query(user_input)
+        cached = ANSWER_CACHE.lookup(group_id, embedding)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        routed = await self._route(user_input, embedding, group_id)
+        if routed is not None:
+            answer, cacheable = routed
+        else:
+            request = await self._build_request(user_input, embedding)
+            raw = await self.model.get_response(request)
+            answer, cacheable = await self._answer(raw, group_id)
+
+        if cacheable:
+            ANSWER_CACHE.store(group_id, embedding, answer, time.perf_counter() - started)
+        return answer
+
+    async def stream(self, user_input: str, group_id: int) -> AsyncIterator[str]:
+        """
+        Потоковая версия run: отдаёт накопленный текст ответа по мере генерации.
+
+        Если ответ начинается как JSON (или блок кода) - это вызов функции,
+        поток придерживается и вместо него отдаётся результат функции.
+
+        :param user_input: Запрос пользователя
+        :param group_id: Telegram ID группы
+        :return: Асинхронный итератор по актуальному тексту ответа
+        """
+        embedding = await embed_query(user_input)
+        cached = ANSWER_CACHE.lookup(group_id, embedding)
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.perf_counter()
+        routed = await self._route(user_input, embedding, group_id)
+        if routed is not None:
+            answer, cacheable = routed
+            yield answer
+            if cacheable:
+                ANSWER_CACHE.store(group_id, embedding, answer, time.perf_counter() - started)
+            return
+
+        request = await self._build_request(user_input, embedding)
+
+        text = ""
+        withheld = None
+        async for delta in self.model.stream_response(request):
+            text += delta
+            head = text.lstrip()
+            if withheld is None and head:
+                withheld = head[0] in "{`"
+            if withheld is False:
+                yield text
+
+        answer, cacheable = await self._answer(text, group_id)
+        if answer != text or withheld is not False:
+            yield answer
+
+        if cacheable:
+            ANSWER_CACHE.store(group_id, embedding, answer, time.perf_counter() - started)
 
 '''
 async def main():
@@ -1,9 +1,9 @@
-import os, re, json
+import os, re, json, time, shutil, asyncio, logging, hashlib
 
-from langchain.schema import Document
-from langchain.text_splitter import TokenTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from typing import TYPE_CHECKING
+
+from bot_api.AI.embeddings import CPUEmbeddings
+from config import embeddings_device, embeddings_runtime, embeddings_threads
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,35 +14,84 @@ MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 JSON_PATH = os.path.join(BASE_DIR, "embeddings_data", "json_data", "sfedu_mmcs_data.json")
 FAISS_PATH = os.path.join(CACHE_DIR, "faiss_index")
 
-EMBEDDINGS = HuggingFaceEmbeddings(
+EMBEDDINGS = CPUEmbeddings(
     model_name=MODEL_NAME,
-    model_kwargs={"device": "cuda"},
-    encode_kwargs={"normalize_embeddings": True},
+    runtime=embeddings_runtime,
+    device=embeddings_device,
+    threads=embeddings_threads,
     cache_folder=CACHE_DIR
 )
 
+INDEX_FILES = ("index.faiss", "index.pkl")
+
+# LangChain и FAISS тяжёлые - импортируются при первой сборке/загрузке индекса
+if TYPE_CHECKING:
+    from langchain.schema import Document
+    from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger(__name__)
+
+
+def current_index_dir(faiss_path: str) -> str | None:
+    """
+    Каталог текущей сборки индекса.
+
+    Сборки лежат в версионных каталогах рядом с faiss_path ("faiss_index.<сборка>"),
+    а текущая указана в файле faiss_path + ".current" (он подменяется атомарно, см. publish_embedding_db).
+    Без указателя используется сам faiss_path - раскладка до версионных сборок.
+
+    :param faiss_path: Путь к faiss_index
+    :return: Путь к каталогу сборки или None, если индекса нет на диске
+    """
+    try:
+        with open(faiss_path + ".current", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        name = ""
+    path = os.path.join(os.path.dirname(faiss_path), name) if name else faiss_path
+    if all(os.path.exists(os.path.join(path, file)) for file in INDEX_FILES):
+        return path
+    return None
+
+
+def chunk_id(text: str) -> str:
+    """
+    Идентификатор чанка - хэш его содержимого.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 def build_embedding_db(
     json_path: str,
     faiss_path: str,
     chunk_size: int = 500,
-    chunk_overlap: int = 50
-) -> FAISS:
+    chunk_overlap: int = 50,
+    force: bool = False
+) -> "FAISS":
     """
     Гибридная нарезка:
     1. Разбиваем разделы по параграфам \n\n.
     2. Если параграф короче chunk_size токенов — берём целиком.
     3. Иначе пробуем группировать по предложениям (~chunk_size токенов).
     4. Если после группировки параграф всё ещё больше — дробим на чанки еще меньше.
-    Сохраняем все чанки в FAISS.
+
+    Сборка инкрементальная: ID чанка в FAISS - хэш его текста. Если индекс уже есть,
+    эмбеддинги считаются только для новых/изменённых чанков, исчезнувшие удаляются,
+    остальные векторы переиспользуются.
 
     :param json_path: Путь к данным для перевода в эмбеддинги
     :param faiss_path: Путь для сохранения векторной базы
     :param chunk_size: Размер чанка для нарезания
     :param chunk_overlap: Погрешность для нарезки
+    :param force: Пересобрать индекс с нуля
 
     :return: Векторная база
     """
+    from langchain.schema import Document
+    from langchain.text_splitter import TokenTextSplitter
+    from langchain_community.vectorstores import FAISS
+
+    started = time.perf_counter()
     with open(json_path, "r", encoding="utf-8") as f:
         entries = json.load(f)
 
@@ -86,22 +135,90 @@ def build_embedding_db(
                             for chunk in splitter.split_text(sch):
                                 docs.append(Document(page_content=header + chunk))
 
-    db = FAISS.from_documents(docs, EMBEDDINGS)
-    db.save_local(faiss_path)
+    chunks = {chunk_id(doc.page_content): doc for doc in docs}
+
+    db = None
+    current = None if force else current_index_dir(faiss_path)
+    if current is not None:
+        db = FAISS.load_local(current, EMBEDDINGS, allow_dangerous_deserialization=True)
+
+    if db is None:
+        db = FAISS.from_documents(list(chunks.values()), EMBEDDINGS, ids=list(chunks))
+        added, removed = list(chunks), []
+    else:
+        existing = set(db.index_to_docstore_id.values())
+        removed = [cid for cid in existing if cid not in chunks]
+        added = [cid for cid in chunks if cid not in existing]
+        if removed:
+            db.delete(removed)
+        if added:
+            db.add_documents([chunks[cid] for cid in added], ids=added)
+
+    if added or removed:
+        publish_embedding_db(db, faiss_path)
+
+    logger.info("FAISS-индекс собран за %.1f с: +%d, -%d, без изменений %d",
+                time.perf_counter() - started, len(added), len(removed), len(chunks) - len(added))
     return db
 
 
-async def load_embedding_db(faiss_path: str) -> FAISS:
+def publish_embedding_db(db: "FAISS", faiss_path: str) -> str:
+    """
+    Атомарно публикует индекс: сохраняет его в новый версионный каталог и переключает
+    на него указатель faiss_path + ".current" (os.replace). Загрузчик в любой момент видит
+    либо прежнюю, либо новую сборку целиком, файлы разных сборок не смешиваются.
+    Предыдущая сборка остаётся на диске для загрузок, начатых до переключения, более старые удаляются.
+
+    :param db: Векторная база для сохранения
+    :param faiss_path: Путь к faiss_index
+    :return: Путь к каталогу новой сборки
+    """
+    directory, base = os.path.split(faiss_path)
+    previous = current_index_dir(faiss_path)
+
+    build = f"{base}.{time.time_ns()}"
+    build_path = os.path.join(directory, build)
+    db.save_local(build_path)
+
+    pointer_tmp = faiss_path + ".current.tmp"
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(build)
+    os.replace(pointer_tmp, faiss_path + ".current")
+
+    keep = {build_path, previous}
+    stale = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name == base or (name.startswith(base + ".") and name[len(base) + 1:].isdigit())]
+    for path in stale:
+        if path not in keep and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return build_path
+
+
+async def load_embedding_db(faiss_path: str) -> "FAISS":
     """
     Загружает FAISS-индекс
 
     :param faiss_path: Путь к faiss_index
     :return: faiss_index
     """
-    return FAISS.load_local(faiss_path, EMBEDDINGS, allow_dangerous_deserialization=True)
+    from langchain_community.vectorstores import FAISS
+    path = current_index_dir(faiss_path)
+    if path is None:
+        raise FileNotFoundError(f"FAISS-индекс не найден: {faiss_path}")
+    return FAISS.load_local(path, EMBEDDINGS, allow_dangerous_deserialization=True)
+
+
+async def embed_query(query: str) -> list[float]:
+    """
+    Считает эмбеддинг запроса вне цикла событий (одновременные запросы считаются одним батчем).
+
+    :param query: Строка запроса
+    :return: Нормализованный вектор
+    """
+    return await EMBEDDINGS.aembed_query(query)
 
 
-async def get_best_match(db: FAISS, query: str) -> str:
+async def get_best_match(db: "FAISS", query: str) -> str:
     """
     Возвращает текст самого релевантного чанка по запросу.
 
@@ -113,6 +230,213 @@ async def get_best_match(db: FAISS, query: str) -> str:
     return results[0].page_content if results else "Ничего не найдено"
 
 
+class EmbeddingIndex:
+    """
+    Долгоживущий держатель FAISS-индекса на весь процесс.
+
+    Индекс загружается один раз и подменяется целиком, когда в faiss_path появляется
+    новая сборка. Поиски, начатые до подмены, дорабатывают на старом объекте.
+
+    :param faiss_path: Путь к каталогу faiss_index
+    :param embeddings: Модель эмбеддингов для запросов
+    """
+    def __init__(self, faiss_path: str, embeddings=EMBEDDINGS):
+        self.faiss_path = faiss_path
+        self.embeddings = embeddings
+
+        self._db: "FAISS | None" = None
+        self._signature = None
+        self._lock = asyncio.Lock()
+        self._reload_listeners = []
+
+        self.load_time = 0.0
+        self.loaded_at = None
+        self.reloads = 0
+        self.searches = 0
+        self.search_time = 0.0
+        self.last_search_time = 0.0
+
+
+    def _read_signature(self) -> tuple | None:
+        """
+        Отпечаток текущей сборки: её каталог, mtime и размер файлов. None, если индекса нет на диске.
+        """
+        path = current_index_dir(self.faiss_path)
+        if path is None:
+            return None
+        signature = [path]
+        for name in INDEX_FILES:
+            try:
+                st = os.stat(os.path.join(path, name))
+            except FileNotFoundError:
+                return None
+            signature.append((st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+
+    async def _load_locked(self) -> "FAISS":
+        from langchain_community.vectorstores import FAISS
+
+        # Указатель на сборку читается один раз: все файлы берутся из одного каталога
+        signature = self._read_signature()
+        if signature is None:
+            raise FileNotFoundError(f"FAISS-индекс не найден: {self.faiss_path}")
+
+        started = time.perf_counter()
+        db = await asyncio.to_thread(
+            FAISS.load_local, signature[0], self.embeddings, allow_dangerous_deserialization=True
+        )
+        self.load_time = time.perf_counter() - started
+
+        # Подмена ссылки атомарна: текущие поиски держат старый объект
+        self._db = db
+        self._signature = signature
+        self.loaded_at = time.time()
+        for listener in self._reload_listeners:
+            listener()
+
+        logger.info("FAISS-индекс загружен за %.0f мс: %d векторов, %d байт",
+                    self.load_time * 1000, db.index.ntotal, self.size_bytes())
+        return db
+
+
+    def on_reload(self, func):
+        """
+        Декоратор для регистрации обработчика загрузки новой сборки индекса.
+        Обработчик вызывается как func() после подмены индекса.
+        """
+        self._reload_listeners.append(func)
+        return func
+
+
+    async def load(self) -> "FAISS":
+        """
+        Загружает (или перезагружает) индекс с диска.
+
+        :return: Загруженный индекс
+        """
+        async with self._lock:
+            return await self._load_locked()
+
+
+    async def get(self) -> "FAISS":
+        """
+        Возвращает текущий индекс, загружая его при первом обращении.
+        """
+        db = self._db
+        if db is None:
+            async with self._lock:
+                if self._db is None:
+                    await self._load_locked()
+            db = self._db
+        return db
+
+
+    async def reload_if_changed(self) -> bool:
+        """
+        Перезагружает индекс, если на диске появилась новая сборка.
+
+        :return: True, если индекс был подменён
+        """
+        signature = self._read_signature()
+        if signature is None or signature == self._signature:
+            return False
+
+        async with self._lock:
+            if self._read_signature() == self._signature:
+                return False
+            await self._load_locked()
+            self.reloads += 1
+        return True
+
+
+    async def watch(self, interval: float = 30.0) -> None:
+        """
+        Фоновая задача: периодически проверяет каталог индекса и подменяет индекс при изменении.
+
+        :param interval: Период проверки в секундах
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_if_changed()
+            except Exception:
+                logger.exception("Не удалось перезагрузить FAISS-индекс")
+
+
+    async def search(self, query: str, k: int = 2, embedding: list[float] | None = None) -> list["Document"]:
+        """
+        Поиск k ближайших чанков по запросу. Не блокирует цикл событий.
+
+        :param query: Строка для поиска совпадений
+        :param k: Количество результатов
+        :param embedding: Готовый эмбеддинг запроса (чтобы не считать его повторно)
+        :return: Список документов
+        """
+        db = await self.get()
+
+        started = time.perf_counter()
+        if embedding is None:
+            results = await asyncio.to_thread(db.similarity_search, query, k)
+        else:
+            results = await asyncio.to_thread(db.similarity_search_by_vector, embedding, k)
+        elapsed = time.perf_counter() - started
+
+        self.searches += 1
+        self.search_time += elapsed
+        self.last_search_time = elapsed
+        return results
+
+
+    async def best_match(self, query: str, embedding: list[float] | None = None) -> str:
+        """
+        Возвращает текст самого релевантного чанка по запросу.
+
+        :param query: Строка для поиска совпадений
+        :param embedding: Готовый эмбеддинг запроса (опционально)
+        :return: Наилучшее совпадение в векторной базе по строке
+        """
+        try:
+            results = await self.search(query, embedding=embedding)
+        except FileNotFoundError:
+            return "Ничего не найдено"
+        return results[0].page_content if results else "Ничего не найдено"
+
+
+    def size_bytes(self) -> int:
+        """
+        Размер файлов индекса на диске.
+        """
+        total = 0
+        path = current_index_dir(self.faiss_path) or self.faiss_path
+        for name in INDEX_FILES:
+            try:
+                total += os.path.getsize(os.path.join(path, name))
+            except OSError:
+                pass
+        return total
+
+
+    def stats(self) -> dict:
+        """
+        Метрики индекса: время загрузки, размер и задержка поиска.
+        """
+        db = self._db
+        return {
+            "loaded": db is not None,
+            "vectors": db.index.ntotal if db is not None else 0,
+            "size_bytes": self.size_bytes(),
+            "load_time_ms": self.load_time * 1000,
+            "reloads": self.reloads,
+            "searches": self.searches,
+            "avg_search_ms": self.search_time / self.searches * 1000 if self.searches else 0.0,
+            "last_search_ms": self.last_search_time * 1000,
+        }
+
+
+KNOWLEDGE_BASE = EmbeddingIndex(FAISS_PATH)
+
+
 '''
 # Создание векторной базы и тест
 async def main():
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+
+class CPUEmbeddings(Embeddings):
+    """
+    Эмбеддинги sentence-transformers, рассчитанные на CPU.
+
+    Совместимы с интерфейсом LangChain (FAISS, embed_query/embed_documents).
+    Одновременные aembed_query собираются в один батч и считаются одним вызовом модели.
+    Модель (и torch) загружается при первом обращении или при warm_up().
+
+    :param model_name: Имя модели sentence-transformers
+    :param runtime: Среда выполнения: "torch", "int8" (динамическая int8-квантизация) или "onnx"
+    :param device: Устройство (по умолчанию "cpu")
+    :param threads: Число потоков torch (None - значение по умолчанию)
+    :param batch_size: Максимальный размер батча
+    :param max_wait: Сколько секунд ждать попутные запросы перед расчётом батча
+    :param cache_folder: Каталог кэша моделей
+    """
+    RUNTIMES = ("torch", "int8", "onnx")
+
+    def __init__(self, model_name: str, runtime: str = "torch", device: str = "cpu",
+                 threads: int | None = None, batch_size: int = 32, max_wait: float = 0.005,
+                 cache_folder: str | None = None):
+        if runtime not in self.RUNTIMES:
+            raise ValueError(f"Неизвестная среда выполнения эмбеддингов: {runtime!r}, ожидается одна из {self.RUNTIMES}")
+
+        self.model_name = model_name
+        self.runtime = runtime
+        self.device = device
+        self.threads = threads
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.cache_folder = cache_folder
+
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flusher: asyncio.Task | None = None
+        self.batches = 0
+        self.batched_queries = 0
+
+        self._model = None
+        self._model_lock = threading.Lock()
+
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+
+    def warm_up(self) -> None:
+        """
+        Загружает модель заранее, чтобы первый запрос не ждал загрузки.
+        """
+        _ = self.model
+
+
+    def _load(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+
+        if self.runtime == "onnx":
+            return SentenceTransformer(self.model_name, device=self.device, backend="onnx",
+                                       cache_folder=self.cache_folder)
+
+        model = SentenceTransformer(self.model_name, device=self.device, cache_folder=self.cache_folder)
+        if self.runtime == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._encode(list(texts))
+
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0]
+
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """
+        Эмбеддинг запроса с микробатчингом: запросы, пришедшие одновременно, считаются одним батчем.
+
+        :param text: Строка запроса
+        :return: Нормализованный вектор
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush())
+        return await future
+
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.max_wait)
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+
+            try:
+                vectors = await asyncio.to_thread(self._encode, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.batched_queries += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+
+    def stats(self) -> dict:
+        """
+        Метрики микробатчинга: число батчей и средний размер батча.
+        """
+        return {
+            "runtime": self.runtime,
+            "device": self.device,
+            "batches": self.batches,
+            "avg_batch": self.batched_queries / self.batches if self.batches else 0.0,
+        }
@@ -2,10 +2,16 @@ import datetime
 
 from bot_api.AI.models import AIModelAPI
 from bot_api.AI.models.models import InstructionBlockNews, LLMRequest, PrePrompt
-from bot_api.AI.models.instructions_loader import load_instruction
+from bot_api.AI.models.instructions_loader import INSTRUCTIONS
 
-from bot_api.Database import async_session, get_group_field
-from bot_api.parsing import parse_news_data
+from bot_api.Database import (async_session, get_group_field, get_group_lessons, search_notes, get_group_homeworks,
+                              headline_hash, get_news_relevance, save_news_relevance)
+from bot_api.Database.group_cache import GROUP_CACHE
+from bot_api.parsing.schedule_builder import render_schedule
+from bot_api.parsing.parsers import format_notes, format_homeworks
+from bot_api.timetable_index import (TIMETABLE, parse_group, resolve_moment,
+                                     describe_teacher, describe_room, describe_free_slots)
+from bot_api.news_poller import NEWS_POLLER
 
 from bot_api.AI.embedding_manager import get_best_match, load_embedding_db
 
@@ -43,10 +49,10 @@ async def get_schedule(ds: list[str], group_id: int):
 
     # Загрузка расписания из БД
     async with async_session() as session:
-        raw = await get_group_field(session, group_id, 'schedule')
-    if not isinstance(raw, dict):
+        lessons = await get_group_lessons(session, group_id)
+    if not lessons:
         return "Расписание для группы ещё не загружено."
-    sched = {day.lower(): text for day, text in raw.items()}
+    sched = render_schedule(lessons)
 
     # Определение дней из "Дано"
     days = []
@@ -104,51 +110,163 @@ async def get_events(group_id: int) -> str:
             f"\n{events}")
 
 
-async def get_news(model: AIModelAPI, path_to_instructions: str) -> str:
+async def search_homework(group_id: int, query: str, kind: str = "") -> str:
     """
-    Функция запроса на события к БД по group_id
+    Поиск по истории ДЗ и событий группы (полнотекстовый индекс, ранжирование BM25)
 
-    :param model: Модель ИИ (по API или локальная)
+    :param group_id: id группы
+    :param query: Слова запроса
+    :param kind: "homework", "events" или пусто - искать везде
+    :return: Строка с найденными записями, сначала самые релевантные
+    """
+    async with async_session() as session:
+        notes = await search_notes(session, group_id, query, kind=kind or None, limit=5)
+    return format_notes(notes, query)
 
-    :return: Строка с новостями университета и факультета
+
+async def get_deadlines(group_id: int) -> str:
+    """
+    Функция запроса на задания с дедлайнами к БД по group_id
+
+    :param group_id: id группы
+    :return: Строка с ближайшими дедлайнами группы
+    """
+    async with async_session() as session:
+        homeworks = await get_group_homeworks(session, group_id)
+    return format_homeworks(homeworks)
+
+
+async def find_teacher(teacher: str, day: str = "", time: str = "") -> str:
+    """
+    Где преподаватель: текущее и следующее занятие (по индексу преподавателей).
+
+    :param teacher: Фамилия преподавателя
+    :param day: День недели, "сегодня" или "завтра" (по умолчанию - сегодня)
+    :param time: Время "13:45" (по умолчанию - сейчас)
+    :return: Строка с занятиями преподавателя
+    """
+    return describe_teacher(teacher, *resolve_moment(day, time))
+
+
+async def find_room(room: str, day: str = "", time: str = "") -> str:
     """
-    news = await parse_news_data()
+    Свободна ли аудитория (по индексу аудиторий).
 
-    instructions = load_instruction(path_to_instructions, InstructionBlockNews)
-    instructions = instructions.to_pre_prompt()
+    :param room: Номер аудитории
+    :param day: День недели, "сегодня" или "завтра" (по умолчанию - сегодня)
+    :param time: Время "13:45" (по умолчанию - сейчас)
+    :return: Строка с состоянием аудитории
+    """
+    return describe_room(room, *resolve_moment(day, time))
+
+
+async def get_free_slots(group_id: int, groups: list[str] = None, day: str = "") -> str:
+    """
+    Общие окна группы чата и указанных групп.
+
+    :param group_id: Telegram ID группы чата
+    :param groups: Другие группы ("ФИИТ-2", "ПМИ-1-3")
+    :param day: День недели, "сегодня" или "завтра" (по умолчанию - сегодня)
+    :return: Строка с общими окнами
+    """
+    async with async_session() as session:
+        group = await GROUP_CACHE.get(session, group_id)
+    if group is None:
+        return "Группа не найдена."
+
+    keys = TIMETABLE.find_groups(group.group_name, group.group_number, group.group_course)
+    for token in groups or []:
+        parsed = parse_group(token, group.group_course)
+        found = TIMETABLE.find_groups(*parsed) if parsed else []
+        if not found:
+            return f"Группа «{token}» не найдена в расписании."
+        keys += found
+    if not keys:
+        return "Расписание группы ещё не загружено."
+    return describe_free_slots(list(dict.fromkeys(keys)), resolve_moment(day)[0])
+
+
+# Метрики фильтра новостей: сколько заголовков взято из кэша и сколько отправлено в LLM
+NEWS_FILTER_STATS = {
+    "headlines": 0,
+    "cached": 0,
+    "classified": 0,
+    "llm_calls": 0,
+    "llm_failures": 0,
+}
+
+
+async def filter_news(model: AIModelAPI, instructions: PrePrompt, news_list: list[dict]) -> str:
+    """
+    Фильтрует и возвращает новости, актуальные для студентов.
 
+    Решения о релевантности кэшируются в БД по хэшу заголовка, в LLM одним запросом
+    уходят только заголовки, которые ещё не оценивались.
 
-    async def filter_news(model: AIModelAPI, instructions: PrePrompt, news_list: list[dict]):
-        """
-        Фильтрует и возвращает новости, актуальные для студентов
+    :param model: Модель ИИ, которая обрабатывает новости по релевантности студентам
+    :param instructions: Инструкции классификатора
+    :param news_list: Список новостей (каждая новость — словарь с ключами: title, date, text, link, image)
+    :return: Строка с заголовками и ссылками релевантных новостей, разделённая двумя переводами строки
+    """
+    entries = []
+    for new in news_list:
+        title = (new.get('title') or "").strip()
+        if not title:
+            continue
+        link = (new.get('link') or "").strip()
+        entries.append((headline_hash(title), title, f"{title}\n{link}"))
+
+    # Короткие сессии: соединение не удерживается, пока ждём ответ LLM
+    async with async_session() as session:
+        decisions = await get_news_relevance(session, [h for h, _, _ in entries])
 
-        :param model: Модель ИИ, которая обрабатывает новости по релевантности студентам
-        :param news_list: Список новостей (каждая новость — словарь с ключами: title, date, text, link, image)
-        :return: Строка с заголовками и ссылками релевантных новостей, разделённая двумя переводами строки
-        """
+    unknown = {}
+    for h, title, _ in entries:
+        if h not in decisions:
+            unknown.setdefault(h, title)
 
-        # Собираем вход для модели и параллельно data_news
-        to_process = "\nНиже представлены 26 НОВОСТНЫХ ЗАГОЛОВКОВ ДЛЯ ОБРАБОТКИ:\n"
-        data_news = []
-        for new in news_list:
-            title = (new.get('title') or "").strip()
-            link = (new.get('link') or "").strip()
-            entry = f"{title}\n{link}"
+    NEWS_FILTER_STATS["headlines"] += len(entries)
+    NEWS_FILTER_STATS["cached"] += len(entries) - sum(1 for h, _, _ in entries if h in unknown)
 
-            data_news.append(entry)
-            to_process += title + "\n\n"
+    if unknown:
+        to_process = f"\nНиже представлены {len(unknown)} НОВОСТНЫХ ЗАГОЛОВКОВ ДЛЯ ОБРАБОТКИ:\n"
+        to_process += "".join(title + "\n\n" for title in unknown.values())
 
         request = LLMRequest(role_instructions=instructions, task=to_process)
         relevant = await model.get_response(request)
-        bits = relevant.strip()
+        NEWS_FILTER_STATS["llm_calls"] += 1
+        if relevant is None:
+            # LLM недоступен: непроверенные новости показываются, решения не кэшируются
+            NEWS_FILTER_STATS["llm_failures"] += 1
+            bits = []
+            decisions.update(dict.fromkeys(unknown, True))
+        else:
+            bits = [bit for bit in relevant.strip() if bit in '01']
+
+        new_decisions = {h: bit == '1' for h, bit in zip(unknown, bits)}
+        decisions.update(new_decisions)
+        # Сохраняем, только если ответ однозначно сопоставляется с заголовками
+        if bits and len(bits) == len(unknown):
+            NEWS_FILTER_STATS["classified"] += len(new_decisions)
+            async with async_session() as session:
+                await save_news_relevance(session, new_decisions)
+                await session.commit()
+
+    return "\n\n".join(entry for h, _, entry in entries if decisions.get(h))
+
+
+async def get_news(model: AIModelAPI, path_to_instructions: str) -> str:
+    """
+    Функция запроса новостей, актуальных для студентов
 
-        selected = []
-        for bit, entry in zip(bits, data_news):
-            if bit == '1':
-                selected.append(entry)
+    :param model: Модель ИИ (по API или локальная)
+    :param path_to_instructions: Путь к инструкциям классификатора новостей
 
-        return "\n\n".join(selected)
+    :return: Строка с новостями университета и факультета
+    """
+    news = await NEWS_POLLER.latest()
 
+    instructions = INSTRUCTIONS.pre_prompt(path_to_instructions, InstructionBlockNews)
 
     relevant_news = await filter_news(model=model, instructions=instructions, news_list=news)
 
@@ -0,0 +1,165 @@
+import re
+import time
+import asyncio
+from typing import Callable
+
+import numpy as np
+
+from bot_api.AI.embedding_manager import EMBEDDINGS
+from bot_api.AI.models.models import IntentBlock
+
+
+FALLBACK_INTENT = "other"
+
+# Формы дней недели в запросе -> именительный падеж, который понимает get_schedule
+_DAY_PATTERNS = [
+    (r"понедельник\w*", "понедельник"),
+    (r"вторник\w*", "вторник"),
+    (r"сред[аеуы]", "среда"),
+    (r"четверг\w*", "четверг"),
+    (r"пятниц\w*", "пятница"),
+    (r"суббот\w*", "суббота"),
+    (r"воскресень\w*", "воскресенье"),
+    (r"послезавтра", "послезавтра"),
+    (r"завтра", "завтра"),
+    (r"сегодня", "сегодня"),
+]
+_DAY_RE = re.compile(
+    r"\b(?:" + "|".join(f"(?P<d{i}>{p})" for i, (p, _) in enumerate(_DAY_PATTERNS)) + r")\b"
+    r"|\b(?P<date>\d{1,2}\.\d{1,2}(?:\.\d{4})?)\b",
+    flags=re.IGNORECASE
+)
+
+
+def extract_days(text: str) -> list[str]:
+    """
+    Достаёт из запроса дни для get_schedule в порядке упоминания.
+
+    :param text: Запрос пользователя
+    :return: Список токенов ("понедельник", "завтра", "15.05" и т.п.), пустой - вся неделя
+    """
+    days = []
+    for m in _DAY_RE.finditer(text):
+        if m.group("date"):
+            token = m.group("date")
+        else:
+            index = int(m.lastgroup[1:])
+            token = _DAY_PATTERNS[index][1]
+        if token not in days:
+            days.append(token)
+    return days
+
+
+class IntentRouter:
+    """
+    Локальный классификатор запросов по эмбеддингам MiniLM.
+
+    Запрос сравнивается с размеченными примерами из intents.json; если ближайший
+    интент - функция и уверенность выше порога, функция вызывается без LLM.
+
+    Блок можно передать функцией (например, из реестра INSTRUCTIONS): когда она вернёт
+    новый объект (файл изменился), эмбеддинги примеров пересчитываются.
+
+    :param block: Размеченные примеры и пороги или функция, возвращающая текущий блок
+    :param embeddings: Модель эмбеддингов (та же, что у FAISS-индекса)
+    """
+    def __init__(self, block: IntentBlock | Callable[[], IntentBlock], embeddings=EMBEDDINGS):
+        self._source = block if callable(block) else (lambda: block)
+        self.embeddings = embeddings
+
+        # Примеры считаются для конкретного блока: (блок, метки, матрица эмбеддингов)
+        self._built: tuple[IntentBlock, list[str], np.ndarray] | None = None
+        self._lock = asyncio.Lock()
+
+        self.routed: dict[str, int] = {}
+        self.fallbacks = 0
+        self.classify_time = 0.0
+        self.rebuilds = 0
+
+
+    @property
+    def block(self) -> IntentBlock:
+        return self._source()
+
+
+    async def _prototypes(self, block: IntentBlock) -> tuple[list[str], np.ndarray]:
+        built = self._built
+        if built is None or built[0] is not block:
+            async with self._lock:
+                built = self._built
+                if built is None or built[0] is not block:
+                    labels, texts = [], []
+                    for label, examples in block.intents.items():
+                        labels.extend([label] * len(examples))
+                        texts.extend(examples)
+                    vectors = await asyncio.to_thread(self.embeddings.embed_documents, texts)
+                    if self._built is not None:
+                        self.rebuilds += 1
+                    built = self._built = (block, labels, np.asarray(vectors, dtype=np.float32))
+        return built[1], built[2]
+
+
+    async def warm_up(self) -> None:
+        """
+        Заранее считает эмбеддинги размеченных примеров.
+        """
+        await self._prototypes(self.block)
+
+
+    async def classify(self, embedding: list[float], block: IntentBlock | None = None) -> tuple[str, float, float]:
+        """
+        Определяет интент запроса.
+
+        :param embedding: Нормализованный эмбеддинг запроса
+        :param block: Блок примеров (по умолчанию - текущий)
+        :return: Интент, сходство с ближайшим примером и отрыв от второго интента
+        """
+        labels, matrix = await self._prototypes(block or self.block)
+        scores = matrix @ np.asarray(embedding, dtype=np.float32)
+
+        best: dict[str, float] = {}
+        for label, score in zip(labels, scores.tolist()):
+            if score > best.get(label, -1.0):
+                best[label] = score
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        label, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        return label, score, score - runner_up
+
+
+    async def route(self, user_input: str, embedding: list[float]) -> tuple[str, dict] | None:
+        """
+        Подбирает функцию для запроса, если уверенность достаточна.
+
+        :param user_input: Запрос пользователя
+        :param embedding: Нормализованный эмбеддинг запроса
+        :return: Имя функции и аргументы или None (запрос уходит в LLM)
+        """
+        block = self.block
+        started = time.perf_counter()
+        label, score, margin = await self.classify(embedding, block)
+        self.classify_time += time.perf_counter() - started
+
+        if label == FALLBACK_INTENT or score < block.threshold or margin < block.margin:
+            self.fallbacks += 1
+            return None
+
+        self.routed[label] = self.routed.get(label, 0) + 1
+        arguments = {"ds": extract_days(user_input)} if label == "get_schedule" else {}
+        return label, arguments
+
+
+    def stats(self) -> dict:
+        """
+        Метрики роутера: сколько запросов обработано без LLM и время классификации.
+        """
+        routed = sum(self.routed.values())
+        total = routed + self.fallbacks
+        return {
+            "routed": dict(self.routed),
+            "fallbacks": self.fallbacks,
+            "routed_share": routed / total if total else 0.0,
+            "avg_classify_ms": self.classify_time / total * 1000 if total else 0.0,
+            "rebuilds": self.rebuilds,
+        }
@@ -1,3 +1,10 @@
 from .class_ai_api import AIModelAPI
-from .class_ai_local import  AIModelLocal
 from .instructions import *
+
+
+def __getattr__(name):
+    # AIModelLocal тянет torch и transformers - импортируем только по требованию
+    if name == "AIModelLocal":
+        from .class_ai_local import AIModelLocal
+        return AIModelLocal
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
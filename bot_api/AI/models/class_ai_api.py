@@ -1,36 +1,108 @@
-from openai import OpenAI
+import asyncio
+from typing import AsyncIterator
+
+import httpx
+from openai import AsyncOpenAI
 from .models import LLMRequest
+from bot_api.single_flight import SingleFlight
 
 
 class AIModelAPI:
     """
     Класс для взаимодействия с моделью ИИ через API.
 
+    Один экземпляр на процесс: внутри общий пул HTTP-соединений с keep-alive,
+    поэтому запросы из разных групп выполняются параллельно и не открывают новых соединений.
+    Одинаковые одновременные запросы (тот же промпт и параметры) выполняются один раз.
+
     :param api: API ключ для доступа к сервису.
     :param url: URL сервера API.
     :param model_name: Имя модели, к которой осуществляется обращение.
+    :param max_concurrency: Максимум одновременных запросов к модели.
+    :param timeout: Таймаут одного запроса в секундах.
+    :param max_connections: Размер пула HTTP-соединений.
+    :param keepalive_expiry: Время жизни простаивающего соединения в секундах.
     """
-    def __init__(self, api: str, url: str, model_name: str):
+    def __init__(self, api: str, url: str, model_name: str,
+                 max_concurrency: int = 8, timeout: float = 60.0,
+                 max_connections: int = 20, keepalive_expiry: float = 30.0):
         self.api = api
         self.url = url
         self.model_name = model_name
-        self.client = OpenAI(api_key=self.api, base_url=self.url)
+        self.timeout = timeout
 
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(timeout, connect=10.0)
+        )
+        self.client = AsyncOpenAI(api_key=self.api, base_url=self.url,
+                                  http_client=self.http_client, timeout=timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.flight = SingleFlight()
 
-    async def get_response(self, request: LLMRequest, temperature: float = 0.1) -> str | None:
+
+    async def get_response(self, request: LLMRequest, temperature: float = 0.1,
+                           timeout: float | None = None) -> str | None:
         """
         Генерирует ответ на запрос через API ИИ.
 
         :param request: Запрос пользователя.
         :param temperature: Параметр случайности генерации.
+        :param timeout: Таймаут запроса в секундах (по умолчанию - таймаут клиента).
 
         :return: Строка с ответом, сгенерированным моделью.
         """
+        key = (self.model_name, temperature, request.model_dump_json())
+        return await self.flight.do(key, lambda: self._complete(request, temperature, timeout))
+
+
+    async def _complete(self, request: LLMRequest, temperature: float, timeout: float | None) -> str | None:
         prompt = request.to_prompt()
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=prompt,
-            temperature=temperature,
-            stream=False
-        )
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=prompt,
+                temperature=temperature,
+                stream=False,
+                timeout=timeout if timeout is not None else self.timeout
+            )
         return response.choices[0].message.content
+
+
+    async def stream_response(self, request: LLMRequest, temperature: float = 0.1,
+                              timeout: float | None = None) -> AsyncIterator[str]:
+        """
+        Генерирует ответ на запрос через API ИИ потоково.
+
+        :param request: Запрос пользователя.
+        :param temperature: Параметр случайности генерации.
+        :param timeout: Таймаут запроса в секундах (по умолчанию - таймаут клиента).
+
+        :return: Асинхронный итератор по фрагментам (дельтам) ответа.
+        """
+        prompt = request.to_prompt()
+        async with self._semaphore:
+            stream = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=prompt,
+                temperature=temperature,
+                stream=True,
+                timeout=timeout if timeout is not None else self.timeout
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+
+
+    async def close(self) -> None:
+        """
+        Закрывает пул HTTP-соединений.
+        """
+        await self.client.close()
@@ -17,7 +17,7 @@ BNB_4BIT_CONFIG = BitsAndBytesConfig(
 
 class AIModelLocal:
     def __init__(self, model_name: str, tokenizer = None, quantization_config = None,
-                 dtype: torch.dtype = torch.bfloat16, trust_remote_code: bool = False, device = None):
+                 dtype: torch.dtype | None = None, trust_remote_code: bool = False, device = None):
         """
         Класс для инициализации модели ИИ по параметрам:
 
@@ -31,7 +31,7 @@ class AIModelLocal:
         self.model_name = model_name
         self.tokenizer = tokenizer if tokenizer is not None else AutoTokenizer.from_pretrained(model_name)
         self.quantization_config = quantization_config
-        self.dtype = dtype
+        self.dtype = dtype if dtype is not None else torch.bfloat16
         self.trust_remote_code = trust_remote_code
         self.device = device if device is not None else ("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -2,6 +2,9 @@ from os import path
 from json import load
 from bot_api.AI.models.models import InstructionBlock
 from bot_api.AI.models.models import InstructionBlockNews
+from bot_api.AI.models.models import IntentBlock
+from bot_api.AI.models.models import PrePrompt
+from bot_api.file_cache import FileCache
 
 
 def is_file_is_correct(path_to_file: str, file_format: str, is_file: bool = True, is_correct: bool = True) -> None:
@@ -18,12 +21,12 @@ def is_file_is_correct(path_to_file: str, file_format: str, is_file: bool = True
         raise ValueError(f"Ожидаемый формат файла - \"{file_format}\", получен - {format_of_file}")
 
 
-def load_instruction(json_instruction_path: str, data_type) -> InstructionBlock | InstructionBlockNews:
+def load_instruction(json_instruction_path: str, data_type) -> InstructionBlock | InstructionBlockNews | IntentBlock:
     """
     Загружает JSON-файл инструкций и возвращает объект указанного класса блока инструкций.
 
     :param json_instruction_path: Путь к JSON-файлу инструкций.
-    :param data_type: Класс блока инструкций (InstructionBlock или InstructionBlockNews).
+    :param data_type: Класс блока инструкций (InstructionBlock, InstructionBlockNews или IntentBlock).
 
     :return: Экземпляр блока инструкций типа data_type.
     """
@@ -35,6 +38,50 @@ def load_instruction(json_instruction_path: str, data_type) -> InstructionBlock
     return data_type.model_validate(data)
 
 
+class InstructionRegistry:
+    """
+    Реестр инструкций: файл загружается и валидируется один раз, готовый PrePrompt
+    кэшируется. При изменении файла (mtime) инструкции перечитываются автоматически.
+
+    :param check_interval: Как часто проверять изменение файлов, сек
+    """
+    def __init__(self, check_interval: float = 1.0):
+        self._files = FileCache(check_interval)
+
+
+    def get(self, json_instruction_path: str, data_type):
+        """
+        Блок инструкций для текущей версии файла.
+
+        :param json_instruction_path: Путь к JSON-файлу инструкций
+        :param data_type: Класс блока инструкций
+        :return: Экземпляр data_type (один и тот же, пока файл не изменился)
+        """
+        return self._files.get(json_instruction_path, lambda p: load_instruction(p, data_type), kind=data_type)
+
+
+    def pre_prompt(self, json_instruction_path: str, data_type) -> PrePrompt:
+        """
+        Готовый PrePrompt для текущей версии файла.
+
+        :param json_instruction_path: Путь к JSON-файлу инструкций
+        :param data_type: Класс блока инструкций (InstructionBlock или InstructionBlockNews)
+        :return: PrePrompt
+        """
+        return self._files.get(
+            json_instruction_path,
+            lambda p: self.get(p, data_type).to_pre_prompt(),
+            kind=(data_type, "pre_prompt")
+        )
+
+
+    def stats(self) -> dict:
+        return self._files.stats()
+
+
+INSTRUCTIONS = InstructionRegistry()
+
+
 '''
 def main():
   
@@ -112,3 +112,9 @@ class InstructionBlockNews(BaseModel):
         )
 
         return PrePrompt(role=self.role, instructions=full_instructions)
+
+
+class IntentBlock(BaseModel):
+    threshold: float
+    margin: float
+    intents: dict[str, list[str]]
@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class _Entry:
+    __slots__ = ("group_id", "vector", "answer", "cost", "created")
+
+    def __init__(self, group_id: int, vector: np.ndarray, answer: str, cost: float):
+        self.group_id = group_id
+        self.vector = vector
+        self.answer = answer
+        self.cost = cost
+        self.created = time.monotonic()
+
+
+class SemanticCache:
+    """
+    Семантический кэш ответов на свободные вопросы.
+
+    Ключ - эмбеддинг запроса и group_id: перефразированный вопрос из той же группы
+    («когда экзамен» / «во сколько экзамен») получает сохранённый ответ без RAG и LLM.
+    Эмбеддинги должны быть нормализованы - тогда скалярное произведение равно косинусу.
+
+    :param threshold: Минимальное косинусное сходство для попадания
+    :param ttl: Время жизни записи в секундах
+    :param max_size: Максимум записей (вытесняются давно неиспользованные)
+    """
+    def __init__(self, threshold: float = 0.92, ttl: float = 3600.0, max_size: int = 2048):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._by_group: dict[int, set[int]] = {}
+        self._next_id = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.latency_saved = 0.0
+
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        ids = self._by_group.get(entry.group_id)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_group[entry.group_id]
+
+
+    def lookup(self, group_id: int, vector) -> str | None:
+        """
+        Ищет сохранённый ответ на похожий запрос той же группы.
+
+        :param group_id: Telegram ID группы
+        :param vector: Эмбеддинг запроса
+        :return: Ответ или None при промахе
+        """
+        now = time.monotonic()
+        query = np.asarray(vector, dtype=np.float32)
+
+        best_id, best_score = None, self.threshold
+        for entry_id in list(self._by_group.get(group_id, ())):
+            entry = self._entries[entry_id]
+            if now - entry.created > self.ttl:
+                self._remove(entry_id)
+                continue
+            score = float(np.dot(entry.vector, query))
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            return None
+
+        entry = self._entries[best_id]
+        self._entries.move_to_end(best_id)
+        self.hits += 1
+        self.latency_saved += entry.cost
+        return entry.answer
+
+
+    def store(self, group_id: int, vector, answer: str, cost: float = 0.0) -> None:
+        """
+        Сохраняет ответ.
+
+        :param group_id: Telegram ID группы
+        :param vector: Эмбеддинг запроса
+        :param answer: Ответ
+        :param cost: Сколько секунд занял ответ без кэша
+        """
+        entry_id = self._next_id
+        self._next_id += 1
+
+        self._entries[entry_id] = _Entry(group_id, np.asarray(vector, dtype=np.float32), answer, cost)
+        self._by_group.setdefault(group_id, set()).add(entry_id)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+
+    def invalidate_group(self, group_id: int) -> None:
+        """
+        Сбрасывает все ответы группы (например, после изменения ДЗ или событий).
+
+        :param group_id: Telegram ID группы
+        """
+        for entry_id in list(self._by_group.get(group_id, ())):
+            self._remove(entry_id)
+        self.invalidations += 1
+
+
+    def clear(self) -> None:
+        """
+        Сбрасывает все ответы (например, после пересборки базы знаний).
+        """
+        self._entries.clear()
+        self._by_group.clear()
+        self.invalidations += 1
+
+
+    def stats(self) -> dict:
+        """
+        Метрики кэша: размер, доля попаданий и сэкономленное время.
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "latency_saved_s": self.latency_saved,
+        }
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import select, text, Integer
+
+from bot_api.Database.models import Base, Group, Student
+from bot_api.Database.engine import make_engine, make_session_factory, sqlite_pragmas, is_read_only
+from bot_api.Database.requests import transactional_context, update_leader, search_notes, _SEARCH_NOTES
+
+
+@pytest.fixture
+async def routed(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'routing.sqlite3'}"
+    writer = make_engine(url, pragmas=sqlite_pragmas(), pool_size=1, max_overflow=0)
+    reader = make_engine(url, pragmas=sqlite_pragmas(read_only=True), pool_size=2, max_overflow=0)
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = make_session_factory(writer, reader)
+    async with session_factory() as session:
+        group = Group(group_tg_id=1, group_name="ПМИ", group_course=1, group_number=1, tg_link="link")
+        session.add(group)
+        await session.flush()
+        session.add_all([Student(student_username="@a", student_full_name="A", student_is_leader=True, group_id=group.id),
+                         Student(student_username="@b", student_full_name="B", student_is_leader=False, group_id=group.id)])
+        await session.commit()
+    yield session_factory, writer.sync_engine, reader.sync_engine
+    await writer.dispose()
+    await reader.dispose()
+
+
+async def test_select_goes_to_reader(routed):
+    session_factory, writer, reader = routed
+    async with session_factory() as session:
+        assert session.sync_session.get_bind(clause=select(Group)) is reader
+        assert (await session.execute(select(Group.group_name))).scalar_one() == "ПМИ"
+        assert "use_writer" not in session.info
+
+
+async def test_text_and_driver_sql_go_to_writer(routed):
+    # Соединения читателей открыты с query_only: text()/exec_driver_sql с DML там бы упали
+    session_factory, writer, reader = routed
+    async with session_factory() as session:
+        await session.execute(text("UPDATE groups SET tg_link = 'text'"))
+        await session.commit()
+    async with session_factory() as session:
+        connection = await session.connection()
+        await connection.exec_driver_sql("UPDATE groups SET tg_link = 'driver'")
+        await session.commit()
+    async with session_factory() as session:
+        assert (await session.execute(select(Group.tg_link))).scalar_one() == "driver"
+
+
+async def test_transactional_context_reads_from_writer(routed):
+    session_factory, writer, reader = routed
+    async with session_factory() as session:
+        async with transactional_context(session):
+            assert session.sync_session.get_bind(clause=select(Group)) is writer
+        # После фиксации маршрутизация сбрасывается
+        assert session.sync_session.get_bind(clause=select(Group)) is reader
+
+
+async def test_update_leader_after_read(routed):
+    session_factory, writer, reader = routed
+    async with session_factory() as session:
+        # Чтение до транзакции записи (как в middleware), затем чтение-изменение-запись
+        await session.execute(select(Student))
+        assert await update_leader(session, "@b") == "b назначен старостой"
+        await session.commit()
+    async with session_factory() as session:
+        leaders = (await session.execute(select(Student.student_username).where(Student.student_is_leader))).scalars()
+        assert list(leaders) == ["@b"]
+
+
+def test_is_read_only():
+    assert is_read_only(select(Group))
+    assert is_read_only(text("  select 1"))
+    assert is_read_only(text("WITH t AS (SELECT 1) SELECT * FROM t"))
+    assert is_read_only(_SEARCH_NOTES)
+
+    assert not is_read_only(None)
+    assert not is_read_only(text("UPDATE groups SET tg_link = ''"))
+    assert not is_read_only(text("WITH t AS (SELECT 1) DELETE FROM groups WHERE id IN t"))
+    assert not is_read_only(text("INSERT INTO groups DEFAULT VALUES RETURNING id").columns(id=Integer))
+
+
+async def test_text_select_goes_to_reader(routed):
+    # Полнотекстовый поиск - только чтение: не занимает соединение писателя
+    session_factory, writer, reader = routed
+    async with session_factory() as session:
+        assert session.sync_session.get_bind(clause=_SEARCH_NOTES) is reader
+        assert await search_notes(session, 1, "матан") == []
+        assert "use_writer" not in session.info
+
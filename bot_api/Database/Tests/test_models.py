@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from bot_api.Database.models import Base, upgrade_schema
+from bot_api.Database.engine import make_engine, make_session_factory
+from bot_api.Database.requests import add_group, add_homework, get_pending_reminders
+
+
+async def test_upgrade_legacy_homeworks(tmp_path):
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.sqlite3'}")
+    async with engine.begin() as conn:
+        # Таблица homeworks в исходной схеме бота
+        await conn.execute(text(
+            "CREATE TABLE homeworks (id INTEGER PRIMARY KEY, group_id INTEGER NOT NULL, "
+            "subject VARCHAR NOT NULL UNIQUE, homework_data VARCHAR NOT NULL UNIQUE, "
+            "expiration_date VARCHAR NOT NULL UNIQUE)"
+        ))
+    async with engine.begin() as conn:
+        assert await conn.run_sync(upgrade_schema) == ["homeworks"]
+        await conn.run_sync(Base.metadata.create_all)
+        columns = await conn.run_sync(lambda sync: {c["name"] for c in inspect(sync).get_columns("homeworks")})
+    assert {"due_at", "created_at", "reminded", "author"} <= columns
+
+    session_factory = make_session_factory(engine)
+    async with session_factory() as session:
+        await add_group(session, group_tg_id=9301, name="ПМИ", course=1, number=1, link="link")
+        homework_id = await add_homework(session, 9301, "Алгебра", "№1", datetime(2030, 1, 1))
+        await session.commit()
+        assert [hw_id for hw_id, _ in await get_pending_reminders(session, datetime(2000, 1, 1))] == [homework_id]
+
+    # Повторный запуск ничего не пересоздаёт
+    async with engine.begin() as conn:
+        assert await conn.run_sync(upgrade_schema) == []
+    await engine.dispose()
@@ -1,5 +1,6 @@
 import pytest
 from sqlalchemy import select
+from sqlalchemy.orm import undefer_group
 from bot_api.Database.models import Group, Student
 from bot_api.Database import *
 
@@ -18,7 +19,7 @@ async def test_add_group(session):
     )
 
     result = await session.execute(
-        select(Group).where(Group.group_tg_id == tg_id)
+        select(Group).where(Group.group_tg_id == tg_id).options(undefer_group("json"))
     )
     group = result.scalar_one()
     assert group.group_name == "ПМИ"
@@ -251,7 +252,7 @@ async def test_update_group_field(session):
     assert "обновлено" in msg
 
     group = await get_group_by_tg_id(session, group_tg_id=tg_id)
-    assert group.events == {"Среда": "test"}
+    assert await group.awaitable_attrs.events == {"Среда": "test"}
 
     # Недопустимое поле
     msg_invalid = await update_group_field(session, group_tg_id=tg_id, field="qwe", value="x")
@@ -303,3 +304,182 @@ async def test_is_student_leader(session):
     # Для несуществующего студента должно выбрасываться исключение
     with pytest.raises(ValueError):
         await is_student_leader(session, username="@ghost")
+
+@pytest.mark.asyncio
+async def test_group_lessons(session):
+    monday = {"weekday": 0, "start": "08:00:00", "end": "09:35:00", "subject": "Алгебра", "teacher": "Иванов", "room": "211"}
+    tuesday = {"weekday": 1, "start": "09:50:00", "end": "11:25:00", "subject": "Физра", "teacher": "Петров", "room": "зал"}
+    await add_group(session, group_tg_id=3001, name="SyncA", course=2, number=1, link="link",
+                    lessons=[tuesday, monday])
+    await add_group(session, group_tg_id=3002, name="SyncB", course=2, number=2, link="link")
+
+    assert await get_group_lessons(session, group_tg_id=3001) == [monday, tuesday]
+    assert await get_group_lessons(session, group_tg_id=3001, weekday=1) == [tuesday]
+
+    groups = {row[1]: row for row in await get_groups_for_sync(session)}
+    assert groups[3001][2:5] == ("SyncA", 2, 1)
+    assert groups[3001][5] == [monday, tuesday]
+    assert groups[3002][5] == []
+
+    updated = await replace_group_lessons(session, {groups[3001][0]: (3001, [tuesday])})
+    await session.commit()
+    assert updated == 1
+    assert await replace_group_lessons(session, {}) == 0
+
+    assert await get_group_lessons(session, group_tg_id=3001) == [tuesday]
+    assert await get_group_lessons(session, group_tg_id=3002) == []
+
+@pytest.mark.asyncio
+async def test_upsert_news(session):
+    page = [
+        {"title": "Свежая", "text": "b", "link": "https://mmcs.sfedu.ru/2"},
+        {"title": "Старая", "text": "a", "link": "https://mmcs.sfedu.ru/1"},
+        {"title": "Без ссылки", "text": "c", "link": ""},
+    ]
+    assert await upsert_news(session, page) == 3
+    await session.commit()
+
+    # Повторная загрузка той же страницы с одной новой новостью
+    assert await upsert_news(session, [{"title": "Новая", "text": "d", "link": "https://mmcs.sfedu.ru/3"}] + page) == 1
+    await session.commit()
+
+    titles = [item["title"] for item in await get_latest_news(session, limit=3)]
+    assert titles == ["Новая", "Свежая", "Старая"]
+
+@pytest.mark.asyncio
+async def test_news_relevance(session):
+    exam, concert = headline_hash("Расписание   экзаменов"), headline_hash("Концерт")
+    assert headline_hash("расписание экзаменов") == exam
+
+    await save_news_relevance(session, {exam: True, concert: False})
+    await session.commit()
+    assert await get_news_relevance(session, [exam, concert, headline_hash("Новое")]) == {exam: True, concert: False}
+
+    await save_news_relevance(session, {concert: True})
+    await session.commit()
+    assert await get_news_relevance(session, [concert]) == {concert: True}
+
+@pytest.mark.asyncio
+async def test_group_cache(session):
+    from bot_api.Database.group_cache import GROUP_CACHE
+
+    await session.commit()
+    # Отрицательная запись: группы ещё нет, повторный запрос - из кэша
+    assert await GROUP_CACHE.get(session, 5001) is None
+    misses = GROUP_CACHE.stats()["misses"]
+    assert await GROUP_CACHE.get(session, 5001) is None
+    assert GROUP_CACHE.stats()["misses"] == misses
+
+    await add_group(session, group_tg_id=5001, name="Кэш", course=1, number=1, link="link",
+                    schedule={"понедельник": "old"})
+    await session.commit()
+    group = await GROUP_CACHE.get(session, 5001)
+    assert group.group_name == "Кэш" and group.leader_username is None
+    assert await get_group_field(session, group_tg_id=5001, field="schedule") == {"понедельник": "old"}
+
+    await update_group_field(session, group_tg_id=5001, field="schedule", value={"понедельник": "new"})
+    # Внутри изменившей транзакции чтение идёт мимо кэша
+    assert await get_group_field(session, group_tg_id=5001, field="schedule") == {"понедельник": "new"}
+    await session.commit()
+    assert await get_group_field(session, group_tg_id=5001, field="schedule") == {"понедельник": "new"}
+
+    await add_student(session, username="@cached", full_name="Кэш Кэш", is_leader=True, group_tg_id=5001)
+    await session.commit()
+    assert (await GROUP_CACHE.get(session, 5001)).leader_username == "@cached"
+
+@pytest.mark.asyncio
+async def test_search_notes(session):
+    await add_group(session, group_tg_id=6001, name="Поиск", course=1, number=1, link="link")
+    await add_group(session, group_tg_id=6002, name="Чужая", course=1, number=2, link="link")
+    await update_group_field(session, group_tg_id=6001, field="homework", value="Матанализ: задачи 5-7", author="@a")
+    await update_group_field(session, group_tg_id=6001, field="homework", value="Алгебра: матрицы, задачи 12")
+    await update_group_field(session, group_tg_id=6001, field="events", value="Субботник в пятницу")
+    await update_group_field(session, group_tg_id=6002, field="homework", value="Задачи по матанализу")
+    await session.commit()
+
+    # История не перезаписывается; поиск - по префиксам слов и только в своей группе
+    found = await search_notes(session, 6001, "задачи")
+    assert {note["text"] for note in found} == {"Матанализ: задачи 5-7", "Алгебра: матрицы, задачи 12"}
+    assert [note["text"] for note in await search_notes(session, 6001, "матан задач")] == ["Матанализ: задачи 5-7"]
+    assert "«Субботник»" in (await search_notes(session, 6001, "субботник", kind="events"))[0]["snippet"]
+    assert await search_notes(session, 6001, "субботник", kind="homework") == []
+    # Синтаксис FTS5 из ввода не интерпретируется
+    assert await search_notes(session, 6001, '" OR NEAR(*') == []
+    assert await search_notes(session, 6999, "задачи") == []
+
+@pytest.mark.asyncio
+async def test_homeworks(session):
+    from datetime import datetime, timedelta
+
+    now = datetime.now()
+    await add_group(session, group_tg_id=7001, name="Дедлайны", course=1, number=1, link="link")
+    late = await add_homework(session, 7001, "Алгебра", "матрицы", now + timedelta(days=3), author="a")
+    soon = await add_homework(session, 7001, "Матанализ", "задачи 5-7", now + timedelta(hours=2))
+    expired = await add_homework(session, 7001, "Физика", "лабораторная", now - timedelta(days=2), reminded=True)
+    assert await add_homework(session, 7999, "Нет", "группы", now) is None
+    await session.commit()
+
+    assert [hw["id"] for hw in await get_group_homeworks(session, 7001)] == [soon, late]
+    # Задание попадает и в историю ДЗ
+    assert await search_notes(session, 7001, "матрицы")
+
+    assert {hw_id for hw_id, _ in await get_pending_reminders(session, now)} >= {soon, late}
+    items = await get_homeworks_to_remind(session, [soon, late])
+    assert {item["group_tg_id"] for item in items} == {7001}
+    assert await mark_reminded(session, [soon]) == 1
+    await session.commit()
+    assert [item["id"] for item in await get_homeworks_to_remind(session, [soon, late])] == [late]
+
+    assert await purge_expired_homeworks(session, now - timedelta(days=1)) == 1
+    assert await delete_homework(session, 7001, late)
+    assert not await delete_homework(session, 7002, soon)
+    await session.commit()
+    assert [hw["id"] for hw in await get_group_homeworks(session, 7001, since=now - timedelta(days=5))] == [soon]
+    assert expired not in {hw_id for hw_id, _ in await get_pending_reminders(session, now - timedelta(days=5))}
+
+@pytest.mark.asyncio
+async def test_add_students_bulk(session):
+    await add_group(session, group_tg_id=8001, name="Список", course=1, number=1, link="link")
+    await add_group(session, group_tg_id=8002, name="Другая", course=1, number=2, link="link")
+    await add_student(session, username="@taken", full_name="Занят Занятов", is_leader=False, group_tg_id=8002)
+    await session.commit()
+
+    added, conflicts = await add_students_bulk(session, 8001, [
+        ("@bulk_a", "Первый Студент"), ("@taken", "Повтор Повторов"), ("@bulk_b", "Второй Студент"),
+    ])
+    await session.commit()
+    assert added == ["@bulk_a", "@bulk_b"] and conflicts == ["@taken"]
+    assert {s.student_username for s in await get_students_by_group(session, 8001)} == {"@bulk_a", "@bulk_b"}
+    assert (await get_student(session, "@taken")).student_full_name == "Занят Занятов"
+
+    # Повторная загрузка того же списка ничего не меняет
+    assert await add_students_bulk(session, 8001, [("@bulk_a", "Первый Студент")]) == ([], ["@bulk_a"])
+    with pytest.raises(ValueError):
+        await add_students_bulk(session, 8999, [("@x_user", "Нет Группы")])
+
+@pytest.mark.asyncio
+async def test_group_update_listeners_after_commit(session):
+    from bot_api.Database.requests import _GROUP_UPDATE_LISTENERS
+
+    calls = []
+    listener = on_group_update(lambda group_tg_id, field: calls.append((group_tg_id, field)))
+    try:
+        await add_group(session, group_tg_id=9101, name="Слушатели", course=1, number=1, link="link")
+        await session.commit()
+        calls.clear()
+
+        # Сессия уже в транзакции: запись идёт в SAVEPOINT, обработчики ждут commit
+        await session.execute(select(Group.id))
+        assert session.in_transaction()
+        await update_group_field(session, group_tg_id=9101, field="events", value="Собрание")
+        assert calls == []
+        await session.commit()
+        assert calls == [(9101, "events")]
+
+        await session.execute(select(Group.id))
+        await update_group_field(session, group_tg_id=9101, field="events", value="Отменено")
+        await session.rollback()
+        await session.commit()
+        assert calls == [(9101, "events")]
+    finally:
+        _GROUP_UPDATE_LISTENERS.remove(listener)
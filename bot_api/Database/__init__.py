@@ -4,5 +4,11 @@ from .models import async_session
 
 __all__ = ["async_session",
            "add_group", "get_group_by_tg_id", "get_students_by_group",
-           "add_student", "delete_student", "get_student_by_username", "is_student_leader",
-           "update_leader", "get_group_field", "update_group_field"]
+           "add_student", "add_students_bulk", "delete_student", "get_student", "get_student_by_username", "is_student_leader",
+           "update_leader", "get_group_field", "update_group_field", "on_group_update",
+           "get_group_lessons", "get_groups_for_sync", "replace_group_lessons",
+           "add_note", "search_notes",
+           "add_homework", "get_group_homeworks", "delete_homework", "get_pending_reminders",
+           "get_homeworks_to_remind", "mark_reminded", "purge_expired_homeworks",
+           "upsert_news", "get_latest_news",
+           "headline_hash", "get_news_relevance", "save_news_relevance"]
@@ -0,0 +1,149 @@
+import re
+from os import getenv
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import TextualSelect
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+
+# Профиль движка SQLite (читается из окружения напрямую: config.py тянет клиент LLM)
+db_url = getenv("DB_URL", "sqlite+aiosqlite:///db.sqlite3")
+db_echo = getenv("DB_ECHO", "0") == "1"                          # Логировать каждый SQL-запрос
+db_journal_mode = getenv("DB_JOURNAL_MODE", "WAL")               # WAL: читатели не ждут писателя
+db_synchronous = getenv("DB_SYNCHRONOUS", "NORMAL")              # NORMAL безопасен в режиме WAL
+db_cache_size = int(getenv("DB_CACHE_SIZE", -64 * 1024))          # Кэш страниц; < 0 - в КиБ (64 МиБ)
+db_mmap_size = int(getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))    # Отображение файла БД в память, байт
+db_busy_timeout = int(getenv("DB_BUSY_TIMEOUT", 5000))           # Ожидание блокировки, мс
+db_read_pool_size = int(getenv("DB_READ_POOL_SIZE", 4))          # Соединений для чтения; 0 - общий пул
+db_read_pool_overflow = int(getenv("DB_READ_POOL_OVERFLOW", 4))  # Временных соединений для чтения сверх пула
+db_pool_timeout = float(getenv("DB_POOL_TIMEOUT", 10))           # Ожидание свободного соединения в пуле, сек
+
+
+def sqlite_pragmas(read_only: bool = False) -> dict[str, str | int]:
+    """
+    PRAGMA, выполняемые на каждом новом соединении.
+
+    :param read_only: Соединение только для чтения (PRAGMA query_only)
+    :return: Словарь имя PRAGMA -> значение
+    """
+    pragmas = {
+        "journal_mode": db_journal_mode,
+        "synchronous": db_synchronous,
+        "cache_size": db_cache_size,
+        "mmap_size": db_mmap_size,
+        "busy_timeout": db_busy_timeout,
+        "foreign_keys": "ON",
+    }
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def make_engine(url: str = db_url, echo: bool = db_echo, pragmas: dict | None = None, **kwargs) -> AsyncEngine:
+    """
+    Асинхронный движок SQLAlchemy, выполняющий PRAGMA при открытии соединения.
+
+    :param url: URL базы данных
+    :param echo: Логировать SQL-запросы
+    :param pragmas: PRAGMA для SQLite (None - без настройки)
+    :param kwargs: Параметры пула (pool_size, max_overflow, ...)
+    :return: AsyncEngine
+    """
+    engine = create_async_engine(url, echo=echo, **kwargs)
+    if pragmas and engine.dialect.name == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return engine
+
+
+_READ_SQL = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+_WRITE_SQL = re.compile(r"\b(?:INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|PRAGMA)\b", re.IGNORECASE)
+
+
+def is_read_only(clause) -> bool:
+    """
+    Можно ли выполнить запрос на соединении только для чтения.
+
+    Для text() решает сам SQL: SELECT/WITH без DML-слов; для остальных - тип выражения.
+
+    :param clause: Выражение SQLAlchemy или None (session.connection())
+    :return: True - запрос только читает
+    """
+    if isinstance(clause, TextualSelect):
+        clause = clause.element
+    if isinstance(clause, TextClause):
+        return bool(_READ_SQL.match(clause.text)) and not _WRITE_SQL.search(clause.text)
+    return clause is not None and clause.is_select
+
+
+class RoutingSession(Session):
+    """
+    Сессия с двумя пулами: SELECT идут в пул читателей, всё остальное - в пул писателя.
+
+    В пул читателей попадают только SELECT (в том числе ORM-загрузки и text() с SELECT/WITH,
+    см. is_read_only); DML, прочий text() и session.connection() (exec_driver_sql)
+    выполняются писателем, так как соединения читателей открыты с PRAGMA query_only.
+
+    После первой записи транзакция до конца остаётся на соединении писателя,
+    чтобы видеть собственные незафиксированные изменения. Транзакция, которая
+    читает, а потом пишет на основе прочитанного, должна с самого начала идти
+    через писателя (use_writer; так делает transactional_context) - иначе чтения
+    до первой записи видят снимок читателя, и параллельная запись может потеряться.
+    """
+    writer = None
+    reader = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("use_writer") or self._flushing or not is_read_only(clause):
+            self.info["use_writer"] = True
+            return self.writer
+        return self.reader
+
+
+def use_writer(session) -> None:
+    """
+    Направляет текущую (или следующую) транзакцию сессии целиком в пул писателя.
+
+    :param session: Сессия (AsyncSession или Session)
+    """
+    session.info["use_writer"] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("use_writer", None)
+
+
+def make_session_factory(write_engine: AsyncEngine, read_engine: AsyncEngine | None = None) -> async_sessionmaker:
+    """
+    Фабрика сессий: обычная для одного движка или с маршрутизацией чтения/записи.
+
+    :param write_engine: Движок для записи
+    :param read_engine: Движок для чтения (None - всё через write_engine)
+    :return: async_sessionmaker
+    """
+    if read_engine is None:
+        return async_sessionmaker(write_engine, expire_on_commit=False)
+    session_class = type("BoundRoutingSession", (RoutingSession,), {
+        "writer": write_engine.sync_engine,
+        "reader": read_engine.sync_engine,
+    })
+    return async_sessionmaker(sync_session_class=session_class, expire_on_commit=False)
+
+
+# SQLite допускает одного писателя: один пул на запись, остальные ждут соединение в пуле
+engine = make_engine(pragmas=sqlite_pragmas(), pool_size=1, max_overflow=0, pool_timeout=db_pool_timeout)
+read_engine = (
+    make_engine(pragmas=sqlite_pragmas(read_only=True), pool_size=db_read_pool_size,
+                max_overflow=db_read_pool_overflow, pool_timeout=db_pool_timeout)
+    if db_read_pool_size > 0 else None
+)
+async_session = make_session_factory(engine, read_engine)
+ENGINES = [engine] + ([read_engine] if read_engine is not None else [])
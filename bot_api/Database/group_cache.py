@@ -0,0 +1,240 @@
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot_api.Database.models import Group, Student
+
+
+# JSON-поля группы, которые кэшируются по отдельности при первом обращении
+CACHED_FIELDS = ("schedule", "events", "homework")
+
+_MISSING = object()
+
+
+class GroupSnapshot:
+    """
+    Снимок группы для кэша (не ORM-объект, не привязан к сессии).
+
+    Поля:
+        id, group_tg_id, group_name, group_course, group_number, tg_link: Колонки Group.
+        leader_username (str | None): @username старосты группы или None.
+        fields (dict): Загруженные JSON-поля (schedule, events, homework).
+    """
+    __slots__ = ("id", "group_tg_id", "group_name", "group_course", "group_number",
+                 "tg_link", "leader_username", "fields")
+
+    def __init__(self, id: int, group_tg_id: int, group_name: str, group_course: int,
+                 group_number: int, tg_link: str, leader_username: str | None):
+        self.id = id
+        self.group_tg_id = group_tg_id
+        self.group_name = group_name
+        self.group_course = group_course
+        self.group_number = group_number
+        self.tg_link = tg_link
+        self.leader_username = leader_username
+        self.fields: dict = {}
+
+
+class GroupCache:
+    """
+    Кэш групп по group_tg_id с чтением из БД при промахе.
+
+    Хранит и отрицательные ответы (в чате нет группы), поэтому сообщения в чатах
+    без группы не делают запросов. Пишущие функции помечают изменённые группы
+    в session.info, а записи сбрасываются после фиксации транзакции (after_commit).
+    Внутри транзакции, изменившей группу, чтения идут мимо кэша.
+
+    :param max_size: Максимум групп в кэше (вытесняются давно неиспользованные)
+    :param ttl: Время жизни записи, сек
+    """
+    def __init__(self, max_size: int = 4096, ttl: float = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: OrderedDict[int, GroupSnapshot | None] = OrderedDict()
+        self._created: dict[int, float] = {}
+        self._versions: dict[int, int] = {}
+        self._tg_by_id: dict[int, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+    # region Чтение
+    @staticmethod
+    def _changed_in(session: AsyncSession, group_tg_id: int) -> bool:
+        return group_tg_id in session.info.get("changed_groups", ())
+
+
+    def _lookup(self, group_tg_id: int):
+        if group_tg_id not in self._entries:
+            return _MISSING
+        if time.monotonic() - self._created[group_tg_id] > self.ttl:
+            self._drop(group_tg_id)
+            return _MISSING
+        self._entries.move_to_end(group_tg_id)
+        return self._entries[group_tg_id]
+
+
+    def _store(self, group_tg_id: int, snapshot: GroupSnapshot | None, version: int) -> None:
+        # Пока грузили, группу могли изменить - тогда не кэшируем устаревшие данные
+        if self._versions.get(group_tg_id, 0) != version:
+            return
+        self._entries[group_tg_id] = snapshot
+        self._entries.move_to_end(group_tg_id)
+        self._created[group_tg_id] = time.monotonic()
+        if snapshot is not None:
+            self._tg_by_id[snapshot.id] = group_tg_id
+        while len(self._entries) > self.max_size:
+            self._drop(next(iter(self._entries)))
+
+
+    @staticmethod
+    async def _load(session: AsyncSession, group_tg_id: int, field: str | None = None) -> GroupSnapshot | None:
+        # Запрошенное JSON-поле читается тем же запросом, что и снимок
+        columns = [Group.id, Group.group_tg_id, Group.group_name, Group.group_course,
+                   Group.group_number, Group.tg_link, Student.student_username]
+        if field is not None:
+            columns.append(getattr(Group, field))
+        result = await session.execute(
+            select(*columns)
+            .outerjoin(Student, (Student.group_id == Group.id) & Student.student_is_leader)
+            .where(Group.group_tg_id == group_tg_id)
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        snapshot = GroupSnapshot(*row[:7])
+        if field is not None:
+            snapshot.fields[field] = row[7]
+        return snapshot
+
+
+    async def get(self, session: AsyncSession, group_tg_id: int) -> GroupSnapshot | None:
+        """
+        Снимок группы по Telegram ID.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param group_tg_id: Telegram ID группы
+        :return: GroupSnapshot или None, если группы нет
+        """
+        if self._changed_in(session, group_tg_id):
+            return await self._load(session, group_tg_id)
+
+        snapshot = self._lookup(group_tg_id)
+        if snapshot is not _MISSING:
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        version = self._versions.get(group_tg_id, 0)
+        snapshot = await self._load(session, group_tg_id)
+        self._store(group_tg_id, snapshot, version)
+        return snapshot
+
+
+    async def get_field(self, session: AsyncSession, group_tg_id: int, field: str):
+        """
+        JSON-поле группы (schedule, events, homework).
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param group_tg_id: Telegram ID группы
+        :param field: Имя поля из CACHED_FIELDS
+        :return: Содержимое поля или None, если группы нет
+        """
+        column = getattr(Group, field)
+        if self._changed_in(session, group_tg_id):
+            result = await session.execute(select(column).where(Group.group_tg_id == group_tg_id))
+            return result.scalar_one_or_none()
+
+        version = self._versions.get(group_tg_id, 0)
+        snapshot = self._lookup(group_tg_id)
+        if snapshot is _MISSING:
+            self.misses += 1
+            snapshot = await self._load(session, group_tg_id, field)
+            self._store(group_tg_id, snapshot, version)
+            return snapshot.fields[field] if snapshot is not None else None
+        if snapshot is None or field in snapshot.fields:
+            self.hits += 1
+            return snapshot.fields[field] if snapshot is not None else None
+
+        self.misses += 1
+        result = await session.execute(select(column).where(Group.group_tg_id == group_tg_id))
+        value = result.scalar_one_or_none()
+        if self._versions.get(group_tg_id, 0) == version:
+            snapshot.fields[field] = value
+        return value
+    # endregion
+
+
+    # region Сброс
+    def _drop(self, group_tg_id: int) -> None:
+        snapshot = self._entries.pop(group_tg_id, None)
+        self._created.pop(group_tg_id, None)
+        if snapshot is not None:
+            self._tg_by_id.pop(snapshot.id, None)
+
+
+    def invalidate(self, group_tg_id: int) -> None:
+        """
+        Сбрасывает запись группы (в том числе отрицательную).
+
+        :param group_tg_id: Telegram ID группы
+        """
+        self._versions[group_tg_id] = self._versions.get(group_tg_id, 0) + 1
+        self._drop(group_tg_id)
+        self.invalidations += 1
+
+
+    def mark_changed(self, session: AsyncSession, group_tg_id: int | None = None, group_id: int | None = None) -> None:
+        """
+        Помечает группу изменённой в текущей транзакции; запись сбросится после commit.
+
+        :param session: Асинхронная сессия SQLAlchemy
+        :param group_tg_id: Telegram ID группы
+        :param group_id: Внутренний ID группы (если Telegram ID неизвестен)
+        """
+        if group_tg_id is None:
+            group_tg_id = self._tg_by_id.get(group_id)
+            if group_tg_id is None:
+                return  # Группа не в кэше - сбрасывать нечего
+        session.info.setdefault("changed_groups", set()).add(group_tg_id)
+    # endregion
+
+
+    def stats(self) -> dict:
+        """
+        Метрики кэша: размер, попадания, промахи и сбросы.
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "negative": sum(1 for snapshot in self._entries.values() if snapshot is None),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+GROUP_CACHE = GroupCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # Отпущен SAVEPOINT - транзакция ещё не зафиксирована
+    for group_tg_id in session.info.pop("changed_groups", ()):
+        GROUP_CACHE.invalidate(group_tg_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    # Откат SAVEPOINT не забывает пометки: лишний сброс кэша безопаснее пропущенного
+    if not session.in_nested_transaction():
+        session.info.pop("changed_groups", None)
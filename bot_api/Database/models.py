@@ -1,11 +1,10 @@
-from sqlalchemy import BigInteger, String, Boolean, ForeignKey, Integer, JSON
+from datetime import datetime
+from sqlalchemy import BigInteger, String, Boolean, ForeignKey, Integer, JSON, DateTime, Index, DDL, event, inspect
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncAttrs
 
-
-# Создание асинхронного движка базы данных
-engine = create_async_engine(url='sqlite+aiosqlite:///db.sqlite3', echo=True)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+# Движки и фабрика сессий (профиль SQLite, пулы чтения/записи) - в engine.py
+from bot_api.Database.engine import engine, async_session
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -28,11 +27,17 @@ class Group(Base):
         group_course (int): Курс, на котором находится группа.
         group_number (int): Номер группы.
         events (dict): JSON с описанием предстоящих событий, загружаемых старостой.
-        schedule (dict): JSON с полным расписанием группы по дням.
+        schedule (dict): Устаревшее: JSON с расписанием по дням (теперь расписание - в таблице lessons).
         homework (dict): JSON со списком домашних заданий для группы.
 
+    JSON-поля отложены (группа "json"): select(Group) их не читает и не декодирует.
+    Нужное поле выбирается отдельно (get_group_field) или через undefer_group("json").
+
     Связи:
         students: список объектов Student, принадлежащих группе.
+        lessons: занятия группы (Lesson).
+        notes: история загруженных ДЗ и событий (Note).
+        homeworks: задания с дедлайнами (Homework).
     """
     __tablename__ = 'groups'
 
@@ -50,11 +55,16 @@ class Group(Base):
                                                               # неактуальностью новостей в студенческих массах
                                                               # Возможно в будущем сделать отдельную таблицу News
 
-    events: Mapped[dict] = mapped_column(JSON, nullable=True)      # Строка с событиями (староста кидает)
-    schedule: Mapped[dict] = mapped_column(JSON, nullable=True)    # Строка с расписанием группы
-    homework: Mapped[dict] = mapped_column(JSON, nullable=True)    # Строка с ДЗ группы
+    events: Mapped[dict] = mapped_column(JSON, nullable=True, deferred=True, deferred_group="json")    # Строка с событиями (староста кидает)
+    schedule: Mapped[dict] = mapped_column(JSON, nullable=True, deferred=True, deferred_group="json")  # Строка с расписанием группы
+    homework: Mapped[dict] = mapped_column(JSON, nullable=True, deferred=True, deferred_group="json")  # Строка с ДЗ группы
 
     students = relationship("Student", back_populates="group", cascade="all, delete-orphan")  # Связь с таблицей студентов
+    lessons = relationship("Lesson", back_populates="group", cascade="all, delete-orphan")    # Связь с таблицей занятий
+    notes = relationship("Note", back_populates="group", cascade="all, delete-orphan",        # История ДЗ и событий
+                         passive_deletes=True)
+    homeworks = relationship("Homework", back_populates="group", cascade="all, delete-orphan",  # ДЗ с дедлайнами
+                             passive_deletes=True)
 
 
 # Таблица студентов
@@ -72,19 +82,197 @@ class Student(Base):
     group = relationship("Group", back_populates="students")
 
 
-class homework(Base):
+# Таблица занятий (нормализованное расписание)
+class Lesson(Base):
+    """
+    Одно занятие в недельном расписании группы.
+
+    Поля:
+        id (int): Суррогатный ключ; при одинаковом начале сохраняет порядок из API.
+        group_id (int): Группа.
+        weekday (int): День недели (0 - понедельник).
+        start, end (str): Начало и конец занятия ("08:00:00").
+        subject, teacher, room (str): Предмет, преподаватель и аудитория.
+    """
+    __tablename__ = 'lessons'
+    __table_args__ = (
+        Index("ix_lessons_group_weekday_start", "group_id", "weekday", "start"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+
+    weekday: Mapped[int] = mapped_column(Integer, nullable=False)
+    start: Mapped[str] = mapped_column(String, nullable=False)
+    end: Mapped[str] = mapped_column(String, nullable=False)
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    teacher: Mapped[str] = mapped_column(String, nullable=False)
+    room: Mapped[str] = mapped_column(String, nullable=False)
+
+    group = relationship("Group", back_populates="lessons")
+
+
+# История ДЗ и событий (только добавление) с полнотекстовым поиском
+class Note(Base):
+    """
+    Запись ДЗ или событий, загруженная старостой. Записи не перезаписываются:
+    актуальное значение по-прежнему хранится в Group.homework / Group.events, здесь - вся история.
+
+    Поля:
+        id (int): Суррогатный ключ; он же rowid в полнотекстовом индексе notes_fts.
+        group_id (int): Группа.
+        kind (str): 'homework' или 'events'.
+        text (str): Текст записи.
+        author (str): Username загрузившего (если известен).
+        created_at (datetime): Время загрузки.
+
+    notes_fts - виртуальная таблица FTS5 над text и group_id (external content), синхронизируется триггерами.
+    """
+    __tablename__ = 'notes'
+    __table_args__ = (
+        Index("ix_notes_group_kind_created", "group_id", "kind", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    text: Mapped[str] = mapped_column(String, nullable=False)
+    author: Mapped[str] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    group = relationship("Group", back_populates="notes")
+
+
+# Полнотекстовый индекс notes_fts создаётся вместе с таблицей notes.
+# unicode61 приводит кириллицу к нижнему регистру, prefix ускоряет запросы "слово*".
+# group_id индексируется как слово: отбор группы - пересечением в самом индексе, а не после него.
+NOTES_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        text, group_id, content='notes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, text, group_id) VALUES (new.id, new.text, new.group_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, text, group_id) VALUES ('delete', old.id, old.text, old.group_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE OF text, group_id ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, text, group_id) VALUES ('delete', old.id, old.text, old.group_id);
+        INSERT INTO notes_fts(rowid, text, group_id) VALUES (new.id, new.text, new.group_id);
+    END""",
+    # Перенос текущих ДЗ/событий групп в историю при первом создании таблицы
+    """INSERT INTO notes (group_id, kind, text, created_at)
+        SELECT id, 'homework', json_extract(homework, '$'), datetime('now', 'localtime') FROM groups
+        WHERE json_type(homework) = 'text'
+        UNION ALL
+        SELECT id, 'events', json_extract(events, '$'), datetime('now', 'localtime') FROM groups
+        WHERE json_type(events) = 'text'""",
+)
+for statement in NOTES_FTS_DDL:
+    event.listen(Note.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Note.__table__, "before_drop", DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite"))
+
+
+# Таблица ДЗ с дедлайнами (по одному заданию на строку)
+class Homework(Base):
+    """
+    Задание с дедлайном. По нему планируется напоминание (см. ReminderScheduler),
+    после дедлайна строка удаляется пакетно.
+
+    Поля:
+        id (int): Суррогатный ключ задания.
+        group_id (int): Группа.
+        subject (str): Предмет.
+        homework_data (str): Текст задания.
+        due_at (datetime): Дедлайн.
+        created_at (datetime): Когда задание добавлено.
+        author (str): Username добавившего.
+        reminded (bool): Напоминание уже отправлено.
+    """
     __tablename__ = 'homeworks'
+    __table_args__ = (
+        Index("ix_homeworks_due_at", "due_at"),                     # Ближайшие напоминания и удаление истёкших
+        Index("ix_homeworks_group_due", "group_id", "due_at"),      # Дедлайны группы по порядку
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id"), nullable=False)
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
 
-    subject: Mapped[str] = mapped_column(String, unique=True, nullable=False)
-    homework_data: Mapped[str] = mapped_column(String, unique=True, nullable=False)
-    expiration_date: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    homework_data: Mapped[str] = mapped_column(String, nullable=False)
+    due_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    author: Mapped[str] = mapped_column(String, nullable=True)
+    reminded: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
     group = relationship("Group", back_populates="homeworks")
 
 
+# Таблица новостей (заполняется фоновым опросом сайта)
+class News(Base):
+    """
+    Новость с сайта факультета/университета.
+
+    Поля:
+        id (int): Суррогатный ключ; растёт от старых новостей к новым.
+        news_key (str): Ключ дедупликации: ссылка или хэш заголовка и текста.
+        title, date, author, text, link (str): Поля, извлечённые парсером.
+        first_seen (datetime): Когда новость впервые попала в таблицу.
+        last_seen (datetime): Когда новость последний раз была на странице новостей.
+    """
+    __tablename__ = 'news'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    news_key: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+
+    title: Mapped[str] = mapped_column(String, nullable=True)
+    date: Mapped[str] = mapped_column(String, nullable=True)
+    author: Mapped[str] = mapped_column(String, nullable=True)
+    text: Mapped[str] = mapped_column(String, nullable=True)
+    link: Mapped[str] = mapped_column(String, nullable=True)
+
+    first_seen: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_seen: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+# Решения LLM о релевантности заголовков новостей студентам
+class NewsRelevance(Base):
+    """
+    Кэш классификации заголовков: один раз оценённый заголовок больше не отправляется в LLM.
+
+    Поля:
+        headline_hash (str): sha256 нормализованного заголовка.
+        relevant (bool): Релевантна ли новость студентам.
+        classified_at (datetime): Когда заголовок был оценён.
+    """
+    __tablename__ = 'news_relevance'
+
+    headline_hash: Mapped[str] = mapped_column(String, primary_key=True)
+    relevant: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    classified_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+def upgrade_schema(connection) -> list[str]:
+    """
+    Приводит таблицы, созданные прежними версиями бота, к текущим моделям.
+    create_all не меняет существующие таблицы, поэтому вызывается перед ним (см. init_db).
+
+    homeworks в исходной схеме (subject, homework_data, expiration_date) не имела дедлайна-даты
+    и ни разу не заполнялась - такая таблица удаляется и создаётся заново.
+
+    :param connection: Синхронное соединение (через AsyncConnection.run_sync)
+    :return: Имена пересозданных таблиц
+    """
+    recreated = []
+    inspector = inspect(connection)
+    if inspector.has_table(Homework.__tablename__):
+        columns = {column["name"] for column in inspector.get_columns(Homework.__tablename__)}
+        if "due_at" not in columns:
+            Homework.__table__.drop(connection)
+            recreated.append(Homework.__tablename__)
+    return recreated
+
 
 '''
 # Таблица личных заданий (на будущее)
@@ -109,6 +297,4 @@ class Events(Base):
 class Schedule(Base):
     __tablename__ = 'schedules'
     group = relationship("Group", back_populates="schedules")
-
-# Автообновляемая таблица новостей (на будущее)
 '''
@@ -1,7 +1,47 @@
+import re
+import hashlib
+from datetime import datetime
 from contextlib import asynccontextmanager
+from sqlalchemy import event, update, delete, bindparam, text, DateTime
 from sqlalchemy.future import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from bot_api.Database.models import Student, Group
+from bot_api.Database.models import Student, Group, Lesson, Note, Homework, News, NewsRelevance
+from bot_api.Database.group_cache import GROUP_CACHE, CACHED_FIELDS
+from bot_api.Database.engine import use_writer
+
+
+_GROUP_UPDATE_LISTENERS = []
+
+
+def on_group_update(func):
+    """
+    Декоратор для регистрации обработчика изменений данных группы.
+    Обработчик вызывается как func(group_tg_id, field) после фиксации транзакции (after_commit).
+    """
+    _GROUP_UPDATE_LISTENERS.append(func)
+    return func
+
+
+def _notify_group_update(session: AsyncSession, group_tg_id: int, field: str) -> None:
+    # Обработчики вызываются после commit: выход из begin_nested ещё ничего не фиксирует
+    session.info.setdefault("updated_groups", set()).add((group_tg_id, field))
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # Отпущен SAVEPOINT - транзакция ещё не зафиксирована
+    for group_tg_id, field in session.info.pop("updated_groups", ()):
+        for listener in _GROUP_UPDATE_LISTENERS:
+            listener(group_tg_id, field)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop("updated_groups", None)
 
 
 @asynccontextmanager
@@ -10,11 +50,13 @@ async def transactional_context(session: AsyncSession):
     Асинхронный контекстный менеджер для выполнения транзакций.
 
     Если сессия уже в транзакции, создаётся вложенная транзакция (begin_nested),
-    иначе открывается новая транзакция (begin).
+    иначе открывается новая транзакция (begin). Чтения внутри идут через писателя
+    (см. RoutingSession): прочитанное не устареет до записи.
 
     :param session: Асинхронная сессия SQLAlchemy
     :yields: Та же сессия для выполнения операций
     """
+    use_writer(session)
     if session.in_transaction():
         async with session.begin_nested():
             yield session
@@ -33,7 +75,8 @@ async def add_group(
     link: str,
     schedule: dict = None,
     events: dict = None,
-    homework: dict = None
+    homework: dict = None,
+    lessons: list[dict] = None
 ) -> None:
     """
     Добавляет новую группу в базу данных.
@@ -47,9 +90,11 @@ async def add_group(
     :param schedule: JSON-расписание группы (опционально)
     :param events: JSON-события группы (опционально)
     :param homework: JSON-домашние задания группы (опционально)
+    :param lessons: Занятия группы для таблицы lessons (опционально, см. parse_schedule)
     :return: None
     """
     async with transactional_context(session):
+        GROUP_CACHE.mark_changed(session, group_tg_id)  # Сбрасывает отрицательную запись
         group = Group(
             group_tg_id=group_tg_id,
             group_name=name,
@@ -58,7 +103,8 @@ async def add_group(
             tg_link=link,
             schedule=schedule,
             events=events,
-            homework=homework
+            homework=homework,
+            lessons=[Lesson(**{field: lesson[field] for field in LESSON_FIELDS}) for lesson in lessons or ()]
         )
         session.add(group)
     return None
@@ -96,23 +142,63 @@ async def add_student(
     :raises ValueError: Если группа не найдена
     :return: Отладочный вывод
     """
-    result = await session.execute(select(Group).filter_by(group_tg_id=group_tg_id))
-    group = result.scalar_one_or_none()
-    if not group:
+    result = await session.execute(select(Group.id).filter_by(group_tg_id=group_tg_id))
+    group_id = result.scalar_one_or_none()
+    if group_id is None:
         raise ValueError(f"Группа с group_tg_id={group_tg_id} не найдена")
 
     async with transactional_context(session):
+        GROUP_CACHE.mark_changed(session, group_tg_id)
         student = Student(
             student_username=username,
             student_full_name=full_name,
             student_is_leader=is_leader,
-            group_id=group.id
+            group_id=group_id
         )
         session.add(student)
 
     return f"Студент {full_name} ({username[1:]}) добавлен."
 
 
+async def add_students_bulk(
+    session: AsyncSession,
+    group_tg_id: int,
+    students: list[tuple[str, str]]
+) -> tuple[list[str], list[str]]:
+    """
+    Добавляет список студентов (не старост) одной транзакцией и одним INSERT на весь список.
+    Уже зарегистрированные username пропускаются (ON CONFLICT DO NOTHING), остальные добавляются.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param students: Список (@username, полное имя) без повторов
+    :raises ValueError: Если группа не найдена
+    :return: (добавленные username, username, которые уже были в базе)
+    """
+    group = await GROUP_CACHE.get(session, group_tg_id)
+    if group is None:
+        raise ValueError(f"Группа с group_tg_id={group_tg_id} не найдена")
+    if not students:
+        return [], []
+
+    stmt = (
+        insert(Student)
+        .on_conflict_do_nothing(index_elements=[Student.student_username])
+        .returning(Student.student_username)
+    )
+    async with transactional_context(session):
+        GROUP_CACHE.mark_changed(session, group_tg_id)
+        result = await session.execute(stmt, [
+            {"student_username": username, "student_full_name": full_name,
+             "student_is_leader": False, "group_id": group.id}
+            for username, full_name in students
+        ])
+        added = set(result.scalars().all())
+
+    return ([username for username, _ in students if username in added],
+            [username for username, _ in students if username not in added])
+
+
 async def delete_student(session: AsyncSession, username: str) -> str:
     """
     Удаляет студента по его Telegram username.
@@ -125,6 +211,7 @@ async def delete_student(session: AsyncSession, username: str) -> str:
         result = await session.execute(select(Student).filter_by(student_username=username))
         student = result.scalar_one_or_none()
         if student:
+            GROUP_CACHE.mark_changed(session, group_id=student.group_id)
             await session.delete(student)
             return f"Студент {username[1:]} удален"
         return f"Студент {username[1:]} не найден"
@@ -147,6 +234,18 @@ async def get_students_by_group(session: AsyncSession, group_tg_id: int):
     return result.scalars().all()
 
 
+async def get_student(session: AsyncSession, username: str) -> Student | None:
+    """
+    Получает студента по Telegram username.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param username: Имя пользователя Telegram (@username)
+    :return: Объект Student или None, если не найден
+    """
+    result = await session.execute(select(Student).filter_by(student_username=username))
+    return result.scalar_one_or_none()
+
+
 async def get_student_by_username(session: AsyncSession, username: str):
     """
     Проверяет наличие студента по username и возвращает информацию о группе.
@@ -203,6 +302,7 @@ async def update_leader(session: AsyncSession, username: str) -> str:
 
         if not student:
             return f"{username[1:]} не найден"
+        GROUP_CACHE.mark_changed(session, group_id=student.group_id)
 
         result_leaders = await session.execute(
             select(Student)
@@ -249,41 +349,451 @@ async def is_leader_here(session: AsyncSession, group_tg_id: int) -> bool:
 async def get_group_field(session: AsyncSession, group_tg_id: int, field: str):
     """
     Возвращает поле заданного имени из группы.
+    Читается только эта колонка; JSON-поля - через GROUP_CACHE.
 
     :param session: Асинхронная сессия SQLAlchemy
     :param group_tg_id: Telegram ID группы
     :param field: Имя поля ('schedule', 'events', 'homework')
     :return: Содержимое поля или None
     """
-    result = await session.execute(select(Group).filter_by(group_tg_id=group_tg_id))
-    group = result.scalar_one_or_none()
-    if group and hasattr(group, field):
-        return getattr(group, field)
-    return None
+    if field in CACHED_FIELDS:
+        return await GROUP_CACHE.get_field(session, group_tg_id, field)
 
+    column = Group.__table__.c.get(field)
+    if column is None:
+        return None
+    result = await session.execute(select(column).where(Group.group_tg_id == group_tg_id))
+    return result.scalar_one_or_none()
 
-async def update_group_field(session: AsyncSession,group_tg_id: int, field: str, value) -> str:
+
+async def update_group_field(session: AsyncSession,group_tg_id: int, field: str, value,
+                             author: str | None = None) -> str:
     """
-    Обновляет указанное поле группы.
+    Обновляет указанное поле группы одним UPDATE ... WHERE group_tg_id=, без загрузки строки.
+    Текстовые ДЗ и события дополнительно сохраняются в историю (notes) той же транзакцией.
 
     :param session: Асинхронная сессия SQLAlchemy
     :param group_tg_id: Telegram ID группы
     :param field: Имя поля для обновления ('schedule', 'events', 'homework')
     :param value: Новое значение (dict или None)
+    :param author: Username загрузившего - для истории
     :return: Сообщение о результате операции
     """
     # Value = dict или None
+    allowed_fields = {"schedule", "events", "homework"}
+    if field not in allowed_fields:
+        return "Недопустимое поле для изменения"
+
+    async with transactional_context(session):
+        GROUP_CACHE.mark_changed(session, group_tg_id)
+        result = await session.execute(
+            update(Group).where(Group.group_tg_id == group_tg_id).values({field: value})
+        )
+        if result.rowcount == 0:
+            return f"Группа с group_tg_id={group_tg_id} не найдена"
+        if field in NOTE_KINDS and isinstance(value, str) and value.strip():
+            await add_note(session, group_tg_id, field, value, author)
+        _notify_group_update(session, group_tg_id, field)
+
+    return f"Поле '{field}' обновлено для группы group_tg_id={group_tg_id}"
+# endregion
+
+
+# region Расписание: занятия групп
+LESSON_FIELDS = ("weekday", "start", "end", "subject", "teacher", "room")
+
+# Запросы собираются один раз: на горячем пути меняются только параметры
+_GROUP_LESSONS = (
+    select(*(getattr(Lesson, field) for field in LESSON_FIELDS))
+    .join(Group, Lesson.group_id == Group.id)
+    .where(Group.group_tg_id == bindparam("group_tg_id"))
+    .order_by(Lesson.weekday, Lesson.start, Lesson.id)
+)
+_GROUP_DAY_LESSONS = _GROUP_LESSONS.where(Lesson.weekday == bindparam("weekday"))
+
+
+async def get_group_lessons(session: AsyncSession, group_tg_id: int, weekday: int | None = None) -> list[dict]:
+    """
+    Занятия группы из таблицы lessons (по индексу group_id, weekday, start).
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param weekday: День недели (0 - понедельник); None - вся неделя
+    :return: Список словарей weekday, start, end, subject, teacher, room по порядку
+    """
+    if weekday is None:
+        result = await session.execute(_GROUP_LESSONS, {"group_tg_id": group_tg_id})
+    else:
+        result = await session.execute(_GROUP_DAY_LESSONS, {"group_tg_id": group_tg_id, "weekday": weekday})
+    return [dict(zip(LESSON_FIELDS, row)) for row in result.all()]
+
+
+async def get_groups_for_sync(session: AsyncSession) -> list[tuple[int, int, str, int, int, list[dict]]]:
+    """
+    Возвращает данные всех групп, нужные для обновления расписания.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :return: Список кортежей (id, group_tg_id, название, курс, номер, текущие занятия)
+    """
+    groups = await session.execute(
+        select(Group.id, Group.group_tg_id, Group.group_name, Group.group_course, Group.group_number)
+    )
+    lessons = await session.execute(
+        select(Lesson.group_id, *(getattr(Lesson, field) for field in LESSON_FIELDS))
+        .order_by(Lesson.group_id, Lesson.weekday, Lesson.start, Lesson.id)
+    )
+    by_group: dict[int, list[dict]] = {}
+    for group_id, *values in lessons.all():
+        by_group.setdefault(group_id, []).append(dict(zip(LESSON_FIELDS, values)))
+    return [(*row, by_group.get(row[0], [])) for row in groups.all()]
+
+
+async def replace_group_lessons(session: AsyncSession, lessons: dict[int, tuple[int, list[dict]]]) -> int:
+    """
+    Заменяет занятия нескольких групп в одной транзакции (DELETE и пакетный INSERT).
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param lessons: Словарь id группы -> (group_tg_id, новые занятия)
+    :return: Число обновлённых групп
+    """
+    if not lessons:
+        return 0
+
+    rows = [
+        {"group_id": group_id, **{field: lesson[field] for field in LESSON_FIELDS}}
+        for group_id, (_, group_lessons) in lessons.items()
+        for lesson in group_lessons
+    ]
     async with transactional_context(session):
-        allowed_fields = {"schedule", "events", "homework"}
-        if field not in allowed_fields:
-            return "Недопустимое поле для изменения"
+        await session.execute(delete(Lesson).where(Lesson.group_id.in_(list(lessons))))
+        if rows:
+            await session.execute(insert(Lesson), rows)
+        for group_tg_id, _ in lessons.values():
+            _notify_group_update(session, group_tg_id, "schedule")
+
+    return len(lessons)
+# endregion
+
+
+# region История ДЗ и событий: добавление/полнотекстовый поиск
+NOTE_KINDS = ("homework", "events")
+
+_GROUP_ID = select(Group.id).where(Group.group_tg_id == bindparam("group_tg_id")).scalar_subquery()
+
+# Группа входит в выражение MATCH (колонка group_id индекса), поэтому поиск не обходит записи других групп.
+# bm25 в SQLite тем меньше, чем релевантнее запись; колонка группы в ранжировании не участвует.
+_SEARCH_NOTES = text("""
+    SELECT n.kind, n.text, n.created_at, snippet(notes_fts, 0, '«', '»', '…', 16) AS snippet,
+           bm25(notes_fts, 1.0, 0.0) AS rank
+    FROM notes_fts JOIN notes AS n ON n.id = notes_fts.rowid
+    WHERE notes_fts MATCH 'group_id:' || coalesce((SELECT id FROM groups WHERE group_tg_id = :group_tg_id), 0)
+                          || ' AND text:(' || :query || ')'
+      AND (:kind IS NULL OR n.kind = :kind)
+    ORDER BY rank
+    LIMIT :limit
+""").columns(created_at=DateTime())
+
+
+def fts_query(terms: str) -> str:
+    """
+    Запрос пользователя -> выражение MATCH: каждое слово как префикс, все слова обязательны.
+    Синтаксис FTS5 (кавычки, OR, NEAR, *) из ввода не интерпретируется.
+
+    :param terms: Например "матан задачи 5"
+    :return: '"матан"* "задачи"* "5"*' или пустая строка
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", terms.lower()))
+
+
+async def add_note(session: AsyncSession, group_tg_id: int, kind: str, content: str,
+                   author: str | None = None) -> None:
+    """
+    Добавляет запись в историю ДЗ/событий группы (индекс notes_fts обновляется триггером).
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param kind: 'homework' или 'events'
+    :param content: Текст записи
+    :param author: Username загрузившего
+    """
+    async with transactional_context(session):
+        await session.execute(
+            insert(Note).values(group_id=_GROUP_ID, kind=kind, text=content, author=author, created_at=datetime.now()),
+            {"group_tg_id": group_tg_id}
+        )
+
+
+async def search_notes(session: AsyncSession, group_tg_id: int, terms: str,
+                       kind: str | None = None, limit: int = 10) -> list[dict]:
+    """
+    Полнотекстовый поиск по истории ДЗ/событий группы с ранжированием BM25.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param terms: Слова запроса
+    :param kind: 'homework', 'events' или None - искать везде
+    :param limit: Максимум записей
+    :return: Список словарей kind, text, created_at, snippet, rank - сначала самые релевантные
+    """
+    query = fts_query(terms)
+    if not query:
+        return []
+    result = await session.execute(
+        _SEARCH_NOTES, {"query": query, "group_tg_id": group_tg_id, "kind": kind, "limit": limit}
+    )
+    return [row._asdict() for row in result.all()]
+# endregion
+
 
+# region ДЗ с дедлайнами: добавление/напоминания/удаление истёкших
+HOMEWORK_FIELDS = ("id", "subject", "homework_data", "due_at")
+
+
+async def add_homework(session: AsyncSession, group_tg_id: int, subject: str, text: str, due_at: datetime,
+                       author: str | None = None, reminded: bool = False) -> int | None:
+    """
+    Добавляет задание с дедлайном; текст задания попадает и в историю ДЗ (notes).
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param subject: Предмет
+    :param text: Текст задания
+    :param due_at: Дедлайн
+    :param author: Username добавившего
+    :param reminded: True - напоминание не нужно (например, дедлайн слишком близко)
+    :return: ID задания или None, если группа не найдена
+    """
+    group = await GROUP_CACHE.get(session, group_tg_id)
+    if group is None:
+        return None
+
+    async with transactional_context(session):
+        homework = Homework(group_id=group.id, subject=subject, homework_data=text, due_at=due_at,
+                            created_at=datetime.now(), author=author, reminded=reminded)
+        session.add(homework)
+        await session.flush()
+        await add_note(session, group_tg_id, "homework", f"{subject}: {text} (до {due_at:%d.%m.%Y %H:%M})", author)
+        _notify_group_update(session, group_tg_id, "homeworks")
+
+    return homework.id
+
+
+async def get_group_homeworks(session: AsyncSession, group_tg_id: int, since: datetime | None = None) -> list[dict]:
+    """
+    Задания группы с дедлайном не раньше since, ближайшие первыми.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param since: Нижняя граница дедлайна (по умолчанию - сейчас)
+    :return: Список словарей id, subject, homework_data, due_at
+    """
+    result = await session.execute(
+        select(*(getattr(Homework, field) for field in HOMEWORK_FIELDS))
+        .where(Homework.group_id == _GROUP_ID, Homework.due_at >= (since or datetime.now()))
+        .order_by(Homework.due_at),
+        {"group_tg_id": group_tg_id}
+    )
+    return [row._asdict() for row in result.all()]
+
+
+async def delete_homework(session: AsyncSession, group_tg_id: int, homework_id: int) -> bool:
+    """
+    Удаляет задание группы.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param group_tg_id: Telegram ID группы
+    :param homework_id: ID задания
+    :return: True, если задание было удалено
+    """
+    async with transactional_context(session):
         result = await session.execute(
-            select(Group).filter_by(group_tg_id=group_tg_id)
+            delete(Homework).where(Homework.id == homework_id, Homework.group_id == _GROUP_ID),
+            {"group_tg_id": group_tg_id}
         )
-        group = result.scalar_one_or_none()
-        if group and hasattr(group, field):
-            setattr(group, field, value)
-            return f"Поле '{field}' обновлено для группы group_tg_id={group_tg_id}"
-        return f"Группа с group_tg_id={group_tg_id} не найдена"
+        if result.rowcount:
+            _notify_group_update(session, group_tg_id, "homeworks")
+    return bool(result.rowcount)
+
+
+async def get_pending_reminders(session: AsyncSession, after: datetime) -> list[tuple[int, datetime]]:
+    """
+    Задания, по которым ещё не отправлено напоминание - для начального заполнения очереди.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param after: Учитываются только дедлайны позже этого момента
+    :return: Список (ID задания, дедлайн)
+    """
+    result = await session.execute(
+        select(Homework.id, Homework.due_at).where(Homework.due_at > after, Homework.reminded.is_(False))
+    )
+    return list(result.tuples().all())
+
+
+async def get_homeworks_to_remind(session: AsyncSession, ids: list[int]) -> list[dict]:
+    """
+    Данные для напоминаний одним запросом: задания вместе с Telegram ID их групп.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param ids: ID заданий
+    :return: Список словарей id, group_tg_id, subject, homework_data, due_at (без уже напомненных)
+    """
+    if not ids:
+        return []
+    result = await session.execute(
+        select(Homework.id, Group.group_tg_id, Homework.subject, Homework.homework_data, Homework.due_at)
+        .join(Group, Homework.group_id == Group.id)
+        .where(Homework.id.in_(ids), Homework.reminded.is_(False))
+    )
+    return [row._asdict() for row in result.all()]
+
+
+async def mark_reminded(session: AsyncSession, ids: list[int]) -> int:
+    """
+    Отмечает отправленные напоминания одним UPDATE.
+
+    :return: Число отмеченных заданий
+    """
+    if not ids:
+        return 0
+    async with transactional_context(session):
+        result = await session.execute(update(Homework).where(Homework.id.in_(ids)).values(reminded=True))
+    return result.rowcount
+
+
+async def purge_expired_homeworks(session: AsyncSession, before: datetime) -> int:
+    """
+    Удаляет задания с дедлайном раньше before одним DELETE по индексу ix_homeworks_due_at.
+
+    :return: Число удалённых заданий
+    """
+    async with transactional_context(session):
+        result = await session.execute(delete(Homework).where(Homework.due_at < before))
+    return result.rowcount
+# endregion
+
+
+# region Новости: сохранение/получение
+def news_key(item: dict) -> str:
+    """
+    Ключ дедупликации новости: ссылка, а без неё - хэш заголовка и текста.
+
+    :param item: Новость из parse_news_data
+    :return: Строка-ключ
+    """
+    link = (item.get("link") or "").strip()
+    if link:
+        return link
+    content = f"{item.get('title') or ''}\n{item.get('text') or ''}"
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+async def upsert_news(session: AsyncSession, items: list[dict]) -> int:
+    """
+    Сохраняет новости с одной загрузки: новые добавляются, у известных обновляется last_seen.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param items: Новости в порядке страницы (сначала свежие)
+    :return: Число новых новостей
+    """
+    now = datetime.now()
+    rows, seen = [], set()
+    # Вставляем от старых к новым, чтобы id рос вместе со свежестью новости
+    for item in reversed(items):
+        key = news_key(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({
+            "news_key": key,
+            "title": item.get("title"),
+            "date": item.get("date"),
+            "author": item.get("author"),
+            "text": item.get("text"),
+            "link": item.get("link"),
+            "first_seen": now,
+            "last_seen": now,
+        })
+    if not rows:
+        return 0
+
+    async with transactional_context(session):
+        known = set((await session.execute(
+            select(News.news_key).where(News.news_key.in_(seen))
+        )).scalars())
+
+        stmt = insert(News).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[News.news_key],
+            set_={"last_seen": stmt.excluded.last_seen}
+        )
+        await session.execute(stmt)
+
+    return len(seen - known)
+
+
+async def get_latest_news(session: AsyncSession, limit: int = 20) -> list[dict]:
+    """
+    Возвращает последние новости, сначала свежие.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param limit: Максимум новостей
+    :return: Список словарей с ключами title, date, author, text, link
+    """
+    result = await session.execute(
+        select(News.title, News.date, News.author, News.text, News.link)
+        .order_by(News.id.desc())
+        .limit(limit)
+    )
+    return [row._asdict() for row in result.all()]
+
+
+def headline_hash(title: str) -> str:
+    """
+    Хэш заголовка для кэша релевантности (без учёта регистра и лишних пробелов).
+
+    :param title: Заголовок новости
+    :return: sha256 в hex
+    """
+    normalized = " ".join(title.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+async def get_news_relevance(session: AsyncSession, hashes: list[str]) -> dict[str, bool]:
+    """
+    Возвращает сохранённые решения о релевантности заголовков.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param hashes: Хэши заголовков (headline_hash)
+    :return: Словарь хэш -> релевантность для уже оценённых заголовков
+    """
+    if not hashes:
+        return {}
+    result = await session.execute(
+        select(NewsRelevance.headline_hash, NewsRelevance.relevant)
+        .where(NewsRelevance.headline_hash.in_(set(hashes)))
+    )
+    return dict(result.tuples().all())
+
+
+async def save_news_relevance(session: AsyncSession, decisions: dict[str, bool]) -> None:
+    """
+    Сохраняет решения о релевантности заголовков.
+
+    :param session: Асинхронная сессия SQLAlchemy
+    :param decisions: Словарь хэш заголовка -> релевантность
+    """
+    if not decisions:
+        return None
+
+    now = datetime.now()
+    stmt = insert(NewsRelevance).values([
+        {"headline_hash": h, "relevant": relevant, "classified_at": now} for h, relevant in decisions.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NewsRelevance.headline_hash],
+        set_={"relevant": stmt.excluded.relevant, "classified_at": stmt.excluded.classified_at}
+    )
+    async with transactional_context(session):
+        await session.execute(stmt)
+    return None
 # endregion
@@ -0,0 +1,57 @@
+import os
+import json
+
+import pytest
+
+from bot_api.file_cache import FileCache
+
+
+def write(path, data, mtime: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_reload_on_change(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, '{"a": 1}', 1_000_000_000)
+    cache = FileCache(check_interval=0)
+
+    assert cache.get(str(path), lambda p: json.load(open(p))) == {"a": 1}
+    assert cache.get(str(path), lambda p: json.load(open(p))) == {"a": 1}
+    write(path, '{"a": 22}', 2_000_000_000)
+    assert cache.get(str(path), lambda p: json.load(open(p))) == {"a": 22}
+    assert cache.stats()["loads"] == 2
+
+
+def test_broken_file_keeps_previous_value(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, '{"a": 1}', 1_000_000_000)
+    cache = FileCache(check_interval=0)
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return json.load(open(p))
+
+    assert cache.get(str(path), loader) == {"a": 1}
+
+    # Файл сохранён наполовину: отдаётся прежнее значение, пока файл снова не изменится
+    write(path, '{"a": ', 2_000_000_000)
+    assert cache.get(str(path), loader) == {"a": 1}
+    assert cache.get(str(path), loader) == {"a": 1}
+    assert len(calls) == 2 and cache.stats()["errors"] == 1
+
+    write(path, '{"a": 3}', 3_000_000_000)
+    assert cache.get(str(path), loader) == {"a": 3}
+
+    # Файл пропал - тоже прежнее значение
+    os.remove(path)
+    assert cache.get(str(path), loader) == {"a": 3}
+
+
+def test_broken_file_without_cache_raises(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, "{", 1_000_000_000)
+    with pytest.raises(json.JSONDecodeError):
+        FileCache().get(str(path), lambda p: json.load(open(p)))
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from bot_api.single_flight import SingleFlight
+
+
+class Work:
+    """
+    Работа, которая ждёт сигнала release и считает запуски.
+    """
+    def __init__(self, result=None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.started = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight, work = SingleFlight(), Work(result="ok")
+    callers = [asyncio.create_task(flight.do("key", work)) for _ in range(10)]
+    await asyncio.sleep(0)
+    work.release.set()
+
+    assert await asyncio.gather(*callers) == ["ok"] * 10
+    assert work.started == 1
+    assert flight.stats() == {"calls": 10, "executed": 1, "coalesced": 9, "in_flight": 0}
+
+    # После завершения тот же ключ выполняется заново
+    assert await flight.do("key", work) == "ok"
+    assert work.started == 2
+
+
+@pytest.mark.asyncio
+async def test_exception_propagates_to_all_callers():
+    flight, work = SingleFlight(), Work(error=ValueError("нет ответа"))
+    callers = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    work.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert work.started == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    flight, work = SingleFlight(), Work(result=42)
+    first = asyncio.create_task(flight.do("key", work))
+    others = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    work.release.set()
+
+    assert await asyncio.gather(*others) == [42, 42]
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert work.started == 1
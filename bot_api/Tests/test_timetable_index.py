@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+
+from bot_api.timetable_index import InvertedIndex, Slot, to_minutes, resolve_moment, parse_query
+
+
+def now_moment() -> tuple[int, int]:
+    now = datetime.datetime.now()
+    return now.weekday(), now.hour * 60 + now.minute
+
+
+def slot(weekday: int, start: str, end: str, teacher: str = "Иванов И. И.", room: str = "211") -> Slot:
+    return Slot(("ПМИ", 1, 1), {"weekday": weekday, "start": start, "end": end,
+                                "subject": "Алгебра", "teacher": teacher, "room": room})
+
+
+def test_to_minutes():
+    assert to_minutes("8:00") == 480
+    assert to_minutes("08:00:00") == 480
+    assert to_minutes("13:45") == 825
+
+
+def test_resolve_moment_day_and_time():
+    assert resolve_moment("Среда", "13:45") == (2, 825)
+    assert resolve_moment(" понедельник ", " 8:05 ") == (0, 485)
+
+    weekday, _ = now_moment()
+    assert resolve_moment("завтра", "10:00") == ((weekday + 1) % 7, 600)
+    assert resolve_moment("сегодня", "10:00") == (weekday, 600)
+
+
+@pytest.mark.parametrize("time", ["13.45", "13", "завтра 13:45", "25:00", "12:75", ""])
+def test_resolve_moment_bad_time_falls_back_to_now(time):
+    # Время от агента приходит как есть: некорректное не должно ронять поиск
+    weekday, minute = resolve_moment("вторник", time)
+    assert weekday == 1
+    assert abs(minute - now_moment()[1]) <= 1
+
+
+def test_parse_query():
+    assert parse_query("Иванов среда 13:45") == ("Иванов", 2, 825)
+    assert parse_query("Иванов И. пятница") == ("Иванов И.", 4, now_moment()[1])
+    assert parse_query("211 9:30") == ("211", now_moment()[0], 570)
+    assert parse_query("Петров") == ("Петров", *now_moment())
+
+
+def test_inverted_index_at():
+    index = InvertedIndex("teacher")
+    first, second, long = slot(0, "8:00", "9:35"), slot(0, "9:50", "11:25"), slot(0, "9:00", "13:00")
+    for item in (second, first, long, slot(1, "8:00", "9:35")):
+        index.add(item)
+    key, = index.find("иванов")
+
+    assert index.at(key, 0, 7 * 60) == ([], first)
+    assert index.at(key, 0, 9 * 60 + 10) == ([first, long], second)
+    # Конец занятия не входит в интервал, начало - входит
+    assert index.at(key, 0, 9 * 60 + 50) == ([long, second], None)
+    assert index.at(key, 0, 12 * 60) == ([long], None)
+    assert index.at(key, 0, 13 * 60) == ([], None)
+    assert index.at(key, 6, 9 * 60) == ([], None)
+
+
+def test_inverted_index_find_by_prefix():
+    index = InvertedIndex("teacher")
+    index.add(slot(0, "8:00", "9:35", teacher="Иванов Иван Иванович"))
+    index.add(slot(0, "8:00", "9:35", teacher="Иванова Мария Петровна"))
+
+    assert index.find("иванов иван") == ["иванов иван иванович"]
+    # Точное совпадение слова важнее совпадения по началу
+    assert index.find("иванов") == ["иванов иван иванович"]
+    assert len(index.find("ива")) == 2
+    assert index.find("сидоров") == []
@@ -1,4 +1,11 @@
-from .AI import AIModelAPI, AIModelLocal
+from .AI import AIModelAPI
+
+
+def __getattr__(name):
+    if name == "AIModelLocal":
+        from .AI import AIModelLocal
+        return AIModelLocal
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ['AIModelAPI', 'AIModelLocal']
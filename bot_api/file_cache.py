@@ -0,0 +1,84 @@
+import os
+import time
+import logging
+from typing import Any, Callable, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Кэш разобранного содержимого файлов с перезагрузкой при изменении файла.
+
+    Значение пересчитывается, только если у файла изменились mtime или размер.
+    Файл проверяется (os.stat) не чаще, чем раз в check_interval секунд,
+    поэтому горячий путь обходится без обращений к диску.
+    Если изменённый файл не читается (например, сохранён наполовину), остаётся прежнее значение.
+
+    :param check_interval: Минимальный интервал между проверками файла, сек
+    """
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        # ключ -> (подпись файла, время проверки, значение)
+        self._entries: dict[Hashable, tuple[tuple[int, int], float, Any]] = {}
+
+        self.hits = 0
+        self.loads = 0
+        self.errors = 0
+
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+    def get(self, path: str, loader: Callable[[str], Any], kind: Hashable = None) -> Any:
+        """
+        Возвращает закэшированное значение или загружает файл заново.
+
+        :param path: Путь к файлу
+        :param loader: Функция path -> значение (чтение и разбор файла)
+        :param kind: Что именно построено из файла (для нескольких значений из одного файла)
+        :return: Значение loader(path) для текущей версии файла
+        :raises: Ошибку чтения/разбора, только если прежнего значения нет
+        """
+        key = (os.path.abspath(path), kind)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[1] < self.check_interval:
+            self.hits += 1
+            return entry[2]
+
+        try:
+            signature = self._signature(path)
+            if entry is not None and signature == entry[0]:
+                self._entries[key] = (signature, now, entry[2])
+                self.hits += 1
+                return entry[2]
+            value = loader(path)
+        except Exception:
+            if entry is None:
+                raise
+            self.errors += 1
+            logger.warning("Не удалось перечитать %s, используется прежняя версия", path, exc_info=True)
+            # Повторная попытка - после следующего изменения файла (если файла нет - через check_interval)
+            try:
+                signature = self._signature(path)
+            except OSError:
+                signature = entry[0]
+            self._entries[key] = (signature, now, entry[2])
+            return entry[2]
+
+        self._entries[key] = (signature, now, value)
+        self.loads += 1
+        return value
+
+
+    def stats(self) -> dict:
+        """
+        Счётчики: обращений из кэша, загрузок файлов и неудачных перезагрузок.
+        """
+        return {"entries": len(self._entries), "hits": self.hits, "loads": self.loads, "errors": self.errors}
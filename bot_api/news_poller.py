@@ -0,0 +1,127 @@
+import time
+import asyncio
+import logging
+
+from bot_api.Database import async_session, upsert_news, get_latest_news
+from bot_api.parsing.parsers import CONFIG_PATH, parse_news_data
+from bot_api.single_flight import SingleFlight
+from config import news_max_age, news_limit
+
+
+ERROR_COOLDOWN = 60  # После неудачной загрузки не пытаться обновлять новости при запросе столько секунд
+
+logger = logging.getLogger(__name__)
+
+
+class NewsPoller:
+    """
+    Фоновый опрос новостей сайта с сохранением в таблицу news.
+
+    Команды и агент читают новости из таблицы и не ходят на сайт. Если последняя
+    успешная загрузка старше max_age (например, опрос отключён или сайт был недоступен),
+    новости обновляются при запросе - один раз, даже если запросов пришло несколько.
+
+    :param path_to_yaml_cfg: Путь к конфигу парсинга
+    :param max_age: Допустимая давность новостей, сек
+    :param limit: Сколько последних новостей отдавать
+    """
+    def __init__(self, path_to_yaml_cfg: str = CONFIG_PATH, max_age: float = news_max_age, limit: int = news_limit):
+        self.path_to_yaml_cfg = path_to_yaml_cfg
+        self.max_age = max_age
+        self.limit = limit
+
+        self._flight = SingleFlight()
+        self.last_success: float | None = None
+        self.last_error: float | None = None
+
+        self.runs = 0
+        self.errors = 0
+        self.last_fetch_seconds = 0.0
+        self.last_items = 0
+        self.last_new = 0
+
+
+    async def poll_once(self) -> int:
+        """
+        Загружает новости и сохраняет новые в таблицу.
+
+        :return: Число новых новостей
+        """
+        return await self._flight.do("poll", self._poll)
+
+
+    async def _poll(self) -> int:
+        started = time.perf_counter()
+        self.runs += 1
+        try:
+            items = await parse_news_data(self.path_to_yaml_cfg)
+            async with async_session() as session:
+                new = await upsert_news(session, items)
+                await session.commit()
+        except Exception:
+            self.errors += 1
+            self.last_error = time.monotonic()
+            raise
+
+        self.last_fetch_seconds = time.perf_counter() - started
+        self.last_items = len(items)
+        self.last_new = new
+        self.last_success = time.monotonic()
+        logger.info("Новости: загружено %d, новых %d за %.2f с", len(items), new, self.last_fetch_seconds)
+        return new
+
+
+    def age(self) -> float | None:
+        """
+        Сколько секунд прошло с последней успешной загрузки (None - загрузок ещё не было).
+        """
+        return None if self.last_success is None else time.monotonic() - self.last_success
+
+
+    async def latest(self) -> list[dict]:
+        """
+        Последние новости из таблицы; при устаревании сначала обновляет их.
+
+        :return: Список новостей, сначала свежие
+        """
+        age = self.age()
+        cooling_down = self.last_error is not None and time.monotonic() - self.last_error < ERROR_COOLDOWN
+        if (age is None or age > self.max_age) and not cooling_down:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Не удалось обновить новости, отдаём сохранённые")
+
+        async with async_session() as session:
+            return await get_latest_news(session, self.limit)
+
+
+    async def watch(self, interval: float) -> None:
+        """
+        Периодически опрашивает сайт.
+
+        :param interval: Период в секундах
+        """
+        while True:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Ошибка опроса новостей")
+            await asyncio.sleep(interval)
+
+
+    def stats(self) -> dict:
+        """
+        Метрики опроса: длительность последней загрузки, число новостей, ошибки и давность.
+        """
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_fetch_s": self.last_fetch_seconds,
+            "last_items": self.last_items,
+            "last_new": self.last_new,
+            "age_s": self.age(),
+        }
+
+
+NEWS_POLLER = NewsPoller()
@@ -0,0 +1,150 @@
+import re
+import logging
+import urllib.parse
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+from bot_api.parsing.parsers_utils import clear_text
+
+
+DEFAULT_BACKEND = "lxml"
+FALLBACK_BACKEND = "html.parser"
+
+# Простой селектор контейнера: тег с необязательным #id или одним .class
+_SIMPLE_SELECTOR = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*)?(?:#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+))?$")
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_backend(name: str | None) -> str:
+    """
+    Проверяет, что парсер установлен (lxml, html5lib, html.parser).
+
+    :param name: Имя парсера из конфига
+    :return: Имя доступного парсера (html.parser, если запрошенного нет)
+    """
+    name = name or DEFAULT_BACKEND
+    if builder_registry.lookup(name) is None:
+        logger.warning("Парсер %r не установлен, используется %r", name, FALLBACK_BACKEND)
+        return FALLBACK_BACKEND
+    return name
+
+
+def container_strainer(selector: str | None) -> SoupStrainer | None:
+    """
+    SoupStrainer для простого селектора контейнера: при разборе строится только его поддерево.
+
+    :param selector: CSS-селектор контейнера
+    :return: SoupStrainer или None, если селектор сложнее "tag", "tag#id", "tag.class"
+    """
+    match = _SIMPLE_SELECTOR.match((selector or "").strip())
+    if not match or not any(match.groupdict().values()):
+        return None
+    attrs = {}
+    if match["id"]:
+        attrs["id"] = match["id"]
+    if match["cls"]:
+        attrs["class"] = re.compile(rf"(^|\s){re.escape(match['cls'])}(\s|$)")
+    return SoupStrainer(match["tag"], attrs=attrs)
+
+
+class FieldPlan:
+    """
+    Извлечение одного поля: скомпилированный селектор и способ получить значение.
+
+    :param key: Имя поля
+    :param conf: Селектор-строка или словарь {selector, attribute} из конфига
+    :param to_lower: Приводить текст к нижнему регистру
+    """
+    __slots__ = ("key", "selector", "attribute", "to_lower")
+
+    def __init__(self, key: str, conf: str | dict, to_lower: bool = False):
+        self.key = key
+        if isinstance(conf, dict):
+            self.selector = soupsieve.compile(conf.get("selector"))
+            self.attribute = conf.get("attribute")
+        else:
+            self.selector = soupsieve.compile(conf)
+            self.attribute = None
+        self.to_lower = to_lower
+
+
+    def extract(self, node) -> str | None:
+        element = self.selector.select_one(node)
+        if element is None:
+            return None
+        if self.attribute is not None:
+            # Если атрибута нет (например, attribute: "text"), берём текст как есть
+            return element.get(self.attribute, element.text.strip())
+        return clear_text(element.text.strip(), to_lower=self.to_lower)
+
+
+class DataPagePlan:
+    """
+    Информационная страница (data): набор полей со всей страницы.
+    """
+    def __init__(self, site: str, base_url: str, page: dict):
+        self.site = site
+        self.name = page["name"]
+        self.url = base_url + page["path"]
+        self.fields = [FieldPlan(key, conf, to_lower=True) for key, conf in page["selectors"].items()]
+
+
+    def extract(self, html: str, backend: str) -> dict[str, str | None]:
+        soup = BeautifulSoup(html, backend)
+        return {field.key: field.extract(soup) for field in self.fields}
+
+
+class NewsPagePlan:
+    """
+    Страница новостей: контейнер, селектор элемента и поля каждой новости.
+    Разбирается только поддерево контейнера, если его селектор позволяет.
+    """
+    def __init__(self, site: str, base_url: str, page: dict):
+        self.site = site
+        self.name = page["name"]
+        self.base_url = base_url
+        self.url = urllib.parse.urljoin(base_url, page["path"])
+        self.container = soupsieve.compile(page.get("container"))
+        self.strainer = container_strainer(page.get("container"))
+        self.item = soupsieve.compile(page.get("item_selector"))
+        self.fields = [FieldPlan(key, conf) for key, conf in page["selectors"].items()]
+
+
+    def extract(self, html: str, backend: str) -> list[dict]:
+        # html5lib не поддерживает parse_only
+        strainer = self.strainer if backend != "html5lib" else None
+        soup = BeautifulSoup(html, backend, parse_only=strainer)
+        container = self.container.select_one(soup)
+        if container is None:
+            return []
+
+        news_list = []
+        for item in self.item.select(container):
+            news = {field.key: field.extract(item) for field in self.fields}
+            # Если ссылка относительная, склеиваем с base_url
+            news['link'] = urllib.parse.urljoin(self.base_url, news.get('link') or '')
+            news_list.append(news)
+        return news_list
+
+
+class ParsingPlan:
+    """
+    Конфиг парсинга, один раз скомпилированный в планы извлечения.
+
+    :param config: Содержимое config.yaml
+    """
+    def __init__(self, config: dict):
+        parsers = config.get("parsers", {})
+        self.headers = parsers.get("headers", {})
+        self.backend = resolve_backend(parsers.get("backend"))
+
+        self.data_pages: list[DataPagePlan] = []
+        self.news_pages: dict[str, list[NewsPagePlan]] = {}
+        for site, site_config in config["websites"].items():
+            base_url = site_config["base_url"]
+            pages = site_config.get("pages", {})
+            self.data_pages += [DataPagePlan(site, base_url, page) for page in pages.get("data", [])]
+            self.news_pages[site] = [NewsPagePlan(site, base_url, page) for page in pages.get("news", [])]
@@ -0,0 +1,171 @@
+import random
+import asyncio
+import logging
+import urllib.parse
+from typing import Any
+
+import aiohttp
+from multidict import CIMultiDict
+
+
+# Ответы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """
+    Асинхронный HTTP-клиент парсеров.
+
+    Одна сессия aiohttp на процесс (keep-alive, общий пул соединений), ограничение
+    одновременных запросов к одному хосту, таймауты и повтор с экспоненциальной задержкой.
+    Сессия создаётся при первом запросе внутри работающего event loop.
+
+    :param limit: Максимум соединений в пуле
+    :param limit_per_host: Одновременных запросов к одному хосту
+    :param timeout: Таймаут запроса целиком, сек
+    :param retries: Сколько раз повторить запрос после ошибки
+    :param backoff: Базовая задержка перед повтором, сек (удваивается с каждой попыткой)
+    """
+    def __init__(self, limit: int = 20, limit_per_host: int = 4, timeout: float = 15.0,
+                 retries: int = 3, backoff: float = 0.5):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self._session: aiohttp.ClientSession | None = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self.not_modified = 0
+
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                raise_for_status=False
+            )
+        return self._session
+
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urllib.parse.urlsplit(url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.limit_per_host)
+        return semaphore
+
+
+    def _delay(self, attempt: int, response: aiohttp.ClientResponse | None = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random() / 2)
+
+
+    async def _request(self, url: str, headers: dict[str, str | None] | None,
+                       as_json: bool) -> tuple[int, Any, CIMultiDict]:
+        session = self._get_session()
+        headers = {k: v for k, v in (headers or {}).items() if v is not None}
+
+        async with self._host_limit(url):
+            for attempt in range(self.retries + 1):
+                self.requests += 1
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status in RETRY_STATUSES and attempt < self.retries:
+                            delay = self._delay(attempt, response)
+                        else:
+                            response.raise_for_status()
+                            if response.status == 304:
+                                body = None
+                            elif as_json:
+                                body = await response.json(content_type=None)
+                            else:
+                                body = await response.text()
+                            return response.status, body, response.headers.copy()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt >= self.retries:
+                        self.failed += 1
+                        raise
+                    delay = self._delay(attempt)
+                    logger.warning("Ошибка запроса %s: %r, повтор через %.1f с", url, e, delay)
+                except aiohttp.ClientResponseError:
+                    self.failed += 1
+                    raise
+
+                self.retried += 1
+                await asyncio.sleep(delay)
+
+
+    async def get(self, url: str, headers: dict[str, str | None] | None = None, as_json: bool = False) -> Any:
+        """
+        GET-запрос с повторами.
+
+        :param url: Ссылка
+        :param headers: Заголовки запроса
+        :param as_json: Разобрать ответ как JSON
+        :return: Текст ответа или разобранный JSON
+        """
+        _, body, _ = await self._request(url, headers, as_json)
+        return body
+
+
+    async def get_conditional(self, url: str, etag: str | None = None, last_modified: str | None = None,
+                              headers: dict[str, str | None] | None = None) -> tuple[str | None, str | None, str | None]:
+        """
+        Условный GET: сервер отвечает 304 без тела, если ресурс не изменился.
+
+        :param url: Ссылка
+        :param etag: ETag из прошлого ответа
+        :param last_modified: Last-Modified из прошлого ответа
+        :param headers: Заголовки запроса
+        :return: Текст ответа (None при 304), новые ETag и Last-Modified
+        """
+        headers = {**(headers or {}), "If-None-Match": etag, "If-Modified-Since": last_modified}
+        status, body, response_headers = await self._request(url, headers, as_json=False)
+        if status == 304:
+            self.not_modified += 1
+            return None, etag, last_modified
+        return body, response_headers.get("ETag"), response_headers.get("Last-Modified")
+
+
+    async def get_text(self, url: str, headers: dict[str, str | None] | None = None) -> str:
+        return await self.get(url, headers)
+
+
+    async def get_json(self, url: str, headers: dict[str, str | None] | None = None) -> Any:
+        return await self.get(url, headers, as_json=True)
+
+
+    async def close(self) -> None:
+        """
+        Закрывает сессию и соединения пула.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+    def stats(self) -> dict:
+        """
+        Счётчики: отправлено запросов, из них повторов, окончательных ошибок и ответов 304.
+        """
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed,
+            "not_modified": self.not_modified,
+            "hosts": len(self._hosts),
+        }
+
+
+HTTP = HttpClient()
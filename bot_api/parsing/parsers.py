@@ -1,9 +1,50 @@
 from bot_api.parsing.parsers_utils import *
-import urllib.parse
+from bot_api.parsing.schedule_builder import build_course_lessons
+from bot_api.parsing.extraction import ParsingPlan, DataPagePlan, NewsPagePlan
+from bot_api.parsing.http_client import HTTP
+from bot_api import timetable_index
+import json
+import time
+import asyncio
+import hashlib
+from os import path
+
+
+CONFIG_PATH = path.join(path.dirname(path.abspath(__file__)), "config.yaml")
+
+COURSE_TTL = 300    # Сколько секунд переиспользовать расписание курса без перепроверки на сервере
+
+
+class CoursePayload:
+    """
+    Закэшированный ответ API расписания одного курса.
+
+    etag/last_modified нужны для условного запроса, digest - хэш тела:
+    если сервер не поддерживает условные запросы, неизменное тело не разбирается повторно.
+    """
+    __slots__ = ("etag", "last_modified", "digest", "lessons", "checked")
+
+    def __init__(self, etag: str | None, last_modified: str | None, digest: str, lessons: dict):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.lessons = lessons
+        self.checked = time.monotonic()
 
 
-# TODO переделать через os
-PATH_TO_YAML = "C:\\Users\\Admin\\PycharmProjects\\TG_bot\\bot_api\\parsing\\config.yaml"
+_COURSES: dict[int, CoursePayload] = {}
+
+
+async def load_plan(path_to_yaml_cfg: str) -> ParsingPlan:
+    """
+    Конфиг парсинга, скомпилированный в планы извлечения.
+    Перекомпилируется, только если файл конфига изменился.
+
+    :param path_to_yaml_cfg: Путь к конфигу для парсинга
+    :return: ParsingPlan
+    """
+    config = await load_config(path_to_yaml_cfg)
+    return CONFIG_FILES.get(path_to_yaml_cfg, lambda _: ParsingPlan(config), kind=ParsingPlan)
 
 
 # Парсинг информации/ новостей/ расписания
@@ -14,28 +55,19 @@ async def parse_info_data(path_to_yaml_cfg: str) -> list[str]:
     :param path_to_yaml_cfg: Путь к конфигу для парсинга
     :return: Список различной информации
     """
-    total_data = []
-    config = await load_config(path_to_yaml_cfg)
-    headers = config["parsers"]["headers"]
-    websites = config["websites"]
-    for site, site_config in websites.items():
+    plan = await load_plan(path_to_yaml_cfg)
 
-        base_url = site_config['base_url']
-        print(f"\n\nОбработка сайта: {site} ({base_url})")
+    async def parse_page(page: DataPagePlan) -> dict[str, str | None]:
+        print(f"Парсинг data-страницы '{page.name}' ({page.site}) по URL: {page.url}")
 
-        pages = site_config.get('pages', {})
+        html = await fetch_page(page.url, plan.headers)
+        data = page.extract(html, plan.backend)
 
-        # Обработка информационных страниц (data)
-        for page in pages.get('data', []):
-            url = base_url + page['path']
-            print(f"Парсинг data-страницы '{page['name']}' по URL: {url}")
+        print("Полученные данные:", data)
+        return data
 
-            html = await fetch_page(url, headers)
-            soup = BeautifulSoup(html, 'html.parser')
-            data = await parse_selectors(soup, page['selectors'])
-
-            total_data.append(data)
-            print("Полученные данные:", data)
+    # Все страницы всех сайтов загружаются одновременно, порядок результатов сохраняется
+    total_data = list(await asyncio.gather(*(parse_page(page) for page in plan.data_pages)))
 
     # script_dir = os.path.dirname(os.path.abspath(__file__))
     # parent_dir = os.path.abspath(os.path.join(script_dir, ".."))
@@ -47,44 +79,26 @@ async def parse_info_data(path_to_yaml_cfg: str) -> list[str]:
     return total_data
 
 
-async def parse_news_data(path_to_yaml_cfg: str = PATH_TO_YAML) -> list[dict]:
+async def parse_news_data(path_to_yaml_cfg: str = CONFIG_PATH) -> list[dict]:
     """
     Парсит только первую страницу новостей из конфига и возвращает список новостей.
 
     :param path_to_yaml_cfg: Путь к конфигу для парсинга
     :return: Список новостей, где каждый элемент — dict с ключами: title, date, text, link, image
     """
-    total_data_news = []
-
-    config = await load_config(path_to_yaml_cfg)
-    headers = config["parsers"]["headers"]
-    websites = config["websites"]
+    plan = await load_plan(path_to_yaml_cfg)
 
-    for site_cfg in websites.values():
-        base_url = site_cfg['base_url']
+    async def parse_page(page: NewsPagePlan) -> list[dict]:
+        html = await fetch_page(page.url, plan.headers)
+        return page.extract(html, plan.backend)
 
-        # Берём только первую новостную страницу
-        news_pages = site_cfg.get('pages', {}).get('news', [])[:1]
-        for page in news_pages:
-            page_url = urllib.parse.urljoin(base_url, page['path'])
-            html = await fetch_page(page_url, headers)
-            soup = BeautifulSoup(html, 'html.parser')
-            container = soup.select_one(page.get('container'))
-            if container is None:
-                continue
+    # Берём только первую новостную страницу каждого сайта
+    pages = [site_pages[0] for site_pages in plan.news_pages.values() if site_pages]
 
-            items = container.select(page.get('item_selector'))
-            for item in items:
-                news = await parse_item(item, page['selectors'])
-                if not isinstance(news, dict):
-                    continue
-
-                # Если ссылка относительная, склеиваем с base_url
-                link = news.get('link', '')
-                full_link = urllib.parse.urljoin(base_url, link)
-                news['link'] = full_link
-
-                total_data_news.append(news)
+    # Сайты загружаются одновременно, новости идут в порядке сайтов из конфига
+    total_data_news = []
+    for page_news in await asyncio.gather(*(parse_page(page) for page in pages)):
+        total_data_news.extend(page_news)
 
     return total_data_news
 
@@ -98,6 +112,17 @@ async def parse_format_news(path_to_yaml_cfg: str) -> str:
     :return: Строка для отправки в Telegram
     """
     items = await parse_news_data(path_to_yaml_cfg)
+    return format_news(items)
+
+
+def format_news(items: list[dict]) -> str:
+    """
+    Форматирует список новостей в одну строку (заголовок и ссылка через перенос строки).
+    Пропускает новости без заголовка.
+
+    :param items: Список новостей (словари с ключами title, link, ...)
+    :return: Строка для отправки в Telegram
+    """
     if not items:
         return "Новости не найдены."
 
@@ -117,11 +142,87 @@ async def parse_format_news(path_to_yaml_cfg: str) -> str:
     return "Новости МехМата и ЮФУ:\n\n" + "\n\n".join(lines)
 
 
+def format_notes(notes: list[dict], terms: str) -> str:
+    """
+    Форматирует найденные записи истории ДЗ/событий (см. search_notes): дата, тип и фрагмент текста.
+
+    :param notes: Записи, сначала самые релевантные
+    :param terms: Исходный запрос - для сообщения «ничего не найдено»
+    :return: Строка для отправки в Telegram
+    """
+    if not notes:
+        return f"По запросу «{terms}» ничего не найдено."
+
+    kinds = {"homework": "ДЗ", "events": "События"}
+    lines = [f"{note['created_at']:%d.%m.%Y} [{kinds.get(note['kind'], note['kind'])}]\n{note['snippet']}"
+             for note in notes]
+    return f"Найдено по запросу «{terms}»:\n\n" + "\n\n".join(lines)
+
+
+def format_homeworks(items: list[dict]) -> str:
+    """
+    Форматирует задания с дедлайнами (см. get_group_homeworks): номер, дедлайн, предмет и текст.
+
+    :param items: Задания, ближайшие первыми
+    :return: Строка для отправки в Telegram
+    """
+    if not items:
+        return "Заданий с дедлайнами нет."
+
+    lines = [f"#{item['id']} до {item['due_at']:%d.%m %H:%M} - {item['subject']}\n{item['homework_data']}"
+             for item in items]
+    return "Дедлайны:\n\n" + "\n\n".join(lines)
+
+
+async def course_lessons(path_to_yaml_cfg: str, course: int,
+                         max_age: float = COURSE_TTL) -> dict[tuple[str, int], list[dict]]:
+    """
+    Занятия всех групп курса.
+
+    Ответ API кэшируется по курсу: в течение max_age секунд используется без запросов,
+    после - перепроверяется условным запросом (ETag/Last-Modified) и хэшем тела,
+    и занятия пересобираются, только если ответ действительно изменился.
+
+    :param path_to_yaml_cfg: Путь к конфигу для парсинга
+    :param course: Курс
+    :param max_age: Сколько секунд считать кэш свежим без перепроверки (0 - перепроверить сейчас)
+    :return: Словарь (название, номер группы) -> занятия (см. build_course_lessons)
+    """
+    cached = _COURSES.get(course)
+    if cached is not None and time.monotonic() - cached.checked < max_age:
+        return cached.lessons
+    return await PAGE_FLIGHT.do(("course", course), lambda: _revalidate_course(path_to_yaml_cfg, course))
+
+
+async def _revalidate_course(path_to_yaml_cfg: str, course: int) -> dict[tuple[str, int], list[dict]]:
+    config = await load_config(path_to_yaml_cfg)
+    websites = config["websites"]
+
+    base_url = websites['MMCS_schedule']['base_url']
+    base_url = base_url + str(course)
+
+    cached = _COURSES.get(course)
+    etag, last_modified = (cached.etag, cached.last_modified) if cached else (None, None)
+    body, etag, last_modified = await HTTP.get_conditional(base_url, etag, last_modified)
+
+    if body is not None:
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        if cached is None or cached.digest != digest:
+            lessons = build_course_lessons(json.loads(body))
+            cached = _COURSES[course] = CoursePayload(etag, last_modified, digest, lessons)
+            # Индексы преподавателей/аудиторий: переиндексируются только изменившиеся группы
+            timetable_index.TIMETABLE.replace_course(course, lessons)
+
+    cached.etag, cached.last_modified = etag, last_modified
+    cached.checked = time.monotonic()
+    return cached.lessons
+
+
 async def parse_schedule(path_to_yaml_cfg: str,
                    group='ПМИ',
                    number=1,
                    course=1
-) -> dict[str, str] | str:
+) -> list[dict] | str:
     """
     Функция парсинга расписания
 
@@ -129,108 +230,14 @@ async def parse_schedule(path_to_yaml_cfg: str,
     :param group: Название курса
     :param number: Номер группы
     :param course: Курс
-    :return: Словарь расписания, где дни недели - ключи.
+    :return: Занятия группы (строки для таблицы lessons) или сообщение, что группа не найдена.
     """
-    config = await load_config(path_to_yaml_cfg)
-    websites = config["websites"]
-
-    base_url = websites['MMCS_schedule']['base_url']
-    base_url = base_url + str(course)
+    lessons = await course_lessons(path_to_yaml_cfg, course)
 
-    response = requests.get(base_url)
-    response.raise_for_status()
-
-    data = response.json()
-
-    groups = [g for g in data['groups'] if g['name'] == group and g.get('grorder') == number]
-    if not groups:
+    result = lessons.get((group, number))
+    if result is None:
         return f"Группа '{group}' с номером {number} не найдена."
 
-    # Собираем ID найденных групп
-    group_ids = [g['id'] for g in groups]
-
-    # Отбираем занятия для этих групп
-    lessons = [lesson for lesson in data['lessons'] if lesson['groupid'] in group_ids]
-
-    # Создаём словарь для расписания по дням (0 - понедельник, 5 - суббота)
-    schedule = {i: [] for i in range(6)}
-
-    for lesson in lessons:
-        # Парсим время занятия
-        timeslot = lesson['timeslot'].strip('()')
-        parts = [part.strip() for part in timeslot.split(',')]
-        if len(parts) < 4:
-            continue  # Пропускаем некорректный формат
-
-        day_of_week = int(parts[0])
-        start_time = parts[1]
-        end_time = parts[2]
-
-        # Обрабатываем все учебные планы
-        for subnum in range(1, lesson['subcount'] + 1):
-            curriculum = next(
-                (c for c in data['curricula'] if c['lessonid'] == lesson['id'] and c['subnum'] == subnum),
-                None
-            )
-            if curriculum:
-                entry = {
-                    'start': start_time,
-                    'end': end_time,
-                    'subject': curriculum['subjectabbr'],
-                    'teacher': curriculum['teachername'],
-                    'room': curriculum['roomname'],
-                    'info': lesson['info']
-                }
-                schedule[day_of_week].append(entry)
-
-    # Сортируем занятия в каждом дне по времени начала
-    for day_num in schedule:
-        schedule[day_num].sort(key=lambda x: x['start'])
-
-    async def format_schedule(sched):
-        res = {
-            'понедельник': '',
-            'вторник': '',
-            'среда': '',
-            'четверг': '',
-            'пятница': '',
-            'суббота': '',
-        }
-
-        days_dict = {
-            0: 'понедельник',
-            1: 'вторник',
-            2: 'среда',
-            3: 'четверг',
-            4: 'пятница',
-            5: 'суббота',
-        }
-
-        def format_day(day_list):
-            day_string = ''
-            for i in day_list:
-                pair = (' ' +
-                        i['start'] + '-' + i['end'] + '\n ' +
-                        i['subject'] + '\n ' +
-                        i['teacher'] + '\n ' +
-                        i['room'] + '\n\n'
-                        )
-                day_string += pair
-            return day_string
-
-        for i in sched:
-            day = days_dict[i]
-            if sched[i]:
-                res[day] = '\n' + format_day(sched[i]) + '\n'
-                # print(day, res[day])
-            else:
-                res[day] = '\n' + ' не учимся' '\n'
-                # print(day, res[day])
-        return res
-
-
-    result = await format_schedule(schedule)
-
     # script_dir = os.path.dirname(os.path.abspath(__file__))
     # parent_dir = os.path.abspath(os.path.join(script_dir, ".."))
     # file_path = os.path.join(parent_dir, "AI", "embeddings_data", "json_data", "schedule.json")
@@ -238,7 +245,7 @@ async def parse_schedule(path_to_yaml_cfg: str,
     # with open(file_path, "w", encoding="utf-8") as f:
     #     json.dump(result, f, ensure_ascii=False, indent=4)
 
-    return result
+    return [dict(lesson) for lesson in result]
 
 
 async def format_schedule(schedule, day=None):
@@ -0,0 +1,107 @@
+DAYS = ('понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота')
+NO_LESSONS = '\n' + ' не учимся' '\n'
+
+
+def parse_timeslot(timeslot: str) -> tuple[int, str, str] | None:
+    """
+    Разбирает timeslot занятия вида "(0,08:00:00,09:35:00,full)".
+
+    :param timeslot: Строка timeslot из API расписания
+    :return: День недели (0 - понедельник), начало и конец или None при некорректном формате
+    """
+    parts = [part.strip() for part in timeslot.strip('()').split(',')]
+    if len(parts) < 4:
+        return None
+    return int(parts[0]), parts[1], parts[2]
+
+
+def format_day(day_list: list[dict]) -> str:
+    """
+    Текст одного дня расписания.
+
+    :param day_list: Занятия дня, отсортированные по началу
+    :return: Строка для хранения в Group.schedule
+    """
+    if not day_list:
+        return NO_LESSONS
+
+    day_string = ''
+    for i in day_list:
+        day_string += (' ' +
+                       i['start'] + '-' + i['end'] + '\n ' +
+                       i['subject'] + '\n ' +
+                       i['teacher'] + '\n ' +
+                       i['room'] + '\n\n'
+                       )
+    return '\n' + day_string + '\n'
+
+
+def build_course_lessons(data: dict) -> dict[tuple[str, int], list[dict]]:
+    """
+    Занятия всех групп курса за один проход по ответу API.
+
+    Учебные планы индексируются по (lessonid, subnum), занятия раскладываются
+    по группам через индекс groupid -> группа, поэтому каждый список просматривается один раз.
+
+    :param data: JSON курса (groups, lessons, curricula)
+    :return: Словарь (название, номер группы) -> занятия (weekday, start, end, subject, teacher, room),
+             отсортированные по дню и началу
+    """
+    curricula = {}
+    for c in data['curricula']:
+        curricula.setdefault((c['lessonid'], c['subnum']), c)
+
+    # Несколько записей groups с одинаковыми названием и номером - одна группа
+    group_keys = {g['id']: (g['name'], g.get('grorder')) for g in data['groups']}
+    lessons = {key: [] for key in group_keys.values()}
+
+    for lesson in data['lessons']:
+        key = group_keys.get(lesson['groupid'])
+        if key is None:
+            continue
+
+        slot = parse_timeslot(lesson['timeslot'])
+        if slot is None or not 0 <= slot[0] < len(DAYS):
+            continue  # Пропускаем некорректный формат
+        day_of_week, start_time, end_time = slot
+
+        for subnum in range(1, lesson['subcount'] + 1):
+            curriculum = curricula.get((lesson['id'], subnum))
+            if curriculum:
+                lessons[key].append({
+                    'weekday': day_of_week,
+                    'start': start_time,
+                    'end': end_time,
+                    'subject': curriculum['subjectabbr'],
+                    'teacher': curriculum['teachername'],
+                    'room': curriculum['roomname'],
+                })
+
+    for group_lessons in lessons.values():
+        group_lessons.sort(key=lambda x: (x['weekday'], x['start']))
+    return lessons
+
+
+def render_schedule(lessons: list[dict], weekdays=None) -> dict[str, str]:
+    """
+    Текст расписания по дням из занятий.
+
+    :param lessons: Занятия, отсортированные по дню и началу
+    :param weekdays: Номера дней для вывода (None - вся неделя)
+    :return: Словарь день недели -> текст дня
+    """
+    by_day = {day_num: [] for day_num in (range(len(DAYS)) if weekdays is None else weekdays)}
+    for lesson in lessons:
+        if lesson['weekday'] in by_day:
+            by_day[lesson['weekday']].append(lesson)
+    return {DAYS[day_num]: format_day(day_lessons) for day_num, day_lessons in by_day.items()}
+
+
+def build_course_schedules(data: dict) -> dict[tuple[str, int], dict[str, str]]:
+    """
+    Текстовые расписания всех групп курса (см. build_course_lessons).
+
+    :param data: JSON курса (groups, lessons, curricula)
+    :return: Словарь (название, номер группы) -> расписание по дням недели
+    """
+    return {key: render_schedule(lessons) for key, lessons in build_course_lessons(data).items()}
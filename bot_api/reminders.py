@@ -0,0 +1,227 @@
+import time
+import heapq
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from bot_api.Database import (async_session, get_pending_reminders, get_homeworks_to_remind,
+                              mark_reminded, purge_expired_homeworks)
+from config import homework_remind_before, homework_keep_after, homework_purge_interval, reminder_send_rate
+
+
+BATCH_SIZE = 500     # Максимум заданий, забираемых из очереди за один запрос к БД
+ERROR_COOLDOWN = 60  # Пауза после ошибки цикла, сек
+
+logger = logging.getLogger(__name__)
+
+
+def parse_due(date: str, time_of_day: str | None = None, now: datetime | None = None) -> datetime | None:
+    """
+    Дедлайн из аргументов команды. Без года - ближайшая такая дата, без времени - конец дня.
+
+    :param date: "25.12" или "25.12.2025"
+    :param time_of_day: "18:00"
+    :param now: Текущий момент (для тестов)
+    :return: Дедлайн или None, если дата некорректна
+    """
+    now = now or datetime.now()
+    try:
+        parts = [int(part) for part in date.split(".")]
+        hour, minute = (int(part) for part in time_of_day.split(":")) if time_of_day else (23, 59)
+        if len(parts) == 2:
+            due = datetime(now.year, parts[1], parts[0], hour, minute)
+            return due if due >= now else due.replace(year=now.year + 1)
+        if len(parts) == 3:
+            return datetime(parts[2], parts[1], parts[0], hour, minute)
+    except ValueError:
+        return None
+    return None
+
+
+def format_reminder(items: list[dict]) -> str:
+    lines = [f"{item['subject']} - до {item['due_at']:%d.%m %H:%M}\n{item['homework_data']}"
+             for item in sorted(items, key=lambda item: item["due_at"])]
+    return "Напоминание о дедлайнах:\n\n" + "\n\n".join(lines)
+
+
+class ReminderScheduler:
+    """
+    Напоминания о дедлайнах ДЗ в чаты групп.
+
+    Очередь - куча (время напоминания, ID задания): цикл спит до ближайшего напоминания
+    и не опрашивает базу. Новое задание добавляется через schedule(); если оно раньше
+    текущего ближайшего, цикл просыпается досрочно. Удалённые задания из кучи не вынимаются:
+    их просто не окажется в БД, когда подойдёт их время.
+
+    Наступившие напоминания забираются пачкой, данные по ним читаются одним запросом,
+    в каждый чат уходит одно сообщение со всеми его заданиями (не быстрее send_rate сообщений в секунду).
+    Истёкшие задания удаляются одним DELETE раз в purge_interval.
+
+    :param remind_before: За сколько секунд до дедлайна напоминать
+    :param keep_after: Сколько секунд хранить задание после дедлайна
+    :param purge_interval: Период удаления истёкших заданий, сек
+    :param send_rate: Сообщений в секунду
+    """
+    def __init__(self, remind_before: float = homework_remind_before, keep_after: float = homework_keep_after,
+                 purge_interval: float = homework_purge_interval, send_rate: int = reminder_send_rate):
+        self.remind_before = timedelta(seconds=remind_before)
+        self.keep_after = timedelta(seconds=keep_after)
+        self.purge_interval = timedelta(seconds=purge_interval)
+        self.send_rate = max(1, send_rate)
+
+        self._heap: list[tuple[datetime, int]] = []
+        self._wakeup = asyncio.Event()
+        self._next_purge = datetime.now()
+
+        self.sent = 0
+        self.reminded = 0
+        self.errors = 0
+        self.purged = 0
+        self.wakeups = 0
+
+
+    def remind_at(self, due_at: datetime) -> datetime:
+        return due_at - self.remind_before
+
+
+    def schedule(self, homework_id: int, due_at: datetime) -> None:
+        """
+        Ставит напоминание о задании в очередь.
+
+        :param homework_id: ID задания
+        :param due_at: Дедлайн
+        """
+        entry = (self.remind_at(due_at), homework_id)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+
+    async def load(self) -> int:
+        """
+        Заполняет очередь заданиями из БД, по которым ещё не было напоминания.
+
+        :return: Размер очереди
+        """
+        async with async_session() as session:
+            pending = await get_pending_reminders(session, datetime.now())
+        self._heap = [(self.remind_at(due_at), homework_id) for homework_id, due_at in pending]
+        heapq.heapify(self._heap)
+        return len(self._heap)
+
+
+    async def run_due(self, send: Callable[[int, str], Awaitable]) -> int:
+        """
+        Отправляет все наступившие напоминания.
+
+        :param send: Отправка сообщения: send(chat_id, text)
+        :return: Число заданий, по которым отправлены напоминания
+        """
+        reminded = 0
+        now = datetime.now()
+        while self._heap and self._heap[0][0] <= now:
+            ids = []
+            while self._heap and self._heap[0][0] <= now and len(ids) < BATCH_SIZE:
+                ids.append(heapq.heappop(self._heap)[1])
+
+            async with async_session() as session:
+                items = await get_homeworks_to_remind(session, ids)
+            by_chat: dict[int, list[dict]] = {}
+            for item in items:
+                by_chat.setdefault(item["group_tg_id"], []).append(item)
+            await self._send_all(send, by_chat)
+
+            # Отмечаются и задания чатов, куда отправить не удалось: повтор упрётся в ту же ошибку
+            async with async_session() as session:
+                reminded += await mark_reminded(session, [item["id"] for item in items])
+                await session.commit()
+        self.reminded += reminded
+        return reminded
+
+
+    async def _send_all(self, send: Callable[[int, str], Awaitable], by_chat: dict[int, list[dict]]) -> None:
+        chats = list(by_chat.items())
+        for start in range(0, len(chats), self.send_rate):
+            started = time.monotonic()
+            await asyncio.gather(*(self._send_one(send, chat_id, items)
+                                   for chat_id, items in chats[start:start + self.send_rate]))
+            if start + self.send_rate < len(chats):
+                await asyncio.sleep(max(0.0, 1 - (time.monotonic() - started)))
+
+
+    async def _send_one(self, send: Callable[[int, str], Awaitable], chat_id: int, items: list[dict]) -> None:
+        try:
+            await send(chat_id, format_reminder(items))
+            self.sent += 1
+        except Exception:
+            self.errors += 1
+            logger.exception("Не удалось отправить напоминание в чат %s", chat_id)
+
+
+    async def purge(self) -> int:
+        """
+        Удаляет задания, дедлайн которых прошёл больше keep_after назад.
+
+        :return: Число удалённых заданий
+        """
+        async with async_session() as session:
+            purged = await purge_expired_homeworks(session, datetime.now() - self.keep_after)
+            await session.commit()
+        self.purged += purged
+        self._next_purge = datetime.now() + self.purge_interval
+        return purged
+
+
+    async def _sleep(self) -> None:
+        # Спим до ближайшего напоминания или удаления; schedule() может разбудить раньше
+        moment = min(self._heap[0][0], self._next_purge) if self._heap else self._next_purge
+        timeout = (moment - datetime.now()).total_seconds()
+        if timeout <= 0:
+            return
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+    async def watch(self, send: Callable[[int, str], Awaitable]) -> None:
+        """
+        Основной цикл: напоминания и удаление истёкших заданий.
+
+        :param send: Отправка сообщения: send(chat_id, text), например bot.send_message
+        """
+        while True:
+            try:
+                await self.load()
+                break
+            except Exception:
+                logger.exception("Не удалось загрузить очередь напоминаний")
+                await asyncio.sleep(ERROR_COOLDOWN)
+
+        while True:
+            try:
+                await self._sleep()
+                self.wakeups += 1
+                await self.run_due(send)
+                if datetime.now() >= self._next_purge:
+                    await self.purge()
+            except Exception:
+                logger.exception("Ошибка планировщика напоминаний")
+                await asyncio.sleep(ERROR_COOLDOWN)
+
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._heap),
+            "next_at": self._heap[0][0] if self._heap else None,
+            "sent": self.sent,
+            "reminded": self.reminded,
+            "errors": self.errors,
+            "purged": self.purged,
+            "wakeups": self.wakeups,
+        }
+
+
+REMINDERS = ReminderScheduler()
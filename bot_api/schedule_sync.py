@@ -0,0 +1,107 @@
+import time
+import asyncio
+import logging
+
+from bot_api.Database import async_session, get_groups_for_sync, replace_group_lessons
+from bot_api.parsing.parsers import CONFIG_PATH, course_lessons
+from config import timetable_courses
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleSync:
+    """
+    Фоновое обновление расписаний всех зарегистрированных групп.
+
+    Ответ API скачивается один раз на курс (с условным запросом, см. course_lessons),
+    занятия всех групп курса пересчитываются, а в таблице lessons одной транзакцией
+    заменяются занятия только тех групп, у которых расписание изменилось.
+
+    Курсы extra_courses скачиваются всегда: из них строятся индексы преподавателей
+    и аудиторий (TIMETABLE) по всем группам факультета.
+
+    :param path_to_yaml_cfg: Путь к конфигу парсинга
+    :param extra_courses: Курсы, синхронизируемые без зарегистрированных групп
+    """
+    def __init__(self, path_to_yaml_cfg: str = CONFIG_PATH, extra_courses=()):
+        self.path_to_yaml_cfg = path_to_yaml_cfg
+        self.extra_courses = set(extra_courses)
+
+        self.runs = 0
+        self.last_run: dict = {}
+
+
+    async def run_once(self) -> dict:
+        """
+        Один проход синхронизации.
+
+        :return: Итоги прохода: курсов, групп, обновлено, не найдено в API, ошибки курсов, время
+        """
+        started = time.perf_counter()
+        # Короткие сессии: соединение не удерживается, пока скачиваются расписания курсов
+        async with async_session() as session:
+            groups = await get_groups_for_sync(session)
+
+        courses = sorted({course for _, _, _, course, _, _ in groups} | self.extra_courses)
+        results = await asyncio.gather(
+            *(course_lessons(self.path_to_yaml_cfg, course, max_age=0) for course in courses),
+            return_exceptions=True
+        )
+
+        by_course, failed = {}, []
+        for course, result in zip(courses, results):
+            if isinstance(result, Exception):
+                logger.warning("Не удалось обновить расписание курса %s: %r", course, result)
+                failed.append(course)
+            else:
+                by_course[course] = result
+
+        changed, missing = {}, 0
+        for group_id, group_tg_id, name, course, number, lessons in groups:
+            if course not in by_course:
+                continue
+            new_lessons = by_course[course].get((name, number))
+            if new_lessons is None:
+                missing += 1
+            elif new_lessons != lessons:
+                changed[group_id] = (group_tg_id, new_lessons)
+
+        updated = 0
+        if changed:
+            async with async_session() as session:
+                updated = await replace_group_lessons(session, changed)
+                await session.commit()
+
+        self.runs += 1
+        self.last_run = {
+            "courses": len(courses),
+            "groups": len(groups),
+            "updated": updated,
+            "missing": missing,
+            "failed_courses": failed,
+            "seconds": time.perf_counter() - started,
+        }
+        logger.info("Синхронизация расписаний: %s", self.last_run)
+        return self.last_run
+
+
+    async def watch(self, interval: float) -> None:
+        """
+        Периодически запускает синхронизацию.
+
+        :param interval: Период в секундах
+        """
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Ошибка синхронизации расписаний")
+            await asyncio.sleep(interval)
+
+
+    def stats(self) -> dict:
+        return {"runs": self.runs, **self.last_run}
+
+
+SCHEDULE_SYNC = ScheduleSync(extra_courses=timetable_courses)
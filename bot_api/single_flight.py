@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Объединяет одинаковые одновременные запросы в один.
+
+    Первый вызывающий с данным ключом запускает работу, остальные ждут тот же
+    результат (или то же исключение). Отмена одного из ожидающих не отменяет работу для остальных.
+    """
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Исключение получат ожидающие, не логируем его повторно
+
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет func() или присоединяется к уже идущему вызову с тем же ключом.
+
+        :param key: Ключ идентичной работы
+        :param func: Фабрика корутины, выполняющей работу
+        :return: Результат работы
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+    def stats(self) -> dict:
+        """
+        Счётчики: всего вызовов, реально выполнено и сколько дублей схлопнуто.
+        """
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
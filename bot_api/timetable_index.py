@@ -0,0 +1,381 @@
+import re
+import bisect
+import datetime
+
+from bot_api.parsing.schedule_builder import DAYS
+
+
+# Группа в индексе: (курс, название, номер) - как в ответе API расписания
+GroupKey = tuple[int, str, int]
+
+DAY_START = 8 * 60    # Границы учебного дня для поиска окон, минуты
+DAY_END = 20 * 60
+
+_TIME = re.compile(r"^\d{1,2}:\d{2}$")
+
+
+def to_minutes(value: str) -> int:
+    """
+    :param value: Время "08:00:00" или "8:00"
+    :return: Минуты от начала суток
+    """
+    hours, minutes = value.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def fmt_minutes(value: int) -> str:
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().replace("ё", "е").replace(".", ". ").split())
+
+
+class Slot:
+    """
+    Занятие в индексе: время в минутах, группа, предмет, преподаватель, аудитория.
+    """
+    __slots__ = ("weekday", "start", "end", "group", "subject", "teacher", "room")
+
+    def __init__(self, group: GroupKey, lesson: dict):
+        self.weekday = lesson["weekday"]
+        self.start = to_minutes(lesson["start"])
+        self.end = to_minutes(lesson["end"])
+        self.group = group
+        self.subject = lesson["subject"]
+        self.teacher = lesson["teacher"]
+        self.room = lesson["room"]
+
+
+    def describe(self, with_teacher: bool = True, with_room: bool = True) -> str:
+        course, name, number = self.group
+        parts = [f"{fmt_minutes(self.start)}-{fmt_minutes(self.end)} {self.subject}",
+                 f"{name}-{number} ({course} курс)"]
+        if with_teacher:
+            parts.append(self.teacher)
+        if with_room:
+            parts.append(f"ауд. {self.room}")
+        return ", ".join(parts)
+
+
+def _start_key(slot: Slot) -> int:
+    return slot.start
+
+
+class InvertedIndex:
+    """
+    Значение поля (преподаватель, аудитория) -> занятия по дням недели, отсортированные по началу.
+    Поиск по имени - по словам: каждое слово запроса - начало какого-то слова значения.
+    """
+    def __init__(self, field: str):
+        self.field = field
+        self._buckets: dict[str, list[list[Slot]]] = {}
+        self._display: dict[str, str] = {}
+        self._tokens: dict[str, set[str]] = {}
+        self.max_duration = 0
+
+
+    def add(self, slot: Slot) -> None:
+        value = getattr(slot, self.field)
+        key = normalize(value)
+        if not key:
+            return
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [[] for _ in DAYS]
+            self._display[key] = value
+            for token in key.split():
+                self._tokens.setdefault(token, set()).add(key)
+        bisect.insort(bucket[slot.weekday], slot, key=_start_key)
+        self.max_duration = max(self.max_duration, slot.end - slot.start)
+
+
+    def remove(self, slots: list[Slot]) -> None:
+        emptied = set()
+        for slot in slots:
+            key = normalize(getattr(slot, self.field))
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            # Занятие ищется бинарным поиском по началу, а не обходом всего дня
+            day = bucket[slot.weekday]
+            i = bisect.bisect_left(day, slot.start, key=_start_key)
+            while i < len(day) and day[i] is not slot:
+                i += 1
+            if i < len(day):
+                del day[i]
+                if not day:
+                    emptied.add(key)
+        for key in emptied:
+            bucket = self._buckets[key]
+            if not any(bucket):
+                del self._buckets[key], self._display[key]
+                for token in set(key.split()):
+                    names = self._tokens[token]
+                    names.discard(key)
+                    if not names:
+                        del self._tokens[token]
+
+
+    def find(self, query: str) -> list[str]:
+        """
+        :param query: Имя или его часть ("Иванов", "иванов и", "211")
+        :return: Нормализованные значения, подходящие под запрос
+        """
+        words = normalize(query).split()
+        if not words:
+            return []
+        if normalize(query) in self._buckets:
+            return [normalize(query)]
+
+        matched = None
+        for word in words:
+            keys = set(self._tokens.get(word, ()))
+            if not keys:
+                for token, names in self._tokens.items():
+                    if token.startswith(word):
+                        keys |= names
+            matched = keys if matched is None else matched & keys
+            if not matched:
+                return []
+        return sorted(matched)
+
+
+    def display(self, key: str) -> str:
+        return self._display[key]
+
+
+    def day(self, key: str, weekday: int) -> list[Slot]:
+        return self._buckets[key][weekday] if 0 <= weekday < len(DAYS) else []
+
+
+    def at(self, key: str, weekday: int, minute: int) -> tuple[list[Slot], Slot | None]:
+        """
+        Интервальный поиск: занятия, идущие в момент minute, и ближайшее следующее.
+
+        :return: (идущие занятия, следующее занятие или None)
+        """
+        day = self.day(key, weekday)
+        index = bisect.bisect_right(day, minute, key=_start_key)
+        current = []
+        # Начавшиеся не позже minute: назад не дальше самого длинного занятия
+        i = index - 1
+        while i >= 0 and day[i].start >= minute - self.max_duration:
+            if day[i].end > minute:
+                current.append(day[i])
+            i -= 1
+        return current[::-1], day[index] if index < len(day) else None
+
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class TimetableIndex:
+    """
+    Индексы расписания всех известных групп: преподаватель -> занятия и аудитория -> занятия.
+
+    Строится из занятий, разобранных из ответа API по курсам (см. course_lessons),
+    и обновляется по группам: переиндексируются только группы, у которых изменились занятия.
+    """
+    def __init__(self):
+        self._groups: dict[GroupKey, tuple[list[dict], list[Slot]]] = {}
+        self.teachers = InvertedIndex("teacher")
+        self.rooms = InvertedIndex("room")
+        self.updates = 0
+
+
+    # region Обновление
+    def replace_group(self, group: GroupKey, lessons: list[dict]) -> bool:
+        """
+        Переиндексирует занятия одной группы.
+
+        :param group: (курс, название, номер)
+        :param lessons: Занятия группы (см. build_course_lessons)
+        :return: True, если занятия изменились
+        """
+        current = self._groups.get(group)
+        if current is not None and current[0] == lessons:
+            return False
+        self.remove_group(group)
+
+        slots = [Slot(group, lesson) for lesson in lessons]
+        for slot in slots:
+            self.teachers.add(slot)
+            self.rooms.add(slot)
+        self._groups[group] = (lessons, slots)
+        self.updates += 1
+        return True
+
+
+    def remove_group(self, group: GroupKey) -> None:
+        current = self._groups.pop(group, None)
+        if current and current[1]:
+            self.teachers.remove(current[1])
+            self.rooms.remove(current[1])
+
+
+    def replace_course(self, course: int, lessons: dict[tuple[str, int], list[dict]]) -> int:
+        """
+        Обновляет индекс по свежему ответу API курса.
+
+        :param course: Курс
+        :param lessons: Словарь (название, номер группы) -> занятия
+        :return: Число переиндексированных групп
+        """
+        stale = [group for group in self._groups if group[0] == course and group[1:] not in lessons]
+        for group in stale:
+            self.remove_group(group)
+        changed = sum(self.replace_group((course, name, number), group_lessons)
+                      for (name, number), group_lessons in lessons.items())
+        return changed + len(stale)
+    # endregion
+
+
+    # region Запросы
+    def find_groups(self, name: str, number: int, course: int | None = None) -> list[GroupKey]:
+        name = normalize(name)
+        return [group for group in self._groups
+                if normalize(group[1]) == name and group[2] == number and (course is None or group[0] == course)]
+
+
+    def free_slots(self, groups: list[GroupKey], weekday: int, min_length: int = 30,
+                   day_start: int = DAY_START, day_end: int = DAY_END) -> list[tuple[int, int]]:
+        """
+        Общие окна нескольких групп в учебный день.
+
+        :param groups: Группы
+        :param weekday: День недели (0 - понедельник)
+        :param min_length: Минимальная длина окна, минуты
+        :return: Список окон (начало, конец) в минутах
+        """
+        busy = sorted((slot.start, slot.end) for group in groups
+                      for slot in self._groups.get(group, ((), ()))[1] if slot.weekday == weekday)
+        windows, cursor = [], day_start
+        for start, end in busy:
+            if start - cursor >= min_length:
+                windows.append((cursor, min(start, day_end)))
+            cursor = max(cursor, end)
+            if cursor >= day_end:
+                break
+        if day_end - cursor >= min_length:
+            windows.append((cursor, day_end))
+        return windows
+
+
+    def stats(self) -> dict:
+        return {"groups": len(self._groups), "teachers": len(self.teachers),
+                "rooms": len(self.rooms), "updates": self.updates}
+    # endregion
+
+
+TIMETABLE = TimetableIndex()
+
+
+# region Ответы для команд и агента
+def resolve_moment(day: str | None = None, time: str | None = None) -> tuple[int, int]:
+    """
+    День недели и время запроса; по умолчанию - сейчас.
+
+    :param day: День недели, "сегодня" или "завтра"
+    :param time: Время "13:45"; некорректное (например, от LLM: "13.45", "13") - текущее время
+    :return: (день недели, минуты)
+    """
+    now = datetime.datetime.now()
+    weekday = now.weekday()
+    if day:
+        day = day.lower().strip()
+        if day in DAYS:
+            weekday = DAYS.index(day)
+        elif day == "завтра":
+            weekday = (weekday + 1) % 7
+    minute = now.hour * 60 + now.minute
+    time = (time or "").strip()
+    if _TIME.match(time):
+        hours, minutes = map(int, time.split(":"))
+        if hours < 24 and minutes < 60:
+            minute = hours * 60 + minutes
+    return weekday, minute
+
+
+def parse_query(text: str) -> tuple[str, int, int]:
+    """
+    Разбирает аргументы команды: имя, затем необязательные день и время.
+
+    :param text: Например "Иванов среда 13:45"
+    :return: (имя, день недели, минуты)
+    """
+    words = text.split()
+    day = time = None
+    while words and (words[-1].lower() in DAYS or words[-1].lower() in ("сегодня", "завтра") or _TIME.match(words[-1])):
+        word = words.pop()
+        if _TIME.match(word):
+            time = word
+        else:
+            day = word
+    return " ".join(words), *resolve_moment(day, time)
+
+
+def parse_group(token: str, course: int) -> tuple[str, int, int] | None:
+    """
+    :param token: Группа "ФИИТ-2" или с курсом "ФИИТ-2-3"
+    :param course: Курс по умолчанию
+    :return: (название, номер, курс) или None
+    """
+    parts = token.rsplit("-", 2)
+    if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+        return parts[0], int(parts[1]), int(parts[2])
+    name, _, number = token.rpartition("-")
+    if name and number.isdigit():
+        return name, int(number), course
+    return None
+
+
+def describe_teacher(query: str, weekday: int, minute: int, index: TimetableIndex = TIMETABLE) -> str:
+    names = index.teachers.find(query)
+    if not names:
+        return f"Преподаватель «{query}» не найден в расписании."
+    if weekday >= len(DAYS):
+        return "В воскресенье занятий нет."
+
+    lines = []
+    for key in names[:5]:
+        current, following = index.teachers.at(key, weekday, minute)
+        lines.append(index.teachers.display(key) + ":")
+        lines += [f"  сейчас: {slot.describe(with_teacher=False)}" for slot in current]
+        if following is not None:
+            lines.append(f"  далее: {following.describe(with_teacher=False)}")
+        if not current and following is None:
+            lines.append(f"  до конца дня ({DAYS[weekday]}) занятий нет")
+    return "\n".join(lines)
+
+
+def describe_room(query: str, weekday: int, minute: int, index: TimetableIndex = TIMETABLE) -> str:
+    rooms = index.rooms.find(query)
+    if not rooms:
+        return f"Аудитория «{query}» не найдена в расписании: вероятно, свободна."
+    if weekday >= len(DAYS):
+        return "В воскресенье занятий нет."
+
+    lines = []
+    for key in rooms[:5]:
+        current, following = index.rooms.at(key, weekday, minute)
+        state = "занята" if current else "свободна"
+        lines.append(f"Ауд. {index.rooms.display(key)} в {fmt_minutes(minute)} ({DAYS[weekday]}): {state}")
+        lines += [f"  {slot.describe(with_room=False)}" for slot in current]
+        if following is not None:
+            lines.append(f"  далее: {following.describe(with_room=False)}")
+    return "\n".join(lines)
+
+
+def describe_free_slots(groups: list[GroupKey], weekday: int, index: TimetableIndex = TIMETABLE) -> str:
+    if weekday >= len(DAYS):
+        return "В воскресенье занятий нет - свободен весь день."
+    labels = ", ".join(f"{name}-{number}" for _, name, number in groups)
+    windows = index.free_slots(groups, weekday)
+    if not windows:
+        return f"Общих окон у {labels} ({DAYS[weekday]}) нет."
+    return f"Общие окна {labels} ({DAYS[weekday]}):\n" + "\n".join(
+        f"  {fmt_minutes(start)}-{fmt_minutes(end)}" for start, end in windows
+    )
+# endregion
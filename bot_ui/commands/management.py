@@ -1,50 +1,57 @@
+import re
 from aiogram import Router, types #, F
 from aiogram.filters import Command, Filter
 # from aiogram.enums.chat_type import ChatType
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot_api.Database.requests import (
-    get_group_by_tg_id,
     is_student_leader,
     add_group,
     add_student,
+    add_students_bulk,
     delete_student,
-    update_leader,
-    is_leader_here
+    update_leader
 )
-from bot_api.Database.models import async_session
+from bot_api.Database.models import Student
+from bot_api.Database.group_cache import GroupSnapshot
 
 
 management_router = Router()
 
+ROSTER_MAX_BYTES = 256 * 1024   # Максимальный размер файла со списком студентов
+ROSTER_LIST_LIMIT = 20          # Сколько username перечислять в отчёте по каждой категории
+
+# Username Telegram: 5-32 символа, латиница, цифры и _, начинается с буквы
+_USERNAME = re.compile(r"^@[A-Za-z][A-Za-z0-9_]{4,31}$")
+_ROSTER_SEPARATORS = re.compile(r"[,;\t ]+")
+_ROSTER_HEADERS = {"username", "@username", "ник", "логин", "telegram"}
+
 # region Фильтры
+# Группа чата (снимок из GROUP_CACHE), студент-отправитель и сессия приходят из DbSessionMiddleware
+
 # Фильтр: группа должна быть создана
 class IsGroupCreated(Filter):
-    async def __call__(self, message: types.Message) -> bool:
-        async with async_session() as session:
-            grp = await get_group_by_tg_id(session, message.chat.id)
-            return grp is not None
+    async def __call__(self, message: types.Message, group: GroupSnapshot | None = None) -> bool:
+        return group is not None
 
 # Фильтр: только староста
 class IsLeader(Filter):
-    async def __call__(self, message: types.Message) -> bool:
-        username = '@' + message.from_user.username
-        async with async_session() as session:
-            return await is_student_leader(session, username)
+    async def __call__(self, message: types.Message, student: Student | None = None) -> bool:
+        return student is not None and student.student_is_leader
 
 # Фильтр: старосты пока нет
 class IsLeaderHere(Filter):
-    async def __call__(self, message: types.Message) -> bool:
-        async with async_session() as session:
-            return await is_leader_here(session, message.chat.id)
+    async def __call__(self, message: types.Message, group: GroupSnapshot | None = None) -> bool:
+        return group is not None and group.leader_username is not None
 
 # Фильтр: старосты пока нет или староста
 class IsLeaderNotHereOrIsLeader(Filter):
-    async def __call__(self, message: types.Message) -> bool:
-        async with async_session() as session:
-            leader_exists = await is_leader_here(session, message.chat.id)
-            if not leader_exists:
-                return True
-            return await is_student_leader(session, '@' + message.from_user.username)
+    async def __call__(
+        self, message: types.Message, group: GroupSnapshot | None = None, student: Student | None = None
+    ) -> bool:
+        if student is not None and student.student_is_leader:
+            return True
+        return group is None or group.leader_username is None
 # endregion
 
 
@@ -53,7 +60,7 @@ class IsLeaderNotHereOrIsLeader(Filter):
     Command("create_group"),
     # F.chat.type == ChatType.PRIVATE
 )
-async def cmd_create_group(message: types.Message):
+async def cmd_create_group(message: types.Message, session: AsyncSession):
     amount = 5
     args = message.text.split(maxsplit=amount)
 
@@ -78,18 +85,20 @@ async def cmd_create_group(message: types.Message):
         number = int(number)
         course = int(course)
 
-        schedule = await parse_schedule(path_to_yaml_cfg, name, number, course)
-
-        async with async_session() as session:
-            await add_group(
-                session,
-                group_tg_id=tg_chat_id,
-                name=name,
-                course=int(course),
-                number=int(number),
-                link=link,
-                schedule=schedule
-            )
+        lessons = await parse_schedule(path_to_yaml_cfg, name, number, course)
+        if isinstance(lessons, str):
+            await message.answer(lessons)
+            lessons = None
+
+        await add_group(
+            session,
+            group_tg_id=tg_chat_id,
+            name=name,
+            course=int(course),
+            number=int(number),
+            link=link,
+            lessons=lessons
+        )
         await message.answer(f"Группа «{name}» ({tg_chat_id}) создана.")
     else:
         return await message.answer("Ссылка на группу должна начинаться с 'https://t.me/'")
@@ -104,7 +113,7 @@ async def cmd_create_group(message: types.Message):
     IsGroupCreated(),
     IsLeaderNotHereOrIsLeader()
 )
-async def cmd_add_student(message: types.Message):
+async def cmd_add_student(message: types.Message, session: AsyncSession):
     amount = 5
     args = message.text.split(maxsplit=amount)
 
@@ -116,8 +125,7 @@ async def cmd_add_student(message: types.Message):
     leader = (leader == '1')
 
     if username and username.startswith("@"):
-        async with async_session() as session:
-            result = await add_student(session, username=username, full_name=full_name, is_leader=leader, group_tg_id=message.chat.id)
+        result = await add_student(session, username=username, full_name=full_name, is_leader=leader, group_tg_id=message.chat.id)
         await message.answer(result)
     else:
         return await message.answer("Никнейм должен начинаться с '@'")
@@ -125,6 +133,81 @@ async def cmd_add_student(message: types.Message):
     return None
 
 
+def parse_roster(text: str) -> tuple[list[tuple[str, str]], list[str]]:
+    """
+    Разбирает список студентов: по строке на студента, «@username Фамилия Имя [Отчество]».
+    Разделители - пробел, запятая, точка с запятой или табуляция (CSV); строка-заголовок пропускается.
+
+    :param text: Текст списка или файла
+    :return: (корректные строки (@username, полное имя) без повторов, описания ошибок)
+    """
+    students, errors, seen = [], [], set()
+    for number, line in enumerate(text.splitlines(), start=1):
+        tokens = [token.strip('"') for token in _ROSTER_SEPARATORS.split(line.strip()) if token.strip('"')]
+        if not tokens or (number == 1 and tokens[0].lower() in _ROSTER_HEADERS):
+            continue
+
+        username = tokens[0] if tokens[0].startswith("@") else "@" + tokens[0]
+        if not _USERNAME.match(username):
+            errors.append(f"строка {number}: некорректный username «{tokens[0]}»")
+        elif len(tokens) < 3:
+            errors.append(f"строка {number}: нужны фамилия и имя")
+        elif username.lower() in seen:
+            errors.append(f"строка {number}: {username} уже есть в списке")
+        else:
+            seen.add(username.lower())
+            students.append((username, " ".join(tokens[1:])))
+    return students, errors
+
+
+def _short_list(items: list[str]) -> str:
+    listed = ", ".join(items[:ROSTER_LIST_LIMIT])
+    return listed + (f" и ещё {len(items) - ROSTER_LIST_LIMIT}" if len(items) > ROSTER_LIST_LIMIT else "")
+
+
+# /import_students
+@management_router.message(
+    Command("import_students"),
+    IsGroupCreated(),
+    IsLeaderNotHereOrIsLeader()
+)
+async def cmd_import_students(message: types.Message, session: AsyncSession):
+    """
+    Добавляет в группу сразу весь список студентов - текстом после команды
+    или файлом (CSV/TXT) с командой в подписи.
+    """
+    usage = ("Использование: /import_students и список, по студенту на строке:\n"
+             "@username Фамилия Имя\n\n"
+             "Или отправьте файл .csv/.txt с командой /import_students в подписи.")
+    if message.document is not None:
+        if message.document.file_size and message.document.file_size > ROSTER_MAX_BYTES:
+            return await message.answer(f"Файл слишком большой (больше {ROSTER_MAX_BYTES // 1024} КБ).")
+        data = (await message.bot.download(message.document)).read()
+        try:
+            text = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            text = data.decode("cp1251", errors="replace")  # CSV из Excel
+    else:
+        parts = message.text.split(maxsplit=1)
+        text = parts[1] if len(parts) == 2 else ""
+
+    students, errors = parse_roster(text)
+    if not students and not errors:
+        return await message.answer(usage)
+
+    added, conflicts = await add_students_bulk(session, message.chat.id, students)
+
+    lines = [f"Добавлено студентов: {len(added)}."]
+    if conflicts:
+        lines.append(f"Уже зарегистрированы ({len(conflicts)}): {_short_list(conflicts)}")
+    if errors:
+        lines.append(f"Пропущено строк с ошибками: {len(errors)}")
+        lines += errors[:ROSTER_LIST_LIMIT]
+        if len(errors) > ROSTER_LIST_LIMIT:
+            lines.append(f"... и ещё {len(errors) - ROSTER_LIST_LIMIT}")
+    return await message.answer("\n".join(lines))
+
+
 # /rm_student
 @management_router.message(
     Command("rm_student"),
@@ -132,7 +215,7 @@ async def cmd_add_student(message: types.Message):
     IsGroupCreated(),
     IsLeaderNotHereOrIsLeader()
 )
-async def cmd_rm_student(message: types.Message):
+async def cmd_rm_student(message: types.Message, session: AsyncSession):
     amount = 2
     args = message.text.split(maxsplit=amount)
 
@@ -142,13 +225,12 @@ async def cmd_rm_student(message: types.Message):
 
     if username and username.startswith("@"):
 
-        async with async_session() as session:
-            isl = await is_student_leader(session=session, username=username)
-            if not isl:
-                result = await delete_student(session, username)
-                await message.answer(result)
-            else:
-                return await message.answer("Чтобы удалить старосту - его нужно переназначить")
+        isl = await is_student_leader(session=session, username=username)
+        if not isl:
+            result = await delete_student(session, username)
+            await message.answer(result)
+        else:
+            return await message.answer("Чтобы удалить старосту - его нужно переназначить")
     else:
         return await message.answer("Никнейм должен начинаться с '@'")
 
@@ -161,7 +243,7 @@ async def cmd_rm_student(message: types.Message):
     # F.chat.type == ChatType.PRIVATE,
     IsGroupCreated(), IsLeader()
 )
-async def cmd_cd_leader(message: types.Message):
+async def cmd_cd_leader(message: types.Message, session: AsyncSession):
     amount = 2
     args = message.text.split(maxsplit=amount)
 
@@ -170,8 +252,7 @@ async def cmd_cd_leader(message: types.Message):
     _, username = args
 
     if username and username.startswith("@"):
-        async with async_session() as session:
-            result = await update_leader(session, username)
+        result = await update_leader(session, username)
         await message.answer(result)
     else:
         return await message.answer("Никнейм должен начинаться с '@'")
@@ -1,32 +1,44 @@
+import re
+from datetime import datetime
 from aiogram import Router, types, F
 from aiogram.filters import Command, Filter
 # from aiogram.enums.chat_type import ChatType
-from config import API_DS, model_url, model_name
-from bot_api.Database.requests import get_group_field, get_group_by_tg_id, update_group_field
-from bot_api.Database.models import async_session
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import deepseek_api
+from bot_api.Database.requests import (get_group_field, update_group_field, get_group_lessons, search_notes,
+                                      add_homework, get_group_homeworks, delete_homework)
+from bot_api.Database.group_cache import GroupSnapshot
+from bot_ui.commands.management import IsLeader
 
-from bot_api.AI import AIModelAPI
+from bot_api.parsing.parsers import format_schedule, format_news, format_notes, format_homeworks
+from bot_api.parsing.schedule_builder import DAYS, render_schedule
+from bot_api.news_poller import NEWS_POLLER
+from bot_api.reminders import REMINDERS, parse_due
+from bot_api.timetable_index import (TIMETABLE, parse_query, parse_group, resolve_moment,
+                                     describe_teacher, describe_room, describe_free_slots)
 
-from bot_api.parsing.parsers import format_schedule, parse_format_news
+from bot_ui.streaming import answer_streaming
 
 
 requests_router = Router()
 
+_TIME_ARG = re.compile(r"^\d{1,2}:\d{2}$")
+
 
 class IsGroupCreated(Filter):
-    async def __call__(self, message: types.Message) -> bool:
-        async with async_session() as session:
-            grp = await get_group_by_tg_id(session, message.chat.id)
-            return grp is not None
+    # Группа чата приходит из DbSessionMiddleware
+    async def __call__(self, message: types.Message, group: GroupSnapshot | None = None) -> bool:
+        return group is not None
 
 
-# /get_schedule, /get_events, /get_news, /get_hw, /bot
+# /get_schedule, /get_events, /get_news, /get_hw, /search_hw, /deadlines, /add_deadline, /rm_deadline,
+# /teacher, /room, /free_slots, /bot
 @requests_router.message(
     Command("get_schedule"),
     F.chat.type.in_({"group","supergroup"}),
     IsGroupCreated()
 )
-async def cmd_get_schedule(message: types.Message):
+async def cmd_get_schedule(message: types.Message, session: AsyncSession):
     """
 
     """
@@ -51,9 +63,11 @@ async def cmd_get_schedule(message: types.Message):
             await message.answer("Укажите корректный день")
             return None
 
-    async with async_session() as session:
-        schedule = await get_group_field(session, message.chat.id, "schedule")
-        schedule = await format_schedule(schedule, day)
+    # Для одного дня читаются только его занятия
+    weekday = DAYS.index(day) if day else None
+    lessons = await get_group_lessons(session, message.chat.id, weekday)
+    schedule = render_schedule(lessons, None if weekday is None else [weekday])
+    schedule = await format_schedule(schedule, day)
 
     answer += schedule
     await message.answer(answer)
@@ -65,9 +79,8 @@ async def cmd_get_schedule(message: types.Message):
     F.chat.type.in_({"group","supergroup"}),
     IsGroupCreated()
 )
-async def cmd_get_events(message: types.Message):
-    async with async_session() as session:
-        events = await get_group_field(session, message.chat.id, "events")
+async def cmd_get_events(message: types.Message, session: AsyncSession):
+    events = await get_group_field(session, message.chat.id, "events")
 
     if events is None:
         events = "Ближайших событий нет"
@@ -80,9 +93,8 @@ async def cmd_get_events(message: types.Message):
     F.chat.type.in_({"group", "supergroup"}),
     IsGroupCreated()
 )
-async def cmd_get_homework(message: types.Message):
-    async with async_session() as session:
-        homework = await get_group_field(session, message.chat.id, "homework")
+async def cmd_get_homework(message: types.Message, session: AsyncSession):
+    homework = await get_group_field(session, message.chat.id, "homework")
 
     if homework is None:
         homework = "Актуальных задач нет"
@@ -96,11 +108,7 @@ async def cmd_get_homework(message: types.Message):
     IsGroupCreated()
 )
 async def cmd_get_news(message: types.Message):
-    async with async_session() as session:
-        path_to_yaml_cfg = "bot_api\\parsing\\config.yaml"
-        news = await parse_format_news(path_to_yaml_cfg)
-        news = str(news)
-
+    news = format_news(await NEWS_POLLER.latest())
     await message.answer(news)
 
 
@@ -109,7 +117,7 @@ async def cmd_get_news(message: types.Message):
     F.chat.type.in_({"group", "supergroup"}),
     IsGroupCreated()
 )
-async def cmd_upload_events(message: types.Message):
+async def cmd_upload_events(message: types.Message, session: AsyncSession):
     """
     Обновляет поле 'events' для текущей группы.
     Использование: /upload_events <текст ближайших событий>
@@ -123,13 +131,13 @@ async def cmd_upload_events(message: types.Message):
         return
 
     value = parts[1].strip()
-    async with async_session() as session:
-        result_msg = await update_group_field(
-            session,
-            group_tg_id=message.chat.id,
-            field="events",
-            value=value
-        )
+    result_msg = await update_group_field(
+        session,
+        group_tg_id=message.chat.id,
+        field="events",
+        value=value,
+        author=message.from_user.username
+    )
     await message.answer(result_msg)
 
 
@@ -138,7 +146,7 @@ async def cmd_upload_events(message: types.Message):
     F.chat.type.in_({"group", "supergroup"}),
     IsGroupCreated()
 )
-async def cmd_upload_hw(message: types.Message):
+async def cmd_upload_hw(message: types.Message, session: AsyncSession):
     """
     Обновляет поле 'homework' для текущей группы.
     Использование: /upload_hw <текст домашнего задания>
@@ -152,35 +160,176 @@ async def cmd_upload_hw(message: types.Message):
         return
 
     value = parts[1].strip()
-    async with async_session() as session:
-        result_msg = await update_group_field(
-            session,
-            group_tg_id=message.chat.id,
-            field="homework",
-            value=value
-        )
+    result_msg = await update_group_field(
+        session,
+        group_tg_id=message.chat.id,
+        field="homework",
+        value=value,
+        author=message.from_user.username
+    )
     await message.answer(result_msg)
 
 
+@requests_router.message(
+    Command("search_hw"),
+    F.chat.type.in_({"group", "supergroup"}),
+    IsGroupCreated()
+)
+async def cmd_search_hw(message: types.Message, session: AsyncSession):
+    """
+    Поиск по истории ДЗ и событий группы (полнотекстовый индекс, ранжирование BM25).
+    Использование: /search_hw <слова запроса>
+    """
+    parts = message.text.split(" ", 1)
+    if len(parts) < 2 or not parts[1].strip():
+        await message.answer("Использование: /search_hw <слова запроса>")
+        return
+
+    terms = parts[1].strip()
+    notes = await search_notes(session, message.chat.id, terms)
+    await message.answer(format_notes(notes, terms))
+
+
+@requests_router.message(
+    Command("deadlines"),
+    F.chat.type.in_({"group", "supergroup"}),
+    IsGroupCreated()
+)
+async def cmd_deadlines(message: types.Message, session: AsyncSession):
+    homeworks = await get_group_homeworks(session, message.chat.id)
+    await message.answer(format_homeworks(homeworks))
+
+
+@requests_router.message(
+    Command("add_deadline"),
+    F.chat.type.in_({"group", "supergroup"}),
+    IsGroupCreated(),
+    IsLeader()
+)
+async def cmd_add_deadline(message: types.Message, session: AsyncSession):
+    """
+    Добавляет задание с дедлайном; за сутки до дедлайна бот напомнит в чат.
+    Использование: /add_deadline <дд.мм[.гггг]> [чч:мм] <предмет>: <задание>
+    """
+    usage = ("Использование:\n/add_deadline <дд.мм[.гггг]> [чч:мм] <предмет>: <задание>\n\n"
+             "Пример:\n/add_deadline 25.12 18:00 Матанализ: задачи 5-7")
+    parts = message.text.split(maxsplit=3)
+    if len(parts) < 3:
+        await message.answer(usage)
+        return
+
+    _, date, *rest = parts
+    time_of_day = rest.pop(0) if _TIME_ARG.match(rest[0]) else None
+    subject, _, text = " ".join(rest).partition(":")
+    due_at = parse_due(date, time_of_day)
+    if due_at is None or not subject.strip() or not text.strip():
+        await message.answer(usage)
+        return
+    if due_at <= datetime.now():
+        await message.answer("Дедлайн уже прошёл.")
+        return
+
+    # Напоминание не нужно, если его время уже наступило: задание и так только что объявлено
+    reminded = REMINDERS.remind_at(due_at) <= datetime.now()
+    homework_id = await add_homework(session, message.chat.id, subject.strip(), text.strip(), due_at,
+                                     author=message.from_user.username, reminded=reminded)
+    # В очередь - только после фиксации: планировщик читает задание своей сессией
+    await session.commit()
+    if not reminded:
+        REMINDERS.schedule(homework_id, due_at)
+    await message.answer(f"Задание #{homework_id} добавлено, дедлайн {due_at:%d.%m.%Y %H:%M}.")
+
+
+@requests_router.message(
+    Command("rm_deadline"),
+    F.chat.type.in_({"group", "supergroup"}),
+    IsGroupCreated(),
+    IsLeader()
+)
+async def cmd_rm_deadline(message: types.Message, session: AsyncSession):
+    """
+    Удаляет задание с дедлайном.
+    Использование: /rm_deadline <номер задания>
+    """
+    parts = message.text.split()
+    if len(parts) != 2 or not parts[1].lstrip("#").isdigit():
+        await message.answer("Использование: /rm_deadline <номер задания>")
+        return
+
+    homework_id = int(parts[1].lstrip("#"))
+    if await delete_homework(session, message.chat.id, homework_id):
+        await message.answer(f"Задание #{homework_id} удалено.")
+    else:
+        await message.answer(f"Задание #{homework_id} не найдено.")
+
+
+@requests_router.message(Command("teacher"))
+async def cmd_teacher(message: types.Message):
+    """
+    Где сейчас преподаватель: текущее и следующее занятие.
+    Использование: /teacher <фамилия> [день] [время]
+    """
+    parts = message.text.split(" ", 1)
+    name, weekday, minute = parse_query(parts[1]) if len(parts) == 2 else ("", 0, 0)
+    if not name:
+        await message.answer("Использование: /teacher <фамилия> [день] [время]")
+        return
+    await message.answer(describe_teacher(name, weekday, minute))
+
+
+@requests_router.message(Command("room"))
+async def cmd_room(message: types.Message):
+    """
+    Занята ли аудитория в указанное время (по умолчанию - сейчас).
+    Использование: /room <аудитория> [день] [время]
+    """
+    parts = message.text.split(" ", 1)
+    room, weekday, minute = parse_query(parts[1]) if len(parts) == 2 else ("", 0, 0)
+    if not room:
+        await message.answer("Использование: /room <аудитория> [день] [время]")
+        return
+    await message.answer(describe_room(room, weekday, minute))
+
+
+@requests_router.message(
+    Command("free_slots"),
+    F.chat.type.in_({"group", "supergroup"}),
+    IsGroupCreated()
+)
+async def cmd_free_slots(message: types.Message, group: GroupSnapshot):
+    """
+    Общие окна группы чата и других групп.
+    Использование: /free_slots [день] <группа-номер[-курс]> ...
+    """
+    tokens, weekday = message.text.split()[1:], resolve_moment()[0]
+    if tokens and tokens[0].lower() in DAYS + ("сегодня", "завтра"):
+        weekday = resolve_moment(tokens.pop(0))[0]
+
+    groups = TIMETABLE.find_groups(group.group_name, group.group_number, group.group_course)
+    for token in tokens:
+        parsed = parse_group(token, group.group_course)
+        found = TIMETABLE.find_groups(*parsed) if parsed else []
+        if not found:
+            await message.answer(f"Группа «{token}» не найдена в расписании. Формат: ФИИТ-2 или ФИИТ-2-3")
+            return
+        groups += found
+    if not groups:
+        await message.answer("Расписание группы ещё не загружено.")
+        return
+    await message.answer(describe_free_slots(list(dict.fromkeys(groups)), weekday))
+
+
 from bot_api.AI.agent import Agent
-from bot_api.AI.models.instructions_loader import load_instruction
-from bot_api.AI.models.models import InstructionBlock
 @requests_router.message(
     Command("bot"),
     F.chat.type.in_({"group","supergroup"}),
     IsGroupCreated()
 )
 async def cmd_bot(message: types.Message):
-    model = AIModelAPI(API_DS, model_url, model_name)
-    path_to_instructions = "bot_api/AI/models/instructions/instructions.json"
-    instructions = load_instruction(path_to_instructions, InstructionBlock)
-
-    agent = Agent(model, instructions)
+    agent = Agent.from_registry(deepseek_api)
 
     user_text = message.text.lstrip('/')
-    result = await agent.run(user_text, message.chat.id)
-
-    await message.answer(result)
+    await answer_streaming(message, agent.stream(user_text, message.chat.id))
 
 """
 async def cmd_bot(message: types.Message):
@@ -13,6 +13,7 @@ MENU_SECTIONS = {
             ("/create_group", "create_group", "Создать новую группу"),
             ("/change_group", "change_group", "Изменить данные существующей группы"),
             ("/add_student",  "add_student",  "Добавить студента в группу"),
+            ("/import_students", "import_students", "Добавить список студентов (текст или CSV)"),
             ("/rm_student",   "rm_student",   "Удалить студента из группы"),
             ("/cd_leader",    "cd_leader",    "Назначить старосту группы"),
         ],
@@ -24,9 +25,15 @@ MENU_SECTIONS = {
             ("/get_events",   "get_events",   "Получить список ближайших событий"),
             ("/get_news",     "get_news",     "Вывести последние новости"),
             ("/get_hw",       "get_hw",       "Показать назначенные ДЗ"),
+            ("/search_hw",    "search_hw",    "Поиск по истории ДЗ и событий"),
+            ("/deadlines",    "deadlines",    "Ближайшие дедлайны"),
+            ("/teacher",      "teacher",      "Где сейчас преподаватель"),
+            ("/room",         "room",         "Свободна ли аудитория"),
+            ("/free_slots",   "free_slots",   "Общие окна с другими группами"),
 
             ("/add_events",   "add_events",   "Добавить новое событие"),
             ("/add_hw",       "add_hw",       "Добавить домашнее задание"),
+            ("/add_deadline", "add_deadline", "Добавить ДЗ с дедлайном и напоминанием"),
         ],
     },
     "ai": {
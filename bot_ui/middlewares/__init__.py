@@ -0,0 +1,3 @@
+from .db import DbSessionMiddleware, CommitBeforeRequestMiddleware, DB_STATS
+
+__all__ = ["DbSessionMiddleware", "CommitBeforeRequestMiddleware", "DB_STATS"]
@@ -0,0 +1,112 @@
+import time
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot_api.Database.models import async_session
+from bot_api.Database.engine import ENGINES
+from bot_api.Database.requests import get_student
+from bot_api.Database.group_cache import GROUP_CACHE
+from config import slow_update_ms, slow_update_queries
+
+
+logger = logging.getLogger(__name__)
+
+# Счётчик SQL-запросов текущего апдейта (у каждой задачи aiogram свой контекст)
+_QUERY_COUNTER: ContextVar[list[int] | None] = ContextVar("query_counter", default=None)
+# Сессия текущего апдейта - для фиксации перед запросами к Bot API
+_UPDATE_SESSION: ContextVar[AsyncSession | None] = ContextVar("update_session", default=None)
+
+# Метрики: обработано апдейтов, всего запросов к БД и максимум на один апдейт
+DB_STATS = {
+    "updates": 0,
+    "queries": 0,
+    "max_queries": 0,
+}
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _QUERY_COUNTER.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+for _engine in ENGINES:
+    event.listen(_engine.sync_engine, "before_cursor_execute", _count_query)
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Одна сессия БД на апдейт (unit of work).
+
+    Открывает сессию, один раз находит группу чата и студента-отправителя
+    и передаёт их фильтрам и хендлерам через данные: session, group, student.
+    Группа берётся из GROUP_CACHE (снимок GroupSnapshot); в чатах без группы
+    студент не ищется, и апдейт обходится без запросов к БД.
+    После хендлера фиксирует транзакцию, при ошибке - откатывает; перед ответами
+    в Telegram транзакцию фиксирует CommitBeforeRequestMiddleware.
+    Число SQL-запросов за апдейт пишется в DB_STATS; в лог (INFO) - только
+    для апдейтов медленнее slow_update_ms или с числом запросов выше slow_update_queries.
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        counter = [0]
+        token = _QUERY_COUNTER.set(counter)
+        session_token = None
+        started = time.perf_counter()
+        try:
+            async with async_session() as session:
+                session_token = _UPDATE_SESSION.set(session)
+                chat = data.get("event_chat")
+                user = data.get("event_from_user")
+
+                data["session"] = session
+                group = await GROUP_CACHE.get(session, chat.id) if chat else None
+                data["group"] = group
+                data["student"] = (
+                    await get_student(session, '@' + user.username)
+                    if group is not None and user and user.username else None
+                )
+                # Отдаём соединение в пул: хендлер (например, /bot) может долго ждать сеть
+                await session.commit()
+
+                result = await handler(event, data)
+                if session.in_transaction():
+                    await session.commit()
+                return result
+        finally:
+            if session_token is not None:
+                _UPDATE_SESSION.reset(session_token)
+            _QUERY_COUNTER.reset(token)
+            DB_STATS["updates"] += 1
+            DB_STATS["queries"] += counter[0]
+            DB_STATS["max_queries"] = max(DB_STATS["max_queries"], counter[0])
+            elapsed = (time.perf_counter() - started) * 1000
+            level = (logging.INFO if elapsed > slow_update_ms or counter[0] > slow_update_queries
+                     else logging.DEBUG)
+            logger.log(level, "Апдейт обработан: %d запросов к БД за %.1f мс", counter[0], elapsed)
+
+
+class CommitBeforeRequestMiddleware(BaseRequestMiddleware):
+    """
+    Фиксирует транзакцию апдейта перед каждым запросом к Bot API (message.answer и т.п.).
+
+    Запись хендлера внутри транзакции апдейта - это SAVEPOINT, и до фиксации она держит
+    единственное соединение писателя; без этого оно было бы занято на всё время ответа в Telegram.
+    Регистрируется на сессии бота: bot.session.middleware(CommitBeforeRequestMiddleware()).
+    """
+    async def __call__(self, make_request, bot, method):
+        session = _UPDATE_SESSION.get()
+        if session is not None and session.in_transaction():
+            await session.commit()
+        return await make_request(bot, method)
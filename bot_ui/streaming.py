@@ -0,0 +1,98 @@
+import time
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+
+PLACEHOLDER = "…"
+MESSAGE_LIMIT = 4096    # Максимальная длина сообщения Telegram
+EDIT_INTERVAL = 1.5     # Минимальный интервал между правками одного сообщения, сек
+
+logger = logging.getLogger(__name__)
+
+# Метрики потоковых ответов: время до первого видимого текста (TTFT) и полное время
+STREAM_STATS = {
+    "answers": 0,
+    "ttft_total": 0.0,
+    "last_ttft": 0.0,
+    "last_total": 0.0,
+}
+
+
+async def _edit(reply: types.Message, text: str) -> float:
+    """
+    Правит сообщение, не падая на ограничениях Telegram.
+
+    :return: Сколько секунд подождать перед следующей правкой
+    """
+    try:
+        await reply.edit_text(text)
+    except TelegramRetryAfter as e:
+        return e.retry_after
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+    return 0.0
+
+
+async def answer_streaming(message: types.Message, snapshots: AsyncIterator[str],
+                           min_interval: float = EDIT_INTERVAL) -> str:
+    """
+    Отправляет заглушку и правит её по мере генерации ответа не чаще, чем раз в min_interval.
+
+    :param message: Сообщение пользователя, на которое отвечаем
+    :param snapshots: Итератор по накопленному тексту ответа (см. Agent.stream)
+    :param min_interval: Минимальный интервал между правками, сек
+    :return: Итоговый текст ответа
+    """
+    started = time.perf_counter()
+    reply = await message.answer(PLACEHOLDER)
+
+    text, shown = "", PLACEHOLDER
+    next_edit = 0.0
+    first_visible = None
+
+    try:
+        async for text in snapshots:
+            now = time.monotonic()
+            if not text.strip() or now < next_edit:
+                continue
+
+            visible = text[:MESSAGE_LIMIT]
+            if visible == shown:
+                continue
+            delay = await _edit(reply, visible)
+            next_edit = now + max(min_interval, delay)
+            if not delay:
+                shown = visible
+                if first_visible is None:
+                    first_visible = time.perf_counter()
+    except Exception:
+        await _edit(reply, "Не удалось получить ответ, попробуйте позже.")
+        raise
+
+    # Финальная правка и продолжение длинного ответа отдельными сообщениями
+    parts = [text[i:i + MESSAGE_LIMIT] for i in range(0, len(text), MESSAGE_LIMIT)] or ["Пустой ответ"]
+    if parts[0] != shown:
+        delay = next_edit - time.monotonic()
+        while True:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            delay = await _edit(reply, parts[0])
+            if not delay:
+                break
+    for part in parts[1:]:
+        await message.answer(part)
+
+    finished = time.perf_counter()
+    ttft = (first_visible or finished) - started
+    STREAM_STATS["answers"] += 1
+    STREAM_STATS["ttft_total"] += ttft
+    STREAM_STATS["last_ttft"] = ttft
+    STREAM_STATS["last_total"] = finished - started
+    logger.info("Потоковый ответ: TTFT %.0f мс, всего %.0f мс", ttft * 1000, (finished - started) * 1000)
+
+    return text
@@ -12,5 +12,44 @@ API_DS = getenv("API_DS")
 
 model_url = "https://api.deepseek.com"
 model_name = "deepseek-chat"
+model_max_concurrency = int(getenv("LLM_MAX_CONCURRENCY", 8))   # Одновременных запросов к модели
+model_timeout = float(getenv("LLM_TIMEOUT", 60))                # Таймаут одного запроса, сек
 
-deepseek_api = AIModelAPI(API_DS, model_url, model_name)
+# Эмбеддинги MiniLM (RAG, кэш ответов, роутер интентов)
+embeddings_device = getenv("EMBEDDINGS_DEVICE", "cpu")
+embeddings_runtime = getenv("EMBEDDINGS_RUNTIME", "torch")       # torch | int8 | onnx
+embeddings_threads = int(getenv("EMBEDDINGS_THREADS", 0)) or None  # Потоков torch, 0 - по умолчанию
+warm_up_on_start = getenv("WARM_UP_ON_START", "1") != "0"        # Прогрев моделей в фоне после старта
+
+# Очистка БД при старте (только для разработки): по умолчанию данные - кэш релевантности новостей,
+# история ДЗ/событий, дедлайны - сохраняются между перезапусками. Таблицы, созданные прежней
+# версией бота, при первом старте приводятся к текущей схеме (upgrade_schema в init_db)
+db_reset_on_start = getenv("DB_RESET_ON_START", "0") == "1"
+
+# Лог апдейтов: медленные или «тяжёлые» по запросам к БД пишутся в INFO, остальные - в DEBUG
+slow_update_ms = float(getenv("SLOW_UPDATE_MS", 500))            # Порог времени обработки, мс
+slow_update_queries = int(getenv("SLOW_UPDATE_QUERIES", 10))     # Порог числа SQL-запросов
+
+# Семантический кэш ответов /bot
+answer_cache_threshold = float(getenv("ANSWER_CACHE_THRESHOLD", 0.92))  # Минимальное косинусное сходство
+answer_cache_ttl = float(getenv("ANSWER_CACHE_TTL", 3600))              # Время жизни ответа, сек
+answer_cache_size = int(getenv("ANSWER_CACHE_SIZE", 2048))              # Максимум ответов в кэше
+
+# Фоновое обновление расписаний всех групп
+schedule_sync_interval = float(getenv("SCHEDULE_SYNC_INTERVAL", 6 * 3600))  # Период, сек; 0 - отключить
+# Курсы, которые синхронизируются всегда (для /teacher, /room), даже без групп в боте
+timetable_courses = [int(c) for c in getenv("TIMETABLE_COURSES", "1,2,3,4").split(",") if c.strip()]
+
+# Фоновый опрос новостей сайта
+news_poll_interval = float(getenv("NEWS_POLL_INTERVAL", 1800))  # Период опроса, сек; 0 - отключить
+news_max_age = float(getenv("NEWS_MAX_AGE", 3 * 3600))          # Старше этого новости обновляются при запросе, сек
+news_limit = int(getenv("NEWS_LIMIT", 20))                      # Сколько последних новостей показывать
+
+# Напоминания о дедлайнах ДЗ
+homework_remind_before = float(getenv("HOMEWORK_REMIND_BEFORE", 24 * 3600))  # За сколько до дедлайна напоминать, сек
+homework_keep_after = float(getenv("HOMEWORK_KEEP_AFTER", 24 * 3600))        # Сколько хранить ДЗ после дедлайна, сек
+homework_purge_interval = float(getenv("HOMEWORK_PURGE_INTERVAL", 3600))     # Период удаления истёкших ДЗ, сек
+reminder_send_rate = int(getenv("REMINDER_SEND_RATE", 25))                   # Сообщений в секунду (лимит Telegram ~30)
+
+deepseek_api = AIModelAPI(API_DS, model_url, model_name,
+                          max_concurrency=model_max_concurrency, timeout=model_timeout)